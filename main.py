@@ -1,3 +1,4 @@
+import argparse
 from pathlib import Path
 from src.utils.logger import get_logger
 import yaml
@@ -9,9 +10,11 @@ from src.preprocessing.base import BasePreprocessor
 from src.preprocessing.simple import SimplePreprocessor
 from src.preprocessing.standard import StandardPreprocessor
 from src.preprocessing.advanced import AdvancedPreprocessor
-from src.utils.splitter import splitter
+from src.utils.splitter import splitter, load_split
 from src.models.training import Models
-from src.models.evaluation import Evaluate
+from src.models.runner import EvaluationRunner
+from src.benchmarks.latency import LatencyBenchmark
+from src.utils.instrumentation import RECORDER, stage
 
 
 def setup_logging(path: Path = Path("configs/logging.yaml")) -> logging.Logger:
@@ -48,7 +51,8 @@ def run_preprocessing(PreprocessorClass: Type[BasePreprocessor],
                       df: pd.DataFrame,
                       file_name: str,
                       logger: logging.Logger,
-                      processed_dir: Path=Path("data/processed")):
+                      processed_dir: Path=Path("data/processed"),
+                      preprocessors_dir: Path=Path("models/preprocessors")):
     """
     Executes the data preprocessing pipeline using the specified preprocessor
     Parameters:
@@ -60,27 +64,52 @@ def run_preprocessing(PreprocessorClass: Type[BasePreprocessor],
             Name of the file to be processed
         processed_dir : Path, optional
             Directory where the processed data will be stored (default is 'data/processed')
+        preprocessors_dir : Path, optional
+            Directory where the fitted preprocessor will be stored for serving (default is 'models/preprocessors')
         logger : logging.Logger
             Logger instance for logging messages and saving logs
     """
     try:
         # Launching the pipeline preprocessing data
         logger.info(f"{PreprocessorClass.__name__} is starting")
-        preprocessor = PreprocessorClass(df)
-        preprocessor.run()
-        preprocessor.df.to_csv(processed_dir / file_name, index=False)
+        with stage(f"preprocessing.{file_name.replace('.csv', '')}", rows_in=len(df)):
+            preprocessor = PreprocessorClass(df)
+            preprocessor.run()
+            preprocessor.df.to_csv(processed_dir / file_name, index=False)
+            preprocessor.save(preprocessors_dir / file_name.replace(".csv", ".joblib"))
         logger.info(f"Processed file {file_name} saved to {processed_dir}\n"
                         f"{PreprocessorClass.__name__} finished successfully\n")
     except Exception as e:
         logger.error(f"{PreprocessorClass.__name__} failed with an error: \n{e}")
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments
+    Parameters:
+        argv : list[str], optional
+            Arguments (default is None - sys.argv)
+    Returns:
+        argparse.Namespace
+            Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Heart disease preprocessing, training and evaluation")
+    parser.add_argument("--trace", type=Path, nargs="?", const=Path("results/trace.json"), default=None,
+                        help="Save a Chrome trace of the run (default path 'results/trace.json'), "
+                             "open it in ui.perfetto.dev or chrome://tracing")
+    return parser.parse_args(argv)
+
+
 def main():
     """
     Performs data preprocessing, trains machine learning models, and evaluates their performance
+    Time, memory and row counts of the stages are saved to 'results/run_report.json'
+    and, with --trace, as a Chrome trace
     """
     # Component initialization
+    args = parse_args()
     logger = setup_logging()
+    RECORDER.start_run()
     loader = DataLoader()
 
     # Loading data
@@ -102,22 +131,38 @@ def main():
         file_path = processed_dir / name
         splitter(file_path, name.replace(".csv", ""))
 
-    # Run training and evaluation
+    # Run training
     split_dir = Path("data/splits")
-    for name in file_names:
-        name = name.replace(".csv", '')
+    preprocessing_types = [name.replace(".csv", '') for name in file_names]
+    for name in preprocessing_types:
         X_train = pd.read_csv(split_dir / f"{name}_X_train.csv")
-        X_test = pd.read_csv(split_dir / f"{name}_X_test.csv")
         y_train = pd.read_csv(split_dir / f"{name}_y_train.csv").squeeze()
-        y_test = pd.read_csv(split_dir / f"{name}_y_test.csv").squeeze()
 
         logger.info(f"Start train {name} pipeline")
-        models = Models(X_train, y_train, preprocessing_type=name)
-        models.train_models()
-
-        logger.info(f"Start evaluate {name} pipeline")
-        ev = Evaluate(X_test, y_test, preprocessing_type=name)
-        ev.evaluate()
+        with stage(f"training.{name}", rows_in=len(X_train)):
+            models = Models(X_train, y_train, preprocessing_type=name)
+            models.train_models()
+            models.export_models()
+
+    # Run evaluation of all pipelines at once, test data is memory-mapped and shared by workers
+    logger.info("Start evaluate pipelines")
+    with stage("evaluation"):
+        runner = EvaluationRunner(preprocessing_types, split_dir)
+        runner.run()
+
+    # Run latency benchmark of the trained models
+    benchmark = next(iter(runner.evaluators.values())).settings.get("benchmark", {})
+    if benchmark.get("enabled"):
+        params = {key: value for key, value in benchmark.items() if key != "enabled"}
+        for name in preprocessing_types:
+            logger.info(f"Start latency benchmark of {name} pipeline")
+            LatencyBenchmark(load_split(name, "X_test", split_dir), name, **params).run()
+
+    # Save the run report
+    RECORDER.stop_run()
+    RECORDER.save(Path("results/run_report.json"))
+    if args.trace is not None:
+        RECORDER.save_trace(args.trace)
 
 
 if __name__ == "__main__":
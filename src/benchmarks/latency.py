@@ -0,0 +1,220 @@
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.models.evaluation import Evaluate
+from src.models.inference import CompactModel
+from src.utils.logger import get_logger
+
+
+class LatencyBenchmark:
+    """
+    Measures inference latency and throughput of the trained models of one preprocessing type
+    For every model and engine ('sklearn' - joblib model, 'compact' - NumPy engine, if exported):
+    - load time and artifact size
+    - single-record latency percentiles (p50, p95, p99)
+    - batch throughput (rows per second) at several batch sizes
+    Inference is one pass of Evaluate.predict_chunk (scores and predictions), as in evaluation.
+    Results are saved to 'results/<preprocessing_type>_latency.csv' with the quality metrics
+    of 'results/<preprocessing_type>_metrics.csv' (if exists)
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        X_test : pd.DataFrame or np.ndarray
+            Test data used as inference input
+        preprocessing_type : str
+            Type of preprocessing used
+        models_path : Path
+            Folder with the trained models
+        save_path : Path
+            Folder to save the results
+        n_single : int
+            Number of timed single-record calls
+        batch_sizes : list[int]
+            Batch sizes of the throughput measurements
+        min_time : float
+            Minimum time in seconds spent on every batch size
+    """
+    def __init__(self,
+                 X_test,
+                 preprocessing_type: str,
+                 models_dir: Path = Path("models"),
+                 save_path: Path = Path("results"),
+                 n_single: int = 200,
+                 batch_sizes: list[int] = (1, 16, 256, 4096),
+                 min_time: float = 0.2) -> None:
+        """
+        Initialize the LatencyBenchmark class
+        Parameters:
+            X_test : pd.DataFrame or np.ndarray
+                Test data used as inference input
+            preprocessing_type : str
+                Type of preprocessing used
+            models_dir : Path, optional
+                Directory with the trained models (default is 'models')
+            save_path : Path, optional
+                Folder to save the results (default is 'results')
+            n_single : int, optional
+                Number of timed single-record calls (default is 200)
+            batch_sizes : list[int], optional
+                Batch sizes of the throughput measurements (default is (1, 16, 256, 4096))
+            min_time : float, optional
+                Minimum time in seconds spent on every batch size (default is 0.2)
+        """
+        self.logger = get_logger()
+        self.X_test = X_test
+        self.preprocessing_type = preprocessing_type
+        self.models_path = models_dir / preprocessing_type
+        self.save_path = save_path
+        self.n_single = n_single
+        self.batch_sizes = list(batch_sizes)
+        self.min_time = min_time
+
+
+    def load(self, path: Path, engine: str) -> tuple[object, float]:
+        """
+        Loads a model and measures the load time
+        Parameters:
+            path : Path
+                Path of the model file
+            engine : str
+                'sklearn' or 'compact'
+        Returns:
+            tuple[object, float]
+                Model and load time in milliseconds
+        """
+        start = time.perf_counter()
+        model = CompactModel.from_file(path) if engine == "compact" else joblib.load(path)
+        return model, (time.perf_counter() - start) * 1000
+
+
+    def to_input(self, model, X: np.ndarray):
+        """
+        Converts rows to the input of the model, DataFrames keep the feature names of the model as in evaluation
+        Parameters:
+            model : object
+                Model to prepare the input for
+            X : np.ndarray
+                Rows of the test data
+        Returns:
+            pd.DataFrame or np.ndarray
+                Input of the model
+        """
+        columns = getattr(model, "feature_names_in_", None)
+        if isinstance(model, CompactModel) or columns is None:
+            return X
+        return pd.DataFrame(X, columns=columns)
+
+
+    def single_latency(self, model) -> np.ndarray:
+        """
+        Measures the latency of single-record calls
+        Parameters:
+            model : object
+                Model to benchmark
+        Returns:
+            np.ndarray
+                Latency of every call in milliseconds
+        """
+        X = np.asarray(self.X_test, dtype=np.float64)
+        rows = [self.to_input(model, X[i:i + 1]) for i in range(min(len(X), self.n_single))]
+
+        # Warm-up
+        for row in rows[:5]:
+            Evaluate.predict_chunk(model, row)
+
+        latencies = np.empty(self.n_single)
+        for i in range(self.n_single):
+            row = rows[i % len(rows)]
+            start = time.perf_counter()
+            Evaluate.predict_chunk(model, row)
+            latencies[i] = time.perf_counter() - start
+        return latencies * 1000
+
+
+    def throughput(self, model, size: int) -> float:
+        """
+        Measures batch throughput
+        Parameters:
+            model : object
+                Model to benchmark
+            size : int
+                Batch size
+        Returns:
+            float
+                Rows per second (best of the repeated calls, test rows are repeated to fill the batch)
+        """
+        X = np.asarray(self.X_test, dtype=np.float64)
+        batch = self.to_input(model, X[np.arange(size) % len(X)])
+        Evaluate.predict_chunk(model, batch)
+
+        best = np.inf
+        total = 0.0
+        while total < self.min_time:
+            start = time.perf_counter()
+            Evaluate.predict_chunk(model, batch)
+            elapsed = time.perf_counter() - start
+            best = min(best, elapsed)
+            total += elapsed
+        return size / best
+
+
+    def benchmark_model(self, name: str, path: Path, engine: str) -> dict:
+        """
+        Benchmarks one model file
+        Parameters:
+            name : str
+                Name of the model
+            path : Path
+                Path of the model file
+            engine : str
+                'sklearn' or 'compact'
+        Returns:
+            dict
+                Row of the results
+        """
+        model, load_ms = self.load(path, engine)
+        latencies = self.single_latency(model)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        row = {
+            "model": name,
+            "engine": engine,
+            "load_ms": load_ms,
+            "artifact_kb": path.stat().st_size / 1024,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99
+        }
+        for size in self.batch_sizes:
+            row[f"rows_per_s_{size}"] = self.throughput(model, size)
+        self.logger.info(f"Benchmarked {name} ({engine}): p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+        return row
+
+
+    def run(self) -> pd.DataFrame:
+        """
+        Benchmarks all trained models and saves the results
+        Returns:
+            pd.DataFrame
+                Results, one row per model and engine
+        """
+        rows = []
+        for path in sorted(self.models_path.glob("*.joblib")):
+            rows.append(self.benchmark_model(path.stem, path, "sklearn"))
+            compact_path = self.models_path / "compact" / f"{path.stem}.npz"
+            if compact_path.is_file():
+                rows.append(self.benchmark_model(path.stem, compact_path, "compact"))
+
+        df = pd.DataFrame(rows)
+
+        # Quality metrics next to the latency, if the models were evaluated
+        metrics_file = self.save_path / f"{self.preprocessing_type}_metrics.csv"
+        if metrics_file.is_file() and not df.empty:
+            df = df.merge(pd.read_csv(metrics_file), on="model", how="left")
+
+        self.save_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.save_path / f"{self.preprocessing_type}_latency.csv"
+        df.to_csv(file_path, index=False)
+        self.logger.info(f"Latency benchmark saved to '{file_path}':\n{df}")
+        return df
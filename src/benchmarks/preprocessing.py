@@ -0,0 +1,247 @@
+import argparse
+import json
+import platform
+import time
+import numpy as np
+import pandas as pd
+import sklearn
+from datetime import datetime
+from pathlib import Path
+from src.loader import DataLoader
+from src.preprocessing.advanced import AdvancedPreprocessor
+from src.preprocessing.simple import SimplePreprocessor
+from src.preprocessing.standard import StandardPreprocessor
+from src.utils.logger import get_logger
+from src.utils.memory import PeakMemory
+from src.utils.synthetic import SyntheticGenerator
+
+# Benchmarked preprocessors, their steps are timed in the order of their STEPS (the order of run)
+PIPELINES = {
+    "simple": SimplePreprocessor,
+    "standard": StandardPreprocessor,
+    "advanced": AdvancedPreprocessor,
+}
+
+
+def fit_complexity(rows: list[int], seconds: list[float]) -> dict | None:
+    """
+    Fits seconds = coefficient * rows ^ exponent by least squares on the log-log scale
+    Parameters:
+        rows : list[int]
+            Input sizes
+        seconds : list[float]
+            Times of the sizes
+    Returns:
+        dict or None
+            Exponent, coefficient and R^2 of the fit (None - fewer than two positive sizes)
+    """
+    x, y = np.asarray(rows, dtype=np.float64), np.asarray(seconds, dtype=np.float64)
+    keep = (x > 0) & (y > 0)
+    if len(np.unique(x[keep])) < 2:
+        return None
+    log_x, log_y = np.log(x[keep]), np.log(y[keep])
+    exponent, intercept = np.polyfit(log_x, log_y, 1)
+    residuals = log_y - (exponent * log_x + intercept)
+    total = ((log_y - log_y.mean()) ** 2).sum()
+    r2 = 1 - (residuals ** 2).sum() / total if total > 0 else 1.0
+    return {"exponent": float(exponent), "coefficient": float(np.exp(intercept)), "r2": float(r2)}
+
+
+class PreprocessingBenchmark:
+    """
+    Measures how the preprocessing pipelines scale with the number of rows
+    For every pipeline and synthetic dataset size (see src/utils/synthetic.py):
+    - 'run': the whole run method
+    - every step of STEPS of the preprocessor, replayed on a new preprocessor in the order of run
+    records wall time, peak RSS (absolute and above the RSS before the step) and rows per second.
+    The empirical complexity of every step is fitted on the log-log scale (time ~ rows ^ exponent).
+    A pipeline is not run on larger sizes once its run takes more than 'time_limit' seconds
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        generator : SyntheticGenerator
+            Fitted generator of the datasets
+        sizes : list[int]
+            Numbers of rows, ascending
+        pipelines : list[str]
+            Names of the benchmarked pipelines
+        time_limit : float or None
+            Time of a run in seconds after which larger sizes are skipped (None - no limit)
+        save_path : Path
+            Folder to save the results
+        seed : int
+            Seed of the datasets
+        results : list[dict]
+            Measurements, one per pipeline, size and step
+    """
+    def __init__(self,
+                 generator: SyntheticGenerator,
+                 sizes: list[int] = (1_000, 10_000, 100_000),
+                 pipelines: list[str] = tuple(PIPELINES),
+                 time_limit: float | None = 120.0,
+                 save_path: Path = Path("results/benchmarks"),
+                 seed: int = 0) -> None:
+        """
+        Initialize the PreprocessingBenchmark class
+        Parameters:
+            generator : SyntheticGenerator
+                Fitted generator of the datasets
+            sizes : list[int], optional
+                Numbers of rows (default is (1000, 10000, 100000))
+            pipelines : list[str], optional
+                Names of the pipelines (default is all pipelines)
+            time_limit : float, optional
+                Time of a run in seconds after which larger sizes are skipped (default is 120.0)
+            save_path : Path, optional
+                Folder to save the results (default is 'results/benchmarks')
+            seed : int, optional
+                Seed of the datasets (default is 0)
+        Raises:
+            ValueError: If a pipeline is unknown
+        """
+        unknown = set(pipelines) - set(PIPELINES)
+        if unknown:
+            raise ValueError(f"Unknown pipelines {sorted(unknown)}, expected {list(PIPELINES)}")
+        self.logger = get_logger()
+        self.generator = generator
+        self.sizes = sorted(sizes)
+        self.pipelines = list(pipelines)
+        self.time_limit = time_limit
+        self.save_path = save_path
+        self.seed = seed
+        self.results = []
+
+
+    def measure(self, fn, n_rows: int) -> dict:
+        """
+        Runs a function once and measures it
+        Parameters:
+            fn : Callable
+                Function without arguments
+            n_rows : int
+                Number of input rows
+        Returns:
+            dict
+                Seconds, peak RSS and its increase in MB, rows per second
+        """
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - start
+        return {
+            "seconds": seconds,
+            "peak_rss_mb": memory.peak / 2 ** 20,
+            "rss_increase_mb": memory.increase / 2 ** 20,
+            "rows_per_s": n_rows / seconds if seconds > 0 else None
+        }
+
+
+    def benchmark_pipeline(self, name: str, df: pd.DataFrame) -> float:
+        """
+        Measures the run and the steps of one pipeline on one dataset
+        Parameters:
+            name : str
+                Name of the pipeline
+            df : pd.DataFrame
+                Raw dataset
+        Returns:
+            float
+                Seconds of the whole run
+        """
+        preprocessor_class = PIPELINES[name]
+        n_rows = len(df)
+
+        run = self.measure(preprocessor_class(df).run, n_rows)
+        self.results.append({"pipeline": name, "rows": n_rows, "step": "run", **run})
+
+        preprocessor = preprocessor_class(df)
+        for step in preprocessor_class.STEPS:
+            row = self.measure(getattr(preprocessor, step), n_rows)
+            self.results.append({"pipeline": name, "rows": n_rows, "step": step, **row})
+        self.logger.info(f"{name} preprocessing of {n_rows} rows: {run['seconds']:.3f}s, "
+                         f"peak RSS {run['peak_rss_mb']:.0f} MB")
+        return run["seconds"]
+
+
+    def complexity(self) -> list[dict]:
+        """
+        Fits the empirical complexity of every pipeline run and step
+        Returns:
+            list[dict]
+                Fits sorted by exponent, the fastest growing first
+        """
+        fits = []
+        df = pd.DataFrame(self.results)
+        for (pipeline, step), group in df.groupby(["pipeline", "step"], sort=False):
+            fit = fit_complexity(group["rows"].tolist(), group["seconds"].tolist())
+            if fit is not None:
+                fits.append({"pipeline": pipeline, "step": step, **fit})
+        return sorted(fits, key=lambda fit: fit["exponent"], reverse=True)
+
+
+    def run(self) -> dict:
+        """
+        Runs the benchmark and saves the report to 'results/benchmarks/preprocessing_<timestamp>.json'
+        Returns:
+            dict
+                Report with the metadata, measurements and complexity fits
+        """
+        active = list(self.pipelines)
+        skipped = {}
+        for i, n_rows in enumerate(self.sizes):
+            df = self.generator.sample(n_rows, np.random.default_rng([self.seed, i]))
+            for name in list(active):
+                seconds = self.benchmark_pipeline(name, df)
+                if self.time_limit is not None and seconds > self.time_limit:
+                    active.remove(name)
+                    skipped[name] = [size for size in self.sizes if size > n_rows]
+                    self.logger.warning(f"{name} preprocessing took {seconds:.1f}s on {n_rows} rows, "
+                                        f"larger sizes are skipped")
+
+        report = {
+            "metadata": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "scikit-learn": sklearn.__version__,
+                "sizes": self.sizes,
+                "time_limit": self.time_limit,
+                "seed": self.seed
+            },
+            "results": self.results,
+            "complexity": self.complexity(),
+            "skipped": skipped
+        }
+
+        self.save_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.save_path / f"preprocessing_{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.logger.info(f"Preprocessing benchmark saved to '{file_path}'")
+        return report
+
+
+def main() -> None:
+    """
+    Runs the preprocessing benchmark:
+    python -m src.benchmarks.preprocessing --sizes 1000 10000 100000
+    """
+    parser = argparse.ArgumentParser(description="Preprocessing scaling benchmark on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Numbers of rows")
+    parser.add_argument("--pipelines", nargs="+", default=list(PIPELINES), choices=list(PIPELINES), help="Pipelines to run")
+    parser.add_argument("--time-limit", type=float, default=120.0, help="Run time in seconds after which larger sizes are skipped")
+    parser.add_argument("--output", type=Path, default=Path("results/benchmarks"), help="Folder of the JSON report")
+    parser.add_argument("--input", type=Path, default=Path("data/raw/heart-diseases.csv"), help="Raw data of the generator")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    generator = SyntheticGenerator(DataLoader(args.input).load(), seed=args.seed).fit()
+    report = PreprocessingBenchmark(generator, args.sizes, args.pipelines, args.time_limit, args.output, args.seed).run()
+    for fit in report["complexity"]:
+        print(f"{fit['pipeline']:>9} {fit['step']:<20} O(n^{fit['exponent']:.2f})  R^2={fit['r2']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
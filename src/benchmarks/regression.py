@@ -0,0 +1,291 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import sklearn
+import yaml
+from datetime import datetime
+from pathlib import Path
+from sklearn.model_selection import train_test_split
+from src.benchmarks.preprocessing import PIPELINES
+from src.loader import DataLoader
+from src.models.evaluation import Evaluate
+from src.models.training import Models
+from src.utils.instrumentation import RECORDER, stage
+from src.utils.logger import get_logger
+from src.utils.synthetic import SyntheticGenerator
+from src.utils.validator import Validator
+
+# Exit codes of the gate
+PASSED, REGRESSED, NO_BASELINE = 0, 1, 2
+
+
+def environment() -> dict:
+    """
+    Returns the versions of the environment the profile ran in
+    """
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__
+    }
+
+
+class RegressionGate:
+    """
+    Runs a fixed benchmark profile and compares it to a stored baseline
+    For every size of the profile and pipeline, the stages 'profile.<pipeline>.<size>.<phase>'
+    (preprocessing, training with the reduced grid, evaluation) are recorded with the recorder
+    of src/utils/instrumentation.py. Every stage keeps the minimum wall time and the maximum RSS increase
+    over the repeats. The RSS increase is the peak RSS of the stage above the RSS on its entry, so memory held
+    by earlier stages does not count against later ones. Later repeats reuse memory the allocator kept
+    from the first one and show smaller increases, so the maximum is kept.
+    A stage regresses if its time or RSS increase is above 'baseline * ratio + slack' (see configs/regression.yaml)
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        config : dict
+            Configuration of the gate
+        profile : dict
+            Benchmark profile
+        tolerances : dict
+            Tolerances of the comparison
+        baseline_path : Path
+            Path to the baseline JSON file
+        metrics_path : Path
+            Path to the metrics YAML file of the evaluation
+        comparison : list[dict]
+            Comparison of the last check (see compare)
+        generator : SyntheticGenerator
+            Fitted generator of the datasets
+    """
+    def __init__(self,
+                 config_path: Path = Path("configs/regression.yaml"),
+                 data_path: Path = Path("data/raw/heart-diseases.csv"),
+                 metrics_path: Path = Path("configs/metrics.yaml")) -> None:
+        """
+        Initialize the RegressionGate class
+        Parameters:
+            config_path : Path, optional
+                Path to the gate YAML file (default is 'configs/regression.yaml')
+            data_path : Path, optional
+                Raw data of the synthetic generator (default is 'data/raw/heart-diseases.csv')
+            metrics_path : Path, optional
+                Path to the metrics YAML file of the evaluation (default is 'configs/metrics.yaml')
+        Raises:
+            ValueError: If a pipeline of the profile is unknown
+        """
+        Validator().check_file_exists(config_path)
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.config = yaml.safe_load(f)
+        self.logger = get_logger()
+        self.profile = self.config["profile"]
+        self.tolerances = self.config["tolerances"]
+        self.baseline_path = Path(self.config["baseline"])
+        self.metrics_path = metrics_path
+        self.comparison = []
+
+        unknown = set(self.profile["pipelines"]) - set(PIPELINES)
+        if unknown:
+            raise ValueError(f"Unknown pipelines {sorted(unknown)}, expected {list(PIPELINES)}")
+        self.generator = SyntheticGenerator(DataLoader(data_path).load(), seed=self.profile["seed"]).fit()
+
+
+    def run_pipeline(self, name: str, df: pd.DataFrame, folder: Path) -> None:
+        """
+        Runs preprocessing, training and evaluation of one pipeline as stages
+        Parameters:
+            name : str
+                Name of the pipeline
+            df : pd.DataFrame
+                Raw synthetic dataset
+            folder : Path
+                Temporary folder of the models, the results and the models configuration
+        """
+        prefix = f"profile.{name}.{len(df)}"
+        with stage(f"{prefix}.preprocessing", rows_in=len(df)):
+            preprocessor = PIPELINES[name](df)
+            preprocessor.run()
+
+        target = preprocessor.target
+        X = preprocessor.df.drop(columns=[target]).astype(float)
+        y = preprocessor.df[target]
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=self.profile["test_size"],
+                                                            random_state=self.profile["seed"], stratify=y)
+
+        config_path = folder / "models.yaml"
+        config = {"models": self.profile["models"], "gridsearch": self.profile["gridsearch"],
+                  "persistence": {"compress": 0}}
+        config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        with stage(f"{prefix}.training", rows_in=len(X_train)):
+            Models(X_train, y_train, preprocessing_type=name, config_path=config_path, resume=False,
+                   models_dir=folder / "models").train_models()
+
+        with stage(f"{prefix}.evaluation", rows_in=len(X_test)):
+            Evaluate(X_test, y_test, preprocessing_type=name, config_path=self.metrics_path,
+                     models_dir=folder / "models", save_dir=folder / "results").evaluate()
+
+
+    def run_profile(self) -> dict:
+        """
+        Runs the profile and measures its stages
+        Returns:
+            dict
+                Minimum wall time (seconds) and maximum RSS increase (MB) over the repeats by stage
+        """
+        measurements = {}
+        RECORDER.start_run()
+        try:
+            for repeat in range(self.profile["repeats"]):
+                for i, n_rows in enumerate(sorted(self.profile["sizes"])):
+                    df = self.generator.sample(n_rows, np.random.default_rng([self.profile["seed"], i]))
+                    for name in self.profile["pipelines"]:
+                        with tempfile.TemporaryDirectory() as folder:
+                            self.run_pipeline(name, df, Path(folder))
+        finally:
+            RECORDER.stop_run()
+
+        for record in RECORDER.records:
+            if not record["name"].startswith("profile."):
+                continue
+            current = measurements.setdefault(record["name"], {"wall_s": np.inf, "rss_increase_mb": 0.0})
+            current["wall_s"] = min(current["wall_s"], record["wall_s"])
+            current["rss_increase_mb"] = max(current["rss_increase_mb"], record["rss_increase_mb"])
+        return measurements
+
+
+    def compare(self, measurements: dict, baseline: dict) -> list[dict]:
+        """
+        Compares measurements with the baseline
+        Parameters:
+            measurements : dict
+                Measurements of the profile by stage
+            baseline : dict
+                Measurements of the baseline by stage
+        Returns:
+            list[dict]
+                Comparison of every stage and metric, 'status' is 'ok', 'regressed',
+                'new' (no baseline) or 'missing' (not measured)
+        """
+        limits = {
+            "wall_s": (self.tolerances["time_ratio"], self.tolerances["time_slack_s"]),
+            "rss_increase_mb": (self.tolerances["memory_ratio"], self.tolerances["memory_slack_mb"])
+        }
+        rows = []
+        for name in sorted(set(measurements) | set(baseline)):
+            for metric, (ratio, slack) in limits.items():
+                current = measurements.get(name, {}).get(metric)
+                expected = baseline.get(name, {}).get(metric)
+                row = {"stage": name, "metric": metric, "baseline": expected, "current": current,
+                       "ratio": None, "limit": None}
+                if expected is None:
+                    row["status"] = "new"
+                elif current is None:
+                    row["status"] = "missing"
+                else:
+                    row["limit"] = expected * ratio + slack
+                    row["ratio"] = current / expected if expected > 0 else None
+                    row["status"] = "regressed" if current > row["limit"] else "ok"
+                rows.append(row)
+        return rows
+
+
+    def save_baseline(self, measurements: dict) -> Path:
+        """
+        Saves measurements as the baseline
+        Parameters:
+            measurements : dict
+                Measurements of the profile by stage
+        Returns:
+            Path
+                Path of the baseline
+        """
+        baseline = {
+            "metadata": {"created_at": datetime.now().isoformat(timespec="seconds"), **environment()},
+            "stages": measurements
+        }
+        self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.baseline_path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        self.logger.info(f"Baseline of {len(measurements)} stages saved to '{self.baseline_path}'")
+        return self.baseline_path
+
+
+    def check(self, measurements: dict, output: Path | None = None) -> int:
+        """
+        Compares measurements with the stored baseline and reports the result
+        Parameters:
+            measurements : dict
+                Measurements of the profile by stage
+            output : Path, optional
+                Path to save the comparison as JSON (default is None - not saved)
+        Returns:
+            int
+                PASSED, REGRESSED (a stage regressed or is missing) or NO_BASELINE
+        """
+        if not self.baseline_path.is_file():
+            self.logger.error(f"Baseline '{self.baseline_path}' not found, create it with --update-baseline")
+            return NO_BASELINE
+        with open(self.baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        rows = self.comparison = self.compare(measurements, baseline["stages"])
+        failed = [row for row in rows if row["status"] in ("regressed", "missing")]
+        changed = {key: (value, baseline["metadata"].get(key)) for key, value in environment().items()
+                   if baseline["metadata"].get(key) != value}
+
+        if output is not None:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            with open(output, "w", encoding="utf-8") as f:
+                json.dump({"environment": environment(), "baseline": baseline["metadata"], "comparison": rows,
+                           "passed": not failed}, f, indent=2)
+
+        table = pd.DataFrame(rows)[["stage", "metric", "baseline", "current", "ratio", "status"]]
+        self.logger.info(f"Regression gate comparison:\n{table.to_string(index=False)}")
+        for key, (current, previous) in changed.items():
+            self.logger.info(f"Environment changed since the baseline: {key} {previous} -> {current}")
+        if failed:
+            for row in failed:
+                self.logger.error(f"{row['stage']} {row['metric']} {row['status']}: "
+                                  f"{row['current']} (baseline {row['baseline']}, limit {row['limit']})")
+            return REGRESSED
+        self.logger.info("No performance regression")
+        return PASSED
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the regression gate:
+    python -m src.benchmarks.regression [--update-baseline]
+    Parameters:
+        argv : list[str], optional
+            Arguments (default is None - sys.argv)
+    Returns:
+        int
+            Exit code: 0 - passed, 1 - regression, 2 - no baseline
+    """
+    parser = argparse.ArgumentParser(description="Performance regression gate against a stored baseline")
+    parser.add_argument("--config", type=Path, default=Path("configs/regression.yaml"), help="Path to the gate YAML file")
+    parser.add_argument("--update-baseline", action="store_true", help="Save the measurements as the new baseline")
+    parser.add_argument("--output", type=Path, default=None, help="Path to save the comparison JSON")
+    args = parser.parse_args(argv)
+
+    gate = RegressionGate(args.config)
+    measurements = gate.run_profile()
+    if args.update_baseline:
+        gate.save_baseline(measurements)
+        return PASSED
+    code = gate.check(measurements, args.output)
+    if gate.comparison:
+        print(pd.DataFrame(gate.comparison).to_string(index=False))
+    print({PASSED: "PASSED", REGRESSED: "REGRESSED", NO_BASELINE: "NO BASELINE"}[code])
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import threading
+import time
+import numpy as np
+import pandas as pd
+import yaml
+from datetime import datetime
+from pathlib import Path
+from src.loader import DataLoader
+from src.serving.server import create_server
+from src.utils.logger import get_logger
+from src.utils.validator import Validator
+
+
+class ServingBenchmark:
+    """
+    Measures the latency per patient of the scoring server (src/serving/server.py) under concurrent load
+    The server is created from the serving configuration and runs in a background thread.
+    Every client thread keeps one connection and posts single raw records back to back,
+    the latency of a request is measured by the client, from sending the request to reading the response.
+    Records:
+    - p50, p95 and p99 latency in milliseconds and requests per second
+    - mean batch size of the micro-batcher
+    - whether p99 is within 'p99_target_ms'
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        config : dict
+            Serving configuration (see configs/serving.yaml)
+        models_dir : Path
+            Directory with the trained models and preprocessors
+        records : list[dict]
+            Raw records sent by the clients (repeated in turn)
+        n_clients : int
+            Number of concurrent clients
+        n_requests : int
+            Number of timed requests of every client
+        p99_target_ms : float
+            Target of the p99 latency in milliseconds
+        save_path : Path
+            Folder to save the results
+    """
+    def __init__(self,
+                 config: dict,
+                 records: list[dict],
+                 models_dir: Path = Path("models"),
+                 n_clients: int = 8,
+                 n_requests: int = 500,
+                 p99_target_ms: float = 10.0,
+                 save_path: Path = Path("results/benchmarks")) -> None:
+        """
+        Initialize the ServingBenchmark class
+        Parameters:
+            config : dict
+                Serving configuration (see configs/serving.yaml)
+            records : list[dict]
+                Raw records sent by the clients
+            models_dir : Path, optional
+                Directory with the trained models and preprocessors (default is 'models')
+            n_clients : int, optional
+                Number of concurrent clients (default is 8)
+            n_requests : int, optional
+                Number of timed requests of every client (default is 500)
+            p99_target_ms : float, optional
+                Target of the p99 latency in milliseconds (default is 10.0)
+            save_path : Path, optional
+                Folder to save the results (default is 'results/benchmarks')
+        Raises:
+            ValueError: If there are no records
+        """
+        if not records:
+            raise ValueError("No records to send")
+        self.logger = get_logger()
+        self.config = {**config, "unix_socket": None, "port": 0}
+        self.models_dir = models_dir
+        self.records = records
+        self.n_clients = n_clients
+        self.n_requests = n_requests
+        self.p99_target_ms = p99_target_ms
+        self.save_path = save_path
+
+
+    def client(self, address: tuple, offset: int, latencies: np.ndarray, errors: list) -> None:
+        """
+        Sends requests over one connection and stores their latency in milliseconds
+        Parameters:
+            address : tuple
+                Host and port of the server
+            offset : int
+                Index of the first record of the client
+            latencies : np.ndarray
+                Latencies of the client, filled in place
+            errors : list
+                Errors of failed requests, appended in place
+        """
+        connection = http.client.HTTPConnection(*address)
+        headers = {"Content-Type": "application/json"}
+        bodies = [json.dumps(record) for record in self.records]
+        try:
+            # Warm-up request, not timed
+            connection.request("POST", "/predict", body=bodies[offset % len(bodies)], headers=headers)
+            connection.getresponse().read()
+
+            for i in range(self.n_requests):
+                start = time.perf_counter()
+                connection.request("POST", "/predict", body=bodies[(offset + i) % len(bodies)], headers=headers)
+                response = connection.getresponse()
+                response.read()
+                latencies[i] = (time.perf_counter() - start) * 1000
+                if response.status != 200:
+                    errors.append(response.status)
+        finally:
+            connection.close()
+
+
+    def run(self) -> dict:
+        """
+        Runs the benchmark and saves the report to 'results/benchmarks/serving_<timestamp>.json'
+        Returns:
+            dict
+                Report with the metadata and the measurements
+        """
+        server = create_server(self.config, self.models_dir)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        latencies = np.full((self.n_clients, self.n_requests), np.nan)
+        errors = []
+        try:
+            clients = [threading.Thread(target=self.client, args=(server.server_address, i, latencies[i], errors))
+                       for i in range(self.n_clients)]
+            batches, records = server.batcher.n_batches, server.batcher.n_records
+            start = time.perf_counter()
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            elapsed = time.perf_counter() - start
+            batches = server.batcher.n_batches - batches
+            records = server.batcher.n_records - records
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.batcher.close()
+
+        done = latencies[~np.isnan(latencies)]
+        p50, p95, p99 = np.percentile(done, [50, 95, 99]) if len(done) else (np.nan,) * 3
+        results = {
+            "requests": int(len(done)),
+            "errors": len(errors),
+            "requests_per_s": len(done) / elapsed if elapsed > 0 else None,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(done.max()) if len(done) else None,
+            "mean_batch_size": records / batches if batches else None,
+            "p99_target_ms": self.p99_target_ms,
+            "p99_within_target": bool(p99 <= self.p99_target_ms)
+        }
+        report = {
+            "metadata": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "preprocessing_type": self.config["preprocessing_type"],
+                "model": self.config["model"],
+                "engine": self.config.get("engine", "sklearn"),
+                "fast_transform": self.config.get("fast_transform", True),
+                "batching": self.config.get("batching", {}),
+                "n_clients": self.n_clients,
+                "n_requests": self.n_requests
+            },
+            "results": results
+        }
+
+        self.save_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.save_path / f"serving_{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        status = "within" if results["p99_within_target"] else "above"
+        self.logger.info(f"Serving benchmark saved to '{file_path}': {results['requests_per_s']:.0f} requests/s, "
+                         f"p99 {p99:.2f} ms ({status} the {self.p99_target_ms} ms target)")
+        return report
+
+
+def main() -> None:
+    """
+    Runs the serving benchmark against the trained model of the serving configuration:
+    python -m src.benchmarks.serving --clients 8 --requests 500
+    """
+    parser = argparse.ArgumentParser(description="Latency per patient of the scoring server under concurrent load")
+    parser.add_argument("--config", type=Path, default=Path("configs/serving.yaml"), help="Path to the serving YAML file")
+    parser.add_argument("--clients", type=int, default=8, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="Number of timed requests of every client")
+    parser.add_argument("--models-dir", type=Path, default=Path("models"), help="Directory with the trained models")
+    parser.add_argument("--input", type=Path, default=Path("data/raw/heart-diseases.csv"), help="Raw records to send")
+    parser.add_argument("--output", type=Path, default=Path("results/benchmarks"), help="Folder of the JSON report")
+    args = parser.parse_args()
+
+    Validator().check_file_exists(args.config)
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    df = DataLoader(args.input).load().drop(columns=["HeartDisease"])
+    records = json.loads(df.to_json(orient="records"))
+
+    benchmark = ServingBenchmark(config, records, args.models_dir, n_clients=args.clients, n_requests=args.requests,
+                                 p99_target_ms=config.get("benchmark", {}).get("p99_target_ms", 10.0),
+                                 save_path=args.output)
+    print(pd.Series(benchmark.run()["results"]).to_string())
+
+
+if __name__ == "__main__":
+    main()
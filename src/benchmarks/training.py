@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import sklearn
+import yaml
+from datetime import datetime
+from pathlib import Path
+from src.benchmarks.preprocessing import PIPELINES
+from src.loader import DataLoader
+from src.models.training import Models
+from src.utils.logger import get_logger
+from src.utils.memory import PeakMemory
+from src.utils.synthetic import SyntheticGenerator
+
+
+def effective_cores(n_jobs: int | None) -> int:
+    """
+    Returns the number of worker processes of a joblib n_jobs setting (-1 - all CPUs, -2 - all but one)
+    """
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(n_cpus + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def pooled_time(cv_results: dict, name: str) -> tuple[float, float]:
+    """
+    Pools the per-candidate mean and std of a time in cv_results_ into the mean and std over all real fits
+    (or scores). Shared-fit searches (see src/models/search.GridEvaluator) record 0.0 fit time for candidates
+    scored from the fit of another candidate and count the real fits in the 'n_fits' column,
+    these zeros are not fits and are left out. Without 'n_fits' every candidate is fitted on every fold
+    Parameters:
+        cv_results : dict
+            cv_results_ of a search
+        name : str
+            'fit' or 'score'
+    Returns:
+        tuple[float, float]
+            Mean and std of the time of one fit in seconds
+    """
+    mean = np.asarray(cv_results[f"mean_{name}_time"], dtype=np.float64)
+    std = np.asarray(cv_results[f"std_{name}_time"], dtype=np.float64)
+    n_splits = max(sum(key.startswith("split") and key.endswith("_test_score") for key in cv_results), 1)
+    counts = np.full(len(mean), n_splits)
+    if name == "fit" and "n_fits" in cv_results:
+        counts = np.asarray(cv_results["n_fits"])
+    n = counts.sum()
+    if n == 0:
+        return 0.0, 0.0
+
+    # Sum and sum of squares over the folds, recorded zeros add nothing to them
+    total = (mean * n_splits).sum()
+    squares = ((std ** 2 + mean ** 2) * n_splits).sum()
+    overall = total / n
+    variance = squares / n - overall ** 2
+    return float(overall), float(np.sqrt(max(variance, 0.0)))
+
+
+class TrainingBenchmark:
+    """
+    Measures hyperparameter search of every model of 'configs/models.yaml'
+    across dataset sizes and 'gridsearch.n_jobs' settings.
+    Every (size, n_jobs, model) is trained with its own Models instance (no checkpoints resumed)
+    on synthetic data (see src/utils/synthetic.py) processed by one preprocessing pipeline, and records:
+    - search time (Models.results), total time of train_models (with saving)
+    - number of fits and candidates, mean/std fit and score time of one fit (cv_results_)
+    - peak RSS of the main process (worker processes of n_jobs are not included)
+    - speedup and efficiency per core against the smallest n_jobs of the same model and size
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        generator : SyntheticGenerator
+            Fitted generator of the datasets
+        sizes : list[int]
+            Numbers of generated rows, ascending (preprocessing may remove some of them)
+        n_jobs : list[int]
+            n_jobs settings of the searches
+        pipeline : str
+            Preprocessing pipeline of the datasets (see src/benchmarks/preprocessing.PIPELINES)
+        config : dict
+            Models configuration
+        model_names : list[str]
+            Benchmarked models
+        save_path : Path
+            Folder to save the results
+        seed : int
+            Seed of the datasets
+        results : list[dict]
+            Measurements, one per size, n_jobs and model
+    """
+    def __init__(self,
+                 generator: SyntheticGenerator,
+                 sizes: list[int] = (1_000, 4_000),
+                 n_jobs: list[int] = (1, -1),
+                 pipeline: str = "standard",
+                 config_path: Path = Path("configs/models.yaml"),
+                 model_names: list[str] | None = None,
+                 save_path: Path = Path("results/benchmarks"),
+                 seed: int = 0) -> None:
+        """
+        Initialize the TrainingBenchmark class
+        Parameters:
+            generator : SyntheticGenerator
+                Fitted generator of the datasets
+            sizes : list[int], optional
+                Numbers of generated rows (default is (1000, 4000))
+            n_jobs : list[int], optional
+                n_jobs settings of the searches (default is (1, -1))
+            pipeline : str, optional
+                Preprocessing pipeline (default is 'standard')
+            config_path : Path, optional
+                Path to the models YAML file (default is 'configs/models.yaml')
+            model_names : list[str], optional
+                Models to benchmark (default is None - all models of the configuration)
+            save_path : Path, optional
+                Folder to save the results (default is 'results/benchmarks')
+            seed : int, optional
+                Seed of the datasets (default is 0)
+        Raises:
+            ValueError: If the pipeline or a model is unknown
+        """
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline {pipeline}, expected {list(PIPELINES)}")
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.config = yaml.safe_load(f)
+        self.model_names = list(model_names or self.config["models"])
+        unknown = set(self.model_names) - set(self.config["models"])
+        if unknown:
+            raise ValueError(f"Unknown models {sorted(unknown)}, expected {list(self.config['models'])}")
+
+        self.logger = get_logger()
+        self.generator = generator
+        self.sizes = sorted(sizes)
+        self.n_jobs = sorted(n_jobs, key=effective_cores)
+        self.pipeline = pipeline
+        self.save_path = save_path
+        self.seed = seed
+        self.results = []
+
+
+    def prepare_data(self, n_rows: int, index: int) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Generates and preprocesses a dataset
+        Parameters:
+            n_rows : int
+                Number of generated rows
+            index : int
+                Index of the size, seeds the dataset
+        Returns:
+            tuple[pd.DataFrame, pd.Series]
+                Features and labels
+        """
+        df = self.generator.sample(n_rows, np.random.default_rng([self.seed, index]))
+        preprocessor = PIPELINES[self.pipeline](df)
+        preprocessor.run()
+        target = preprocessor.target
+        return preprocessor.df.drop(columns=[target]).astype(float), preprocessor.df[target]
+
+
+    def write_config(self, name: str, n_jobs: int, folder: Path) -> Path:
+        """
+        Writes the configuration of one model with the n_jobs setting
+        """
+        config = {
+            "models": {name: self.config["models"][name]},
+            "gridsearch": {**self.config["gridsearch"], "n_jobs": n_jobs},
+            "persistence": self.config.get("persistence", {})
+        }
+        path = folder / f"{name}_{n_jobs}.yaml"
+        path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        return path
+
+
+    def benchmark_model(self, name: str, n_jobs: int, X: pd.DataFrame, y: pd.Series, folder: Path) -> dict:
+        """
+        Trains one model and measures the search
+        Parameters:
+            name : str
+                Name of the model
+            n_jobs : int
+                n_jobs setting of the search
+            X : pd.DataFrame
+                Features
+            y : pd.Series
+                Labels
+            folder : Path
+                Temporary folder of the configuration and the saved models
+        Returns:
+            dict
+                Row of the results
+        """
+        config_path = self.write_config(name, n_jobs, folder)
+        models = Models(X, y, preprocessing_type=self.pipeline, config_path=config_path, resume=False,
+                        models_dir=folder / "models")
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            models.train_models()
+            total_time = time.perf_counter() - start
+
+        results, cv_results = models.results[name], models.cv_results[name]
+        fit_mean, fit_std = pooled_time(cv_results, "fit")
+        score_mean, score_std = pooled_time(cv_results, "score")
+        row = {
+            "model": name,
+            "rows": len(X),
+            "n_jobs": n_jobs,
+            "cores": effective_cores(n_jobs),
+            "search_time": results["search_time"],
+            "total_time": total_time,
+            "n_fits": results["n_fits"],
+            "n_candidates": len(cv_results["params"]),
+            "fit_time_mean": fit_mean,
+            "fit_time_std": fit_std,
+            "score_time_mean": score_mean,
+            "score_time_std": score_std,
+            "peak_rss_mb": memory.peak / 2 ** 20,
+            "rss_increase_mb": memory.increase / 2 ** 20,
+            "best_score": results["best_score"]
+        }
+        self.logger.info(f"{name} on {len(X)} rows with n_jobs={n_jobs}: search {row['search_time']:.2f}s, "
+                         f"{row['n_fits']} fits")
+        return row
+
+
+    def add_scaling(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds speedup and efficiency per core against the fewest cores of the same model and size
+        Parameters:
+            df : pd.DataFrame
+                Results
+        Returns:
+            pd.DataFrame
+                Results with 'speedup' and 'efficiency' columns
+        """
+        base = df.sort_values("cores").groupby(["model", "rows"])[["search_time", "cores"]].transform("first")
+        df["speedup"] = base["search_time"] / df["search_time"]
+        df["efficiency"] = df["speedup"] / (df["cores"] / base["cores"])
+        return df
+
+
+    def scaling_table(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the efficiency per core by model and size (rows) and number of cores (columns)
+        """
+        return df.pivot_table(index=["model", "rows"], columns="cores", values="efficiency")
+
+
+    def run(self) -> dict:
+        """
+        Runs the benchmark and saves the report to 'results/benchmarks/training_<timestamp>.json'
+        and the scaling table to 'results/benchmarks/training_<timestamp>_scaling.csv'
+        Returns:
+            dict
+                Report with the metadata and the measurements
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            for i, n_rows in enumerate(self.sizes):
+                X, y = self.prepare_data(n_rows, i)
+                for n_jobs in self.n_jobs:
+                    for name in self.model_names:
+                        self.results.append(self.benchmark_model(name, n_jobs, X, y, Path(folder)))
+
+        df = self.add_scaling(pd.DataFrame(self.results))
+        self.results = df.to_dict(orient="records")
+        report = {
+            "metadata": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "scikit-learn": sklearn.__version__,
+                "pipeline": self.pipeline,
+                "sizes": self.sizes,
+                "n_jobs": self.n_jobs,
+                "gridsearch": self.config["gridsearch"],
+                "seed": self.seed
+            },
+            "results": self.results
+        }
+
+        self.save_path.mkdir(parents=True, exist_ok=True)
+        stamp = f"{datetime.now():%Y%m%d-%H%M%S}"
+        file_path = self.save_path / f"training_{stamp}.json"
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=float)
+        table = self.scaling_table(df)
+        table.to_csv(self.save_path / f"training_{stamp}_scaling.csv")
+        self.logger.info(f"Training benchmark saved to '{file_path}', efficiency per core:\n{table}")
+        return report
+
+
+def main() -> None:
+    """
+    Runs the training benchmark:
+    python -m src.benchmarks.training --sizes 1000 4000 --n-jobs 1 2 4 -1
+    """
+    parser = argparse.ArgumentParser(description="Training and search benchmark on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 4_000], help="Numbers of generated rows")
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1], help="n_jobs settings of the searches")
+    parser.add_argument("--models", nargs="+", default=None, help="Models to benchmark (default all)")
+    parser.add_argument("--pipeline", default="standard", choices=list(PIPELINES), help="Preprocessing pipeline")
+    parser.add_argument("--config", type=Path, default=Path("configs/models.yaml"), help="Path to the models YAML file")
+    parser.add_argument("--output", type=Path, default=Path("results/benchmarks"), help="Folder of the results")
+    parser.add_argument("--input", type=Path, default=Path("data/raw/heart-diseases.csv"), help="Raw data of the generator")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    generator = SyntheticGenerator(DataLoader(args.input).load(), seed=args.seed).fit()
+    benchmark = TrainingBenchmark(generator, args.sizes, args.n_jobs, args.pipeline, args.config, args.models,
+                                  args.output, args.seed)
+    report = benchmark.run()
+    print(benchmark.scaling_table(pd.DataFrame(report["results"])).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from src.utils.validator import Validator
 from logging import Logger
 from src.utils.logger import get_logger
 from pathlib import Path
+from src.utils.instrumentation import instrument
 
 
 class DataLoader:
@@ -36,6 +37,7 @@ class DataLoader:
         self.df: pd.DataFrame | None = None
 
 
+    @instrument()
     def load(self) -> pd.DataFrame:
         """
         Load CSV file into pandas DataFrame
@@ -0,0 +1,159 @@
+import struct
+import zipfile
+import numpy as np
+from collections.abc import Mapping
+from pathlib import Path
+
+# Name of the row IDs column, reserved in every columns file
+ROW_IDS = "row_ids"
+
+# Fixed part of a zip local file header (signature, versions, flags, sizes, name and extra lengths)
+LOCAL_HEADER = struct.Struct("<4s5H3I2H")
+
+
+def save_columns(path: Path, columns: dict, row_ids: np.ndarray) -> Path:
+    """
+    Saves columns of equal length as one contiguous array per column in an uncompressed .npz file
+    Uncompressed members can be memory-mapped directly from the archive (see ColumnReader)
+    Parameters:
+        path : Path
+            Path of the file to save
+        columns : dict
+            Arrays by column name (e.g. predictions by model name)
+        row_ids : np.ndarray
+            IDs of the rows (e.g. indices of the test rows in the processed data)
+    Returns:
+        Path
+            Path of the saved file
+    Raises:
+        ValueError: If a column is named as the row IDs or has another length
+    """
+    if ROW_IDS in columns:
+        raise ValueError(f"Column name '{ROW_IDS}' is reserved")
+    row_ids = np.asarray(row_ids)
+    for name, values in columns.items():
+        if len(values) != len(row_ids):
+            raise ValueError(f"Column {name} has {len(values)} rows, expected {len(row_ids)}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, **{ROW_IDS: row_ids}, **{name: np.ascontiguousarray(values) for name, values in columns.items()})
+    return path
+
+
+class ColumnReader(Mapping):
+    """
+    Dictionary-like lazy access to the columns of a file saved with save_columns
+    Only the zip directory is read on opening. A column is memory-mapped from its offset
+    in the archive on first access (or read, for compressed members or mmap_mode=None),
+    so looking at one column never loads the others
+    Attributes:
+        path : Path
+            Path of the columns file
+        mmap_mode : str or None
+            Memory-map mode of the columns ('r' or 'c', None reads the columns into memory)
+        members : dict
+            Zip members by column name
+        loaded : dict
+            Loaded columns by column name
+    """
+    def __init__(self, path: Path, mmap_mode: str | None = "r") -> None:
+        """
+        Initialize the ColumnReader class
+        Parameters:
+            path : Path
+                Path of the columns file
+            mmap_mode : str, optional
+                Memory-map mode of the columns (default is 'r')
+        """
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with zipfile.ZipFile(path) as archive:
+            self.members = {info.filename.removesuffix(".npy"): info for info in archive.infolist()}
+        self.loaded = {}
+
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        """
+        Returns the IDs of the rows
+        """
+        return self.read(ROW_IDS)
+
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Returns the column, loading it on first access
+        Parameters:
+            name : str
+                Name of the column
+        Returns:
+            np.ndarray
+                Values of the column
+        """
+        if name == ROW_IDS or name not in self.members:
+            raise KeyError(name)
+        return self.read(name)
+
+
+    def __iter__(self):
+        return (name for name in self.members if name != ROW_IDS)
+
+
+    def __len__(self) -> int:
+        return len(self.members) - (ROW_IDS in self.members)
+
+
+    def read(self, name: str) -> np.ndarray:
+        """
+        Memory-maps or reads one member of the archive
+        Parameters:
+            name : str
+                Name of the column
+        Returns:
+            np.ndarray
+                Values of the column
+        """
+        if name in self.loaded:
+            return self.loaded[name]
+
+        info = self.members[name]
+        if self.mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+            with np.load(self.path, allow_pickle=False) as data:
+                values = data[name]
+        else:
+            with open(self.path, "rb") as f:
+                # Data of the member starts after its local header, name and extra field
+                f.seek(info.header_offset)
+                header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+                f.seek(header[-2] + header[-1], 1)
+
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                offset = f.tell()
+            if dtype.hasobject:
+                raise ValueError(f"Column {name} of {self.path} holds Python objects")
+            if not np.prod(shape):
+                values = np.empty(shape, dtype=dtype)
+            else:
+                values = np.memmap(self.path, dtype=dtype, mode=self.mmap_mode, offset=offset, shape=shape,
+                                   order="F" if fortran_order else "C")
+        self.loaded[name] = values
+        return values
+
+
+def load_columns(path: Path) -> dict:
+    """
+    Reads all columns of a file saved with save_columns into memory
+    Parameters:
+        path : Path
+            Path of the columns file
+    Returns:
+        dict
+            Arrays by column name, row IDs under 'row_ids'
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
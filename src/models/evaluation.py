@@ -2,8 +2,12 @@ import importlib
 import numpy as np
 import pandas as pd
 import yaml
-import joblib
 from pathlib import Path
+from src.models.artifacts import save_columns
+from src.models.metrics import (bootstrap_intervals, confusion_counts, get_count_metric, get_score_metric,
+                                threshold_curve)
+from src.models.store import ModelStore
+from src.utils.instrumentation import annotate, instrument
 from src.utils.logger import get_logger
 from src.utils.validator import Validator
 
@@ -18,6 +22,7 @@ class Evaluate:
     - F2
     - ROC-AUC
     Metrics configuration is defined in 'configs/metrics.yaml'
+    Evaluation settings are defined in the 'evaluation' section of the same file
     Attributes:
         validator : Validator
             Validator instance for validating input data
@@ -31,18 +36,28 @@ class Evaluate:
             Type of preprocessing used
         config_path : Path
             Path to the metrics YAML file (default is 'configs/metrics.yaml')
-        models : dict
-            Dictionary of models
+        mmap_mode : str or None
+            Memory-map mode used to load the models (see ModelStore)
+        row_ids : np.ndarray
+            IDs of the test rows saved with predictions and scores
+        models : ModelStore
+            Dictionary-like store of models, loaded on first access
         config : dict
             Dictionary of configuration parameters
         metrics : dict
             Dictionary of metrics to use
+        settings : dict
+            Evaluation settings ('evaluation' section of the config)
     """
     def __init__(self,
                  X_test: pd.DataFrame,
                  y_test: pd.Series,
                  preprocessing_type: str,
-                 config_path: Path = Path('configs/metrics.yaml')) -> None:
+                 config_path: Path = Path('configs/metrics.yaml'),
+                 mmap_mode: str | None = None,
+                 row_ids: np.ndarray | None = None,
+                 models_dir: Path = Path("models"),
+                 save_dir: Path = Path("results")) -> None:
         """
         Initialize the Evaluate class
         Parameters:
@@ -54,6 +69,15 @@ class Evaluate:
                 Type of preprocessing used
             config_path : Path
                 Path to the metrics YAML file (default is 'configs/metrics.yaml')
+            mmap_mode : str, optional
+                Memory-map mode used to load the models, e.g. 'r' (default is None)
+            row_ids : np.ndarray, optional
+                IDs of the test rows saved with predictions and scores
+                (default is None - index of the test DataFrame or positions of the rows)
+            models_dir : Path, optional
+                Directory with the trained models (default is 'models')
+            save_dir : Path, optional
+                Directory to save the results (default is 'results')
         """
         # Component initialization
         self.validator = Validator()
@@ -64,6 +88,10 @@ class Evaluate:
         self.y_test = y_test
         self.preprocessing_type = preprocessing_type
         self.config_path = config_path.resolve()
+        self.mmap_mode = mmap_mode
+        if row_ids is None:
+            row_ids = X_test.index.to_numpy() if isinstance(X_test, pd.DataFrame) else np.arange(len(X_test))
+        self.row_ids = np.asarray(row_ids)
         self.models = {}
         self.metrics = {}
 
@@ -74,10 +102,12 @@ class Evaluate:
         # Load configuration from YAML file
         with open(config_path, "r", encoding="utf-8") as f:
             self.config = yaml.safe_load(f)
+        self.settings = self.config.get("evaluation", {})
 
         # Set path to save results and loading models
-        self.models_path = Path("models") / self.preprocessing_type
-        self.save_path = Path("results")
+        # (absolute, so the instance can be sent to worker processes, see src/models/runner.py)
+        self.models_path = models_dir.resolve() / self.preprocessing_type
+        self.save_path = save_dir.resolve()
         self.save_path.mkdir(parents=True, exist_ok=True)
 
         # Calling a methods for loading metrics and models
@@ -105,77 +135,280 @@ class Evaluate:
     def load_metrics(self) -> None:
         """
         Loads metrics and creates a dictionary with settings
+        Metrics of the predicted labels with a count-based equivalent (see src/models/metrics.py)
+        get 'counts_fn', they are derived from the confusion counts computed once per model.
+        Metrics of the scores with a weighted equivalent get 'weighted_fn' (used by the bootstrap)
         """
         for metric_name, config in self.config["metrics"].items():
+            params = config.get("params", {})
             self.metrics[metric_name] = {
                 "fn": self.get_class_from_string(config["class"]),
-                "params": config.get("params", {})
+                "params": params,
+                "counts_fn": get_count_metric(config["class"], params),
+                "weighted_fn": get_score_metric(config["class"], params)
             }
 
     def load_trained_models(self) -> None:
         """
-        Loads trained models and create dictionary with them
+        Creates the store of trained models
+        Models are loaded on first access, not here
         """
-        for model in self.models_path.glob('*.joblib'):
-            model_name = model.stem
-            self.models[model_name] = joblib.load(model)
-            self.logger.info(f'Loaded {model_name} model')
+        self.models = ModelStore(self.models_path, mmap_mode=self.mmap_mode)
+        self.logger.info(f'Found models: {list(self.models)}')
 
 
+    @staticmethod
+    def predict_chunk(model, X) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Computes scores and predictions of the model for one chunk in one inference pass
+        Predictions are derived from the scores (argmax of predict_proba, decision_function > 0),
+        models without scores use predict
+        Parameters:
+            model : object
+                Trained model
+            X : pd.DataFrame
+                Chunk of the test data
+        Returns:
+            tuple[np.ndarray, np.ndarray | None]
+                Predictions and scores of the class 1 (None if the model has no scores)
+        """
+        if hasattr(model, 'predict_proba'):
+            proba = model.predict_proba(X)
+            return model.classes_[np.argmax(proba, axis=1)], proba[:, 1]
+        if hasattr(model, 'decision_function'):
+            y_score = model.decision_function(X)
+            return model.classes_[(y_score > 0).astype(int)], y_score
+        return model.predict(X), None
+
+
+    def predict_scores(self, model_name: str, model, X) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Computes scores and predictions of the model in one inference pass
+        With 'batch_size' set, the test data is streamed through the model in chunks
+        and results are written into preallocated arrays, so temporaries of the model
+        (e.g. KNN distance matrices) are bounded by the chunk size.
+        X can be a memory-mapped array (see src/utils/splitter.load_split), chunks are converted
+        to DataFrames with the feature names of the model.
+        Derived predictions are checked against predict on the first 'check_rows' rows,
+        on mismatch predict is used for all rows
+        Parameters:
+            model_name : str
+                Name of the model
+            model : object
+                Trained model
+            X : pd.DataFrame or np.ndarray
+                Test data
+        Returns:
+            tuple[np.ndarray, np.ndarray | None]
+                Predictions and scores of the class 1 (None if the model has no scores)
+        """
+        n_rows = len(X)
+        batch_size = self.settings.get("batch_size") or max(n_rows, 1)
+        check_rows = self.settings.get("check_rows", 100)
+        y_pred, y_score = None, None
+        use_predict = False
+
+        for start in range(0, n_rows, batch_size):
+            chunk = self.get_chunk(model, X, start, start + batch_size)
+            pred, score = self.predict_chunk(model, chunk)
+
+            # Equivalence check with predict on the first chunk
+            if start == 0 and check_rows and score is not None:
+                if not np.array_equal(model.predict(chunk[:check_rows]), pred[:check_rows]):
+                    self.logger.warning(f"Predictions of {model_name} derived from scores differ from predict, "
+                                        f"predict is used")
+                    use_predict = True
+            if use_predict:
+                pred = model.predict(chunk)
+
+            # Preallocate results on the first chunk
+            if start == 0:
+                y_pred = np.empty(n_rows, dtype=pred.dtype)
+                y_score = np.empty(n_rows, dtype=np.float64) if score is not None else None
+            y_pred[start:start + len(pred)] = pred
+            if y_score is not None:
+                y_score[start:start + len(score)] = score
+        return y_pred, y_score
+
+
+    def get_chunk(self, model, X, start: int, stop: int):
+        """
+        Returns rows [start, stop) of the test data as the model expects them
+        Parameters:
+            model : object
+                Trained model
+            X : pd.DataFrame or np.ndarray
+                Test data
+            start : int
+                First row
+            stop : int
+                Row after the last one
+        Returns:
+            pd.DataFrame or np.ndarray
+                Chunk of the test data
+        """
+        if isinstance(X, pd.DataFrame):
+            return X.iloc[start:stop]
+        chunk = np.asarray(X[start:stop])
+        if hasattr(model, 'feature_names_in_'):
+            return pd.DataFrame(chunk, columns=model.feature_names_in_)
+        return chunk
+
+
+    def score_model(self, model_name: str, model) -> tuple[dict, np.ndarray, np.ndarray | None]:
+        """
+        Scores one model on the test data and computes the configured metrics
+        Parameters:
+            model_name : str
+                Name of the model
+            model : object
+                Trained model
+        Returns:
+            tuple[dict, np.ndarray, np.ndarray | None]
+                Row of metrics, predictions and scores of the class 1 (None if the model has no scores)
+        """
+        y_pred, y_score = self.predict_scores(model_name, model, self.X_test)
+        counts = confusion_counts(self.y_test, y_pred)
+
+        row = {"model": model_name}
+        for metric_name, metric_data in self.metrics.items():
+            metric_fn = metric_data['fn']
+            params = metric_data['params']
+
+            if metric_data['counts_fn'] is not None:
+                row[metric_name] = float(metric_data['counts_fn'](counts))
+            elif metric_name == 'roc_auc':
+                if y_score is not None:
+                    row[metric_name] = metric_fn(self.y_test, y_score, **params)
+                else:
+                    row[metric_name] = None
+            else:
+                row[metric_name] = metric_fn(self.y_test, y_pred, **params)
+
+        # Bootstrap confidence intervals next to the point estimates
+        if self.settings.get("bootstrap", {}).get("n_resamples"):
+            intervals = self.bootstrap(y_pred, y_score)
+            point_estimates, row = row, {"model": model_name}
+            for metric_name in self.metrics:
+                low, high = intervals.get(metric_name, (None, None))
+                row[metric_name] = point_estimates[metric_name]
+                row[f"{metric_name}_ci_low"] = low
+                row[f"{metric_name}_ci_high"] = high
+        return row, y_pred, y_score
+
+
+    def bootstrap(self, y_pred: np.ndarray, y_score: np.ndarray | None) -> dict:
+        """
+        Computes bootstrap confidence intervals of the metrics with a count-based or weighted equivalent
+        Settings are defined in the 'bootstrap' section of the evaluation settings
+        ('n_resamples', 'confidence', 'seed'), every model gets the same resamples
+        Parameters:
+            y_pred : np.ndarray
+                Predictions of the model
+            y_score : np.ndarray or None
+                Scores of the class 1
+        Returns:
+            dict
+                Lower and upper bounds by metric name
+        """
+        settings = self.settings["bootstrap"]
+        count_metrics = {name: data["counts_fn"] for name, data in self.metrics.items() if data["counts_fn"]}
+        score_metrics = {name: data["weighted_fn"] for name, data in self.metrics.items() if data["weighted_fn"]}
+        return bootstrap_intervals(self.y_test, y_pred, y_score, count_metrics, score_metrics,
+                                   n_resamples=settings["n_resamples"],
+                                   confidence=settings.get("confidence", 0.95),
+                                   seed=settings.get("seed", 0))
+
+
+    @instrument()
     def evaluate(self) -> None:
         """
         Evaluates trained models on the test data
         Computes configured metrics, saves metrics table, predictions and scores (if exists)
         """
+        annotate(rows_in=len(self.X_test))
         metrics = []
         y_scores = {}
         y_predictions = {}
 
-        # Get predictions on the test
+        # Get predictions, scores and metrics on the test
         for model_name, model in self.models.items():
-            y_pred = model.predict(self.X_test)
+            row, y_pred, y_score = self.score_model(model_name, model)
+            metrics.append(row)
             y_predictions[model_name] = y_pred
-
-            # Get scores
-            if hasattr(model, 'predict_proba'):
-                y_score = model.predict_proba(self.X_test)[:, 1]
-            elif hasattr(model, 'decision_function'):
-                y_score = model.decision_function(self.X_test)
-            else:
-                y_score = None
-
             if y_score is not None:
                 y_scores[model_name] = y_score
 
-            # Get metrics
-            row = {"model": model_name}
-            for metric_name, metric_data in self.metrics.items():
-                metric_fn = metric_data['fn']
-                params = metric_data['params']
-
-                if metric_name == 'roc_auc':
-                    if y_score is not None:
-                        row[metric_name] = metric_fn(self.y_test, y_score, **params)
-                    else:
-                        row[metric_name] = None
-                else:
-                    row[metric_name] = metric_fn(self.y_test, y_pred, **params)
+            # The model is not needed after scoring
+            self.models.release(model_name)
 
-            metrics.append(row)
+        self.save_results(metrics, y_predictions, y_scores)
+        self.analyze_thresholds(y_scores)
 
+
+    @instrument()
+    def save_results(self, metrics: list[dict], y_predictions: dict, y_scores: dict) -> None:
+        """
+        Saves metrics table, predictions and scores (if exists)
+        Predictions and scores are columnar .npz files with the row IDs, readable
+        one model at a time with src.models.artifacts.ColumnReader
+        Parameters:
+            metrics : list[dict]
+                Rows of metrics, one per model
+            y_predictions : dict
+                Predictions by model name
+            y_scores : dict
+                Scores of the class 1 by model name
+        """
         # Save metrics
         df_metrics = pd.DataFrame(metrics)
         file_path = self.save_path / f'{self.preprocessing_type}_metrics.csv'
         df_metrics.to_csv(file_path, index=False)
         self.logger.info(f"Metrics saved to '{file_path}':\n{df_metrics}")
 
-        # Save predictions
-        predictions_file = self.save_path / f'{self.preprocessing_type}_y_predict.npy'
-        np.save(predictions_file, y_predictions)
+        # Save predictions and scores, one column per model (see src/models/artifacts.py)
+        predictions_file = self.save_path / f'{self.preprocessing_type}_predictions.npz'
+        save_columns(predictions_file, y_predictions, self.row_ids)
         self.logger.info(f"Predictions saved to {predictions_file}")
 
-        # Save scores
         if y_scores:
-            scores_file = self.save_path / f'{self.preprocessing_type}_y_scores.npy'
-            np.save(scores_file, y_scores)
-            self.logger.info(f"Scores saved to {scores_file}")
\ No newline at end of file
+            scores_file = self.save_path / f'{self.preprocessing_type}_scores.npz'
+            save_columns(scores_file, y_scores, self.row_ids)
+            self.logger.info(f"Scores saved to {scores_file}")
+
+
+    @instrument()
+    def analyze_thresholds(self, y_scores: dict) -> None:
+        """
+        Sweeps all distinct thresholds of the scores of every model (see metrics.threshold_curve)
+        Saves the curves and the F-beta optimal threshold of every model
+        Settings are defined in the 'thresholds' section of the evaluation settings ('enabled', 'beta')
+        Parameters:
+            y_scores : dict
+                Scores of the class 1 by model name
+        """
+        settings = self.settings.get("thresholds", {})
+        if not settings.get("enabled", True) or not y_scores:
+            return
+
+        beta = settings.get("beta", 2)
+        fbeta_name = f"f{beta:g}"
+        curves = []
+        best = []
+        for model_name, y_score in y_scores.items():
+            curve = pd.DataFrame(threshold_curve(self.y_test, y_score, beta=beta)).rename(columns={"fbeta": fbeta_name})
+            curve.insert(0, "model", model_name)
+            curves.append(curve)
+            # Highest threshold among the equally good ones
+            best.append(curve.iloc[curve[fbeta_name].to_numpy().argmax()])
+
+        # Save curves
+        curves_file = self.save_path / f'{self.preprocessing_type}_threshold_curve.csv'
+        pd.concat(curves, ignore_index=True).to_csv(curves_file, index=False)
+        self.logger.info(f"Threshold curves saved to {curves_file}")
+
+        # Save the best thresholds
+        df_best = pd.DataFrame(best).reset_index(drop=True)
+        best_file = self.save_path / f'{self.preprocessing_type}_best_thresholds.csv'
+        df_best.to_csv(best_file, index=False)
+        self.logger.info(f"Best {fbeta_name} thresholds saved to '{best_file}':\n{df_best}")
@@ -0,0 +1,276 @@
+import json
+import numpy as np
+from pathlib import Path
+
+# Version of the compact format, increased on incompatible changes
+FORMAT_VERSION = 1
+
+TREE_ENSEMBLES = ("RandomForestClassifier", "ExtraTreesClassifier", "GradientBoostingClassifier", "AdaBoostClassifier")
+
+
+def export_linear(model) -> tuple[dict, dict]:
+    """
+    Exports a linear model (LogisticRegression, SVC with linear kernel) to a coefficient vector
+    score = X @ coef + intercept
+    Parameters:
+        model : object
+            Fitted linear model
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    """
+    link = "logistic" if type(model).__name__ == "LogisticRegression" else "decision"
+    meta = {"kind": "linear", "link": link}
+    arrays = {
+        "coef": np.asarray(model.coef_, dtype=np.float64).ravel(),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64).ravel()
+    }
+    return meta, arrays
+
+
+def export_kernel_svm(model) -> tuple[dict, dict]:
+    """
+    Exports SVC with a non-linear kernel to support vectors and dual coefficients
+    score = dual_coef @ K(support_vectors, X) + intercept
+    Parameters:
+        model : object
+            Fitted SVC
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    """
+    if model.kernel not in ("rbf", "poly", "sigmoid"):
+        raise ValueError(f"SVC kernel {model.kernel} is not supported")
+
+    meta = {
+        "kind": "kernel_svm",
+        "link": "decision",
+        "kernel": model.kernel,
+        "gamma": float(model._gamma),
+        "degree": int(model.degree),
+        "coef0": float(model.coef0)
+    }
+    arrays = {
+        "support_vectors": np.asarray(model.support_vectors_, dtype=np.float64),
+        "dual_coef": np.asarray(model.dual_coef_, dtype=np.float64).ravel(),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64).ravel()
+    }
+    return meta, arrays
+
+
+def export_knn(model) -> tuple[dict, dict]:
+    """
+    Exports KNeighborsClassifier to its training data and encoded labels
+    Parameters:
+        model : object
+            Fitted KNeighborsClassifier
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    """
+    if model.effective_metric_ not in ("euclidean", "manhattan", "minkowski") or callable(model.weights):
+        raise ValueError(f"KNN with metric {model.effective_metric_} and weights {model.weights} is not supported")
+
+    p = {"euclidean": 2, "manhattan": 1}.get(model.effective_metric_, model.effective_metric_params_.get("p", model.p))
+    meta = {"kind": "knn", "n_neighbors": int(model.n_neighbors), "weights": model.weights, "p": float(p)}
+    arrays = {
+        "fit_X": np.asarray(model._fit_X, dtype=np.float64),
+        "y": np.asarray(model._y, dtype=np.int32)
+    }
+    return meta, arrays
+
+
+def floor_float32(values: np.ndarray) -> np.ndarray:
+    """
+    Converts thresholds to the largest float32 not greater than the float64 value
+    Trees compare float32 inputs with float64 thresholds, with rounded down thresholds
+    'x <= threshold' gives the same result for every float32 x
+    Parameters:
+        values : np.ndarray
+            float64 thresholds
+    Returns:
+        np.ndarray
+            float32 thresholds
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def breadth_first_order(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """
+    Orders the nodes of a tree breadth-first, so both children of a node are adjacent
+    Parameters:
+        children_left : np.ndarray
+            Left children of the nodes (-1 for leaves)
+        children_right : np.ndarray
+            Right children of the nodes (-1 for leaves)
+    Returns:
+        np.ndarray
+            Old node indices in the new order
+    """
+    order = [0]
+    for node in order:
+        if children_left[node] != -1:
+            order.extend((children_left[node], children_right[node]))
+    return np.asarray(order)
+
+
+def export_tree_ensemble(model) -> tuple[dict, dict]:
+    """
+    Exports a binary tree ensemble to flat arrays of all nodes
+    Nodes of every tree are stored breadth-first, 'roots' holds the first node of every tree.
+    'left' is the global index of the left child, the right child is always 'left + 1'.
+    Leaves point to themselves and have +inf threshold, so a traversal step is
+    node = left[node] + (x[feature[node]] > threshold[node]) for any node.
+    Every leaf holds one value, the ensemble score is
+    score = base + sum(tree_weights[t] * leaf_value[t])
+    - RandomForest: leaf value is the class 1 fraction, tree weight is 1 / n_trees, identity link
+    - GradientBoosting: leaf value is the stage prediction, tree weight is the learning rate,
+      base is the raw prediction of the prior, logistic link
+    - AdaBoost (SAMME): leaf value is the vote +1/-1, tree weight is 2 * w / sum(w), logistic link
+    Parameters:
+        model : object
+            Fitted tree ensemble
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    """
+    name = type(model).__name__
+    if name == "GradientBoostingClassifier":
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        weights = np.full(len(trees), model.learning_rate)
+        if model.init_ == "zero":
+            base = 0.0
+        else:
+            eps = np.finfo(np.float64).eps
+            prior = np.clip(model.init_.predict_proba(np.zeros((1, model.n_features_in_)))[0, 1], eps, 1 - eps)
+            base = float(np.log(prior / (1 - prior)))
+        link = "logistic"
+    elif name == "AdaBoostClassifier":
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        weights = 2 * model.estimator_weights_[:len(trees)] / model.estimator_weights_.sum()
+        base = 0.0
+        link = "logistic"
+    else:
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        weights = np.full(len(trees), 1.0 / len(trees))
+        base = 0.0
+        link = "identity"
+
+    features, thresholds, lefts, values, roots = [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        order = breadth_first_order(tree.children_left, tree.children_right)
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        is_leaf = tree.children_left[order] == -1
+
+        value = tree.value[order, 0, :]
+        if name == "GradientBoostingClassifier":
+            leaf_value = value[:, 0]
+        elif name == "AdaBoostClassifier":
+            leaf_value = np.where(value.argmax(axis=1) == 1, 1.0, -1.0)
+        else:
+            leaf_value = value[:, 1] / value.sum(axis=1)
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature[order]).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, floor_float32(tree.threshold[order])).astype(np.float32))
+        left = np.where(is_leaf, np.arange(len(order)), position[np.where(is_leaf, 0, tree.children_left[order])])
+        lefts.append((left + offset).astype(np.int32))
+        values.append(np.where(is_leaf, leaf_value, 0.0).astype(np.float32))
+        offset += len(order)
+
+    meta = {"kind": "tree_ensemble", "link": link, "base": base}
+    arrays = {
+        "roots": np.asarray(roots, dtype=np.int32),
+        "depths": np.asarray([tree.max_depth for tree in trees], dtype=np.int32),
+        "tree_weights": np.asarray(weights, dtype=np.float64),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "value": np.concatenate(values)
+    }
+    return meta, arrays
+
+
+def export_model(model) -> tuple[dict, dict]:
+    """
+    Converts a fitted binary classifier into metadata and plain NumPy arrays
+    Supported models: LogisticRegression, SVC, KNeighborsClassifier,
+    RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier, AdaBoostClassifier
+    Parameters:
+        model : object
+            Fitted model
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    Raises:
+        ValueError: If the model is not supported or is not a binary classifier
+    """
+    name = type(model).__name__
+    if len(getattr(model, "classes_", [])) != 2:
+        raise ValueError(f"Only binary classifiers can be exported, got {name}")
+
+    if name == "LogisticRegression" or (name == "SVC" and model.kernel == "linear"):
+        meta, arrays = export_linear(model)
+    elif name == "SVC":
+        meta, arrays = export_kernel_svm(model)
+    elif name == "KNeighborsClassifier":
+        meta, arrays = export_knn(model)
+    elif name in TREE_ENSEMBLES:
+        meta, arrays = export_tree_ensemble(model)
+    else:
+        raise ValueError(f"Model {name} is not supported by the compact format")
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model_class": name,
+        "n_features": int(model.n_features_in_),
+        "feature_names": [str(col) for col in getattr(model, "feature_names_in_", [])],
+        "classes": np.asarray(model.classes_).tolist(),
+        **meta
+    }
+    return meta, arrays
+
+
+def save_compact(model, path: Path) -> Path:
+    """
+    Saves a fitted model in the compact format (uncompressed .npz, metadata as a JSON string)
+    Parameters:
+        model : object
+            Fitted model
+        path : Path
+            Path of the file to save
+    Returns:
+        Path
+            Path of the saved file
+    """
+    meta, arrays = export_model(model)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    return path
+
+
+def load_compact(path: Path) -> tuple[dict, dict]:
+    """
+    Loads a model saved in the compact format
+    Doesn't need scikit-learn and never unpickles objects
+    Parameters:
+        path : Path
+            Path of the saved file
+    Returns:
+        tuple[dict, dict]
+            Metadata and arrays of the model
+    Raises:
+        ValueError: If the file has an unsupported format version
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact format version {meta.get('format_version')} in {path}")
+        arrays = {key: data[key] for key in data.files if key != "meta"}
+    return meta, arrays
@@ -0,0 +1,292 @@
+import numpy as np
+from pathlib import Path
+from src.models.export import load_compact
+
+# Upper bound of elements in temporary arrays of one batch (rows x trees, rows x training rows x features)
+MAX_BATCH_ELEMENTS = 2 ** 22
+
+# Batches smaller than this are traversed through all trees at once
+SMALL_BATCH = 64
+
+
+def distance_weights(distances: np.ndarray) -> np.ndarray:
+    """
+    Computes inverse distance weights as KNeighborsClassifier(weights='distance')
+    Rows with a zero distance give weight only to the neighbors at zero distance
+    Parameters:
+        distances : np.ndarray
+            Sorted distances to the neighbors, shape (n_samples, n_neighbors)
+    Returns:
+        np.ndarray
+            Weights of the neighbors
+    """
+    with np.errstate(divide="ignore"):
+        weights = 1.0 / distances
+    inf_mask = np.isinf(weights)
+    inf_row = np.any(inf_mask, axis=1)
+    weights[inf_row] = inf_mask[inf_row]
+    return weights
+
+
+def sigmoid(score: np.ndarray) -> np.ndarray:
+    """
+    Numerically stable logistic function
+    """
+    return np.exp(-np.logaddexp(0.0, -score))
+
+
+class CompactModel:
+    """
+    Lightweight inference engine for models exported with src/models/export.py
+    Evaluates models with batched NumPy operations, without scikit-learn and its input validation.
+    Outputs match the original estimators within floating point tolerance:
+    - linear: X @ coef + intercept
+    - kernel_svm: dual_coef @ K(support_vectors, X) + intercept
+    - knn: brute-force neighbors search with uniform or distance weights
+    - tree_ensemble: level-wise traversal over flat node arrays
+    predict_proba is available for models with probabilities (as in scikit-learn,
+    SVC without probability=True has only decision_function, RandomForest and KNN only predict_proba)
+    Attributes:
+        meta : dict
+            Metadata of the exported model
+        arrays : dict
+            Arrays of the exported model
+        kind : str
+            Kind of the model ('linear', 'kernel_svm', 'knn', 'tree_ensemble')
+        link : str
+            Link between the score and the probability ('logistic', 'identity', 'decision')
+        classes_ : np.ndarray
+            Class labels
+        feature_names_in_ : list
+            Feature names used in training (empty if the model was trained on arrays)
+        n_features_in_ : int
+            Number of features
+    """
+    def __init__(self, meta: dict, arrays: dict) -> None:
+        """
+        Initialize the CompactModel class
+        Parameters:
+            meta : dict
+                Metadata of the exported model
+            arrays : dict
+                Arrays of the exported model
+        """
+        self.meta = meta
+        self.arrays = arrays
+        self.kind = meta["kind"]
+        self.link = meta.get("link", "identity")
+        self.classes_ = np.asarray(meta["classes"])
+        self.feature_names_in_ = meta["feature_names"]
+        self.n_features_in_ = meta["n_features"]
+
+        # Native index type avoids conversions in every gather of the traversal
+        if self.kind == "tree_ensemble":
+            for key in ("roots", "feature", "left"):
+                self.arrays[key] = arrays[key].astype(np.intp)
+
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CompactModel":
+        """
+        Loads the model from a compact format file
+        Parameters:
+            path : Path
+                Path of the .npz file
+        Returns:
+            CompactModel
+                Loaded model
+        """
+        return cls(*load_compact(path))
+
+
+    def check_input(self, X) -> np.ndarray:
+        """
+        Converts input to a 2D float64 array, DataFrame columns are ordered as in training
+        Parameters:
+            X : pd.DataFrame, np.ndarray or dict
+                Input rows (a dict is a single record by feature names)
+        Returns:
+            np.ndarray
+                Input array, shape (n_samples, n_features)
+        """
+        if isinstance(X, dict):
+            X = [[X[name] for name in self.feature_names_in_]]
+        elif hasattr(X, "columns") and self.feature_names_in_:
+            X = X[self.feature_names_in_]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+        return X
+
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """
+        Computes the raw score of the class 1 (probability for 'identity' link)
+        Parameters:
+            X : np.ndarray
+                Input array
+        Returns:
+            np.ndarray
+                Scores, shape (n_samples,)
+        """
+        if self.kind == "linear":
+            return X @ self.arrays["coef"] + self.arrays["intercept"][0]
+        if self.kind == "kernel_svm":
+            return self.kernel(X) @ self.arrays["dual_coef"] + self.arrays["intercept"][0]
+        if self.kind == "knn":
+            return self.knn_proba(X)
+        return self.tree_score(X)
+
+
+    def kernel(self, X: np.ndarray) -> np.ndarray:
+        """
+        Computes the kernel between the input and the support vectors
+        """
+        sv = self.arrays["support_vectors"]
+        gamma, coef0 = self.meta["gamma"], self.meta["coef0"]
+        if self.meta["kernel"] == "rbf":
+            distances = (X ** 2).sum(axis=1)[:, None] - 2 * X @ sv.T + (sv ** 2).sum(axis=1)[None, :]
+            return np.exp(-gamma * np.maximum(distances, 0.0))
+        if self.meta["kernel"] == "poly":
+            return (gamma * X @ sv.T + coef0) ** self.meta["degree"]
+        return np.tanh(gamma * X @ sv.T + coef0)
+
+
+    def knn_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Computes the class 1 probability of the neighbors vote
+        """
+        fit_X, y = self.arrays["fit_X"], self.arrays["y"]
+        k, p = self.meta["n_neighbors"], self.meta["p"]
+        batch = max(1, MAX_BATCH_ELEMENTS // (fit_X.shape[0] * fit_X.shape[1]))
+
+        proba = np.empty(len(X))
+        for start in range(0, len(X), batch):
+            diff = np.abs(X[start:start + batch, None, :] - fit_X[None, :, :])
+            if p == 1:
+                distances = diff.sum(axis=2)
+            elif p == 2:
+                distances = np.sqrt((diff ** 2).sum(axis=2))
+            else:
+                distances = (diff ** p).sum(axis=2) ** (1 / p)
+
+            # k nearest neighbors sorted by distance
+            neighbors = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            neighbor_distances = np.take_along_axis(distances, neighbors, axis=1)
+            order = np.argsort(neighbor_distances, axis=1, kind="stable")
+            neighbors = np.take_along_axis(neighbors, order, axis=1)
+            neighbor_distances = np.take_along_axis(neighbor_distances, order, axis=1)
+
+            if self.meta["weights"] == "distance":
+                weights = distance_weights(neighbor_distances)
+            else:
+                weights = np.ones_like(neighbor_distances)
+            proba[start:start + batch] = (weights * y[neighbors]).sum(axis=1) / weights.sum(axis=1)
+        return proba
+
+
+    def tree_score(self, X: np.ndarray) -> np.ndarray:
+        """
+        Sums the weighted leaf values of all trees
+        Small batches traverse all trees at once level by level,
+        large batches traverse the trees one by one (smaller working set, fewer levels).
+        Inputs are compared in float32, as in scikit-learn trees
+        """
+        a = self.arrays
+        X = X.astype(np.float32)
+        if len(X) * len(a["roots"]) <= MAX_BATCH_ELEMENTS and len(X) < SMALL_BATCH:
+            leaves = self.tree_leaves_levelwise(X)
+            return leaves.astype(np.float64) @ a["tree_weights"] + self.meta["base"]
+
+        feature, threshold, left, value = a["feature"], a["threshold"], a["left"], a["value"]
+        X_flat = np.ascontiguousarray(X.T).ravel()
+        row_index = np.arange(len(X))
+        score = np.full(len(X), self.meta["base"])
+        for root, depth, weight in zip(a["roots"], a["depths"], a["tree_weights"]):
+            node = np.full(len(X), root)
+            for _ in range(depth):
+                go_right = X_flat[feature[node] * len(X) + row_index] > threshold[node]
+                node = left[node] + go_right
+            score += weight * value[node]
+        return score
+
+
+    def tree_leaves_levelwise(self, X: np.ndarray) -> np.ndarray:
+        """
+        Finds the leaves of all trees for every row, traversing all trees at once
+        Parameters:
+            X : np.ndarray
+                float32 input array
+        Returns:
+            np.ndarray
+                Leaf values, shape (n_samples, n_trees)
+        """
+        a = self.arrays
+        feature, threshold, left = a["feature"], a["threshold"], a["left"]
+        row_index = np.arange(len(X))[:, None]
+        node = np.broadcast_to(a["roots"], (len(X), len(a["roots"])))
+        for _ in range(a["depths"].max(initial=0)):
+            node = left[node] + (X[row_index, feature[node]] > threshold[node])
+        return a["value"][node]
+
+
+    @property
+    def decision_function(self):
+        """
+        Returns the decision function (raw score), available for 'logistic' and 'decision' links
+        """
+        if self.link == "identity":
+            raise AttributeError(f"{self.meta['model_class']} has no decision_function")
+        return lambda X: self.score(self.check_input(X))
+
+
+    @property
+    def predict_proba(self):
+        """
+        Returns the class probabilities, available for 'logistic' and 'identity' links
+        """
+        if self.link == "decision":
+            raise AttributeError(f"{self.meta['model_class']} has no predict_proba")
+        return self._predict_proba
+
+
+    def _predict_proba(self, X) -> np.ndarray:
+        """
+        Computes the class probabilities, shape (n_samples, 2)
+        """
+        score = self.score(self.check_input(X))
+        proba = sigmoid(score) if self.link == "logistic" else score
+        return np.column_stack([1.0 - proba, proba])
+
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predicts class labels
+        Parameters:
+            X : pd.DataFrame, np.ndarray or dict
+                Input rows
+        Returns:
+            np.ndarray
+                Predicted labels
+        """
+        score = self.score(self.check_input(X))
+        threshold = 0.5 if self.link == "identity" else 0.0
+        return self.classes_[(score > threshold).astype(int)]
+
+
+    def predict_one(self, record) -> tuple:
+        """
+        Scores a single record
+        Parameters:
+            record : dict or np.ndarray
+                Feature values by name or in training order
+        Returns:
+            tuple
+                Predicted label and score (probability of class 1 if available, else raw score)
+        """
+        score = float(self.score(self.check_input(record))[0])
+        threshold = 0.5 if self.link == "identity" else 0.0
+        label = self.classes_[int(score > threshold)].item()
+        return label, (sigmoid(score) if self.link == "logistic" else score)
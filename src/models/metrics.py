@@ -0,0 +1,287 @@
+import numpy as np
+from functools import partial
+
+
+def confusion_counts(y_true, y_pred, weights: np.ndarray | None = None, pos_label=1) -> np.ndarray:
+    """
+    Computes the binary confusion counts in one pass with bincount
+    Every pair is encoded as 2 * true + predicted, so the counts are ordered [tn, fp, fn, tp].
+    With a 2D weights matrix (e.g. bootstrap resample counts) counts are computed
+    for every row of the matrix at once
+    Parameters:
+        y_true : array-like
+            True labels
+        y_pred : array-like
+            Predicted labels
+        weights : np.ndarray, optional
+            Sample weights, shape (n_samples,) or (n_sets, n_samples) (default is None)
+        pos_label : int or str, optional
+            Label of the positive class (default is 1)
+    Returns:
+        np.ndarray
+            Counts [tn, fp, fn, tp], shape (4,) or (n_sets, 4)
+    """
+    code = 2 * (np.asarray(y_true) == pos_label) + (np.asarray(y_pred) == pos_label)
+    if weights is None or np.ndim(weights) == 1:
+        return np.bincount(code, weights=weights, minlength=4).astype(np.float64)
+
+    # One column per cell of the confusion matrix
+    one_hot = np.zeros((len(code), 4))
+    one_hot[np.arange(len(code)), code] = 1.0
+    return np.asarray(weights, dtype=np.float64) @ one_hot
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray, zero_division: float = 0.0) -> np.ndarray:
+    """
+    Divides element-wise, returns 'zero_division' where the denominator is zero (as scikit-learn metrics)
+    """
+    numerator, denominator = np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64)
+    result = np.full(np.broadcast(numerator, denominator).shape, float(zero_division))
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def accuracy_from_counts(counts: np.ndarray) -> np.ndarray:
+    """
+    Accuracy: (tp + tn) / n
+    """
+    return safe_divide(counts[..., 0] + counts[..., 3], counts.sum(axis=-1))
+
+
+def precision_from_counts(counts: np.ndarray, zero_division: float = 0.0) -> np.ndarray:
+    """
+    Precision: tp / (tp + fp)
+    """
+    return safe_divide(counts[..., 3], counts[..., 3] + counts[..., 1], zero_division)
+
+
+def recall_from_counts(counts: np.ndarray, zero_division: float = 0.0) -> np.ndarray:
+    """
+    Recall: tp / (tp + fn)
+    """
+    return safe_divide(counts[..., 3], counts[..., 3] + counts[..., 2], zero_division)
+
+
+def fbeta_from_counts(counts: np.ndarray, beta: float = 1.0, zero_division: float = 0.0) -> np.ndarray:
+    """
+    F-beta: (1 + beta^2) * tp / ((1 + beta^2) * tp + beta^2 * fn + fp)
+    """
+    beta2 = beta ** 2
+    tp = counts[..., 3]
+    return safe_divide((1 + beta2) * tp, (1 + beta2) * tp + beta2 * counts[..., 2] + counts[..., 1], zero_division)
+
+
+# Count-based equivalents of scikit-learn metrics and parameters they accept
+COUNT_METRICS = {
+    "sklearn.metrics.accuracy_score": (accuracy_from_counts, ()),
+    "sklearn.metrics.precision_score": (precision_from_counts, ("zero_division",)),
+    "sklearn.metrics.recall_score": (recall_from_counts, ("zero_division",)),
+    "sklearn.metrics.f1_score": (fbeta_from_counts, ("zero_division",)),
+    "sklearn.metrics.fbeta_score": (fbeta_from_counts, ("beta", "zero_division"))
+}
+
+
+def get_count_metric(class_path: str, params: dict):
+    """
+    Returns the count-based equivalent of a metric from the metrics config
+    Only binary averaging of the positive label 1 is supported, other metrics
+    are computed by their own functions
+    Parameters:
+        class_path : str
+            Full path to the metric function (Example: 'sklearn.metrics.fbeta_score')
+        params : dict
+            Parameters of the metric from the config
+    Returns:
+        partial or None
+            Function of the confusion counts, None if the metric has no count-based equivalent
+    """
+    if class_path not in COUNT_METRICS:
+        return None
+    fn, accepted = COUNT_METRICS[class_path]
+    if params.get("average", "binary") != "binary" or params.get("pos_label", 1) != 1:
+        return None
+    kwargs = {key: value for key, value in params.items() if key not in ("average", "pos_label")}
+    if not set(kwargs) <= set(accepted):
+        return None
+    if kwargs.get("zero_division") == "warn":
+        kwargs.pop("zero_division")
+    return partial(fn, **kwargs)
+
+
+def roc_auc_from_weights(y_true, y_score, weights: np.ndarray | None = None, pos_label=1) -> np.ndarray:
+    """
+    Computes the weighted ROC-AUC by ranks (Mann-Whitney statistic)
+    Scores are sorted once, tied scores are merged into groups with np.add.reduceat
+    and count a half for every positive-negative pair. With a 2D weights matrix
+    the AUC is computed for every row of the matrix at once
+    Parameters:
+        y_true : array-like
+            True labels
+        y_score : array-like
+            Scores of the positive class
+        weights : np.ndarray, optional
+            Sample weights, shape (n_samples,) or (n_sets, n_samples) (default is None)
+        pos_label : int or str, optional
+            Label of the positive class (default is 1)
+    Returns:
+        np.ndarray
+            ROC-AUC, shape () or (n_sets,), NaN if a set has no positives or no negatives
+    """
+    y_score = np.asarray(y_score)
+    order = np.argsort(y_score, kind="mergesort")
+    sorted_score = y_score[order]
+    starts = np.flatnonzero(np.r_[True, sorted_score[1:] != sorted_score[:-1]])
+    positive = np.asarray(y_true)[order] == pos_label
+
+    w = np.ones(len(order)) if weights is None else np.asarray(weights, dtype=np.float64)[..., order]
+    pos = np.add.reduceat(w * positive, starts, axis=-1)
+    neg = np.add.reduceat(w * ~positive, starts, axis=-1)
+    neg_below = np.cumsum(neg, axis=-1) - neg
+    pairs = (pos * (neg_below + 0.5 * neg)).sum(axis=-1)
+    return safe_divide(pairs, pos.sum(axis=-1) * neg.sum(axis=-1), np.nan)
+
+
+# Weighted equivalents of scikit-learn score metrics
+SCORE_METRICS = {
+    "sklearn.metrics.roc_auc_score": roc_auc_from_weights
+}
+
+
+def get_score_metric(class_path: str, params: dict):
+    """
+    Returns the weighted equivalent of a score metric from the metrics config
+    Parameters:
+        class_path : str
+            Full path to the metric function (Example: 'sklearn.metrics.roc_auc_score')
+        params : dict
+            Parameters of the metric from the config
+    Returns:
+        Callable or None
+            Function of (y_true, y_score, weights), None if the metric has no weighted equivalent
+    """
+    if class_path not in SCORE_METRICS or params:
+        return None
+    return SCORE_METRICS[class_path]
+
+
+def bootstrap_weights(n_samples: int, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draws bootstrap resamples as a matrix of counts
+    Row i holds how many times every sample is drawn into resample i, so a metric
+    of the resample is the metric with these sample weights
+    Parameters:
+        n_samples : int
+            Number of samples
+        n_resamples : int
+            Number of resamples
+        rng : np.random.Generator
+            Random generator
+    Returns:
+        np.ndarray
+            Counts, shape (n_resamples, n_samples)
+    """
+    indices = rng.integers(0, n_samples, (n_resamples, n_samples))
+    flat = (indices + n_samples * np.arange(n_resamples)[:, None]).ravel()
+    return np.bincount(flat, minlength=n_resamples * n_samples).reshape(n_resamples, n_samples).astype(np.float64)
+
+
+def bootstrap_intervals(y_true,
+                        y_pred,
+                        y_score,
+                        count_metrics: dict,
+                        score_metrics: dict,
+                        n_resamples: int = 1000,
+                        confidence: float = 0.95,
+                        seed: int | None = 0,
+                        max_elements: int = 2 ** 22) -> dict:
+    """
+    Computes percentile bootstrap confidence intervals of metrics
+    Resamples are processed in batches of at most 'max_elements' weights, metrics
+    of a whole batch come from one matrix product (confusion counts) or one
+    sorted pass (ROC-AUC). The same seed gives the same resamples for every model
+    Parameters:
+        y_true : array-like
+            True labels
+        y_pred : array-like
+            Predicted labels
+        y_score : array-like or None
+            Scores of the positive class (None skips score metrics)
+        count_metrics : dict
+            Functions of the confusion counts by metric name
+        score_metrics : dict
+            Functions of (y_true, y_score, weights) by metric name
+        n_resamples : int, optional
+            Number of resamples (default is 1000)
+        confidence : float, optional
+            Confidence level of the intervals (default is 0.95)
+        seed : int, optional
+            Seed of the resamples (default is 0)
+        max_elements : int, optional
+            Upper bound of the weights in one batch (default is 2 ** 22)
+    Returns:
+        dict
+            Lower and upper bounds by metric name
+    """
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    if y_score is None:
+        score_metrics = {}
+    rng = np.random.default_rng(seed)
+    batch = max(1, max_elements // max(len(y_true), 1))
+
+    values = {name: [] for name in (*count_metrics, *score_metrics)}
+    for start in range(0, n_resamples, batch):
+        weights = bootstrap_weights(len(y_true), min(batch, n_resamples - start), rng)
+        counts = confusion_counts(y_true, y_pred, weights)
+        for name, fn in count_metrics.items():
+            values[name].append(fn(counts))
+        for name, fn in score_metrics.items():
+            values[name].append(fn(y_true, y_score, weights))
+
+    alpha = 1 - confidence
+    intervals = {}
+    for name, chunks in values.items():
+        low, high = np.nanpercentile(np.concatenate(chunks), [100 * alpha / 2, 100 * (1 - alpha / 2)])
+        intervals[name] = (float(low), float(high))
+    return intervals
+
+
+def threshold_curve(y_true, y_score, beta: float = 2.0, pos_label=1) -> dict:
+    """
+    Computes confusion counts and metrics at every distinct threshold in O(n log n)
+    Scores are sorted once in descending order, the counts of the rule 'score >= threshold'
+    at every distinct score are cumulative sums of the positives and negatives.
+    The first point (threshold +inf) predicts nothing as positive
+    Parameters:
+        y_true : array-like
+            True labels
+        y_score : array-like
+            Scores of the positive class
+        beta : float, optional
+            Beta of the F-beta score (default is 2.0)
+        pos_label : int or str, optional
+            Label of the positive class (default is 1)
+    Returns:
+        dict
+            Arrays 'threshold', 'tn', 'fp', 'fn', 'tp', 'accuracy', 'precision', 'recall', 'fbeta'
+            in order of decreasing threshold
+    """
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order = np.argsort(-y_score, kind="mergesort")
+    sorted_score = y_score[order]
+    positive = np.asarray(y_true)[order] == pos_label
+
+    # Last position of every distinct score
+    last = np.r_[np.flatnonzero(sorted_score[1:] != sorted_score[:-1]), len(sorted_score) - 1]
+    tp = np.r_[0, np.cumsum(positive)[last]]
+    fp = np.r_[0, last + 1 - tp[1:]]
+    n_pos = positive.sum()
+
+    counts = np.stack([len(positive) - n_pos - fp, fp, n_pos - tp, tp], axis=-1).astype(np.float64)
+    return {
+        "threshold": np.r_[np.inf, sorted_score[last]],
+        "tn": counts[:, 0], "fp": counts[:, 1], "fn": counts[:, 2], "tp": counts[:, 3],
+        "accuracy": accuracy_from_counts(counts),
+        "precision": precision_from_counts(counts),
+        "recall": recall_from_counts(counts),
+        "fbeta": fbeta_from_counts(counts, beta)
+    }
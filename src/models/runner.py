@@ -0,0 +1,120 @@
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from pathlib import Path
+from src.models.evaluation import Evaluate
+from src.utils.instrumentation import annotate, instrument, merge_outputs, run_stage
+from src.utils.logger import get_logger
+from src.utils.splitter import load_split
+
+
+def score_pair(evaluator: Evaluate, model_name: str) -> tuple[str, str, dict, object, object, float]:
+    """
+    Scores one (preprocessing type, model) pair, runs in a worker process
+    Parameters:
+        evaluator : Evaluate
+            Evaluator of the preprocessing type
+        model_name : str
+            Name of the model
+    Returns:
+        tuple
+            Preprocessing type, model name, row of metrics, predictions, scores and scoring time
+    """
+    start = time.perf_counter()
+    row, y_pred, y_score = evaluator.score_model(model_name, evaluator.models[model_name])
+    evaluator.models.release(model_name)
+    return evaluator.preprocessing_type, model_name, row, y_pred, y_score, time.perf_counter() - start
+
+
+class EvaluationRunner:
+    """
+    Evaluates all (preprocessing type, model) pairs concurrently in a pool of worker processes
+    Test splits are memory-mapped .npy files (see src/utils/splitter.load_split), joblib sends
+    memory-mapped arrays to the workers by file name, so all workers share the same pages
+    instead of copies. Every worker loads only the model it scores.
+    Results are assembled per preprocessing type in the model order of Evaluate.evaluate,
+    saved with Evaluate.save_results and analyzed with Evaluate.analyze_thresholds
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        preprocessing_types : list[str]
+            Preprocessing types to evaluate
+        split_dir : Path
+            Directory with the splits
+        config_path : Path
+            Path to the metrics YAML file
+        mmap_mode : str or None
+            Memory-map mode used to load the models (see ModelStore)
+        evaluators : dict
+            Evaluate instances by preprocessing type
+        n_jobs : int or None
+            Number of worker processes ('n_jobs' of the 'evaluation' settings, -1 - all CPUs)
+        timings : dict
+            Scoring time in seconds by (preprocessing type, model name)
+    """
+    def __init__(self,
+                 preprocessing_types: list[str],
+                 split_dir: Path = Path("data/splits"),
+                 config_path: Path = Path("configs/metrics.yaml"),
+                 mmap_mode: str | None = None) -> None:
+        """
+        Initialize the EvaluationRunner class
+        Parameters:
+            preprocessing_types : list[str]
+                Preprocessing types to evaluate
+            split_dir : Path, optional
+                Directory with the splits (default is 'data/splits')
+            config_path : Path, optional
+                Path to the metrics YAML file (default is 'configs/metrics.yaml')
+            mmap_mode : str, optional
+                Memory-map mode used to load the models (default is None)
+        """
+        self.logger = get_logger()
+        self.preprocessing_types = preprocessing_types
+        self.split_dir = split_dir
+        self.config_path = config_path
+        self.mmap_mode = mmap_mode
+        self.evaluators = {}
+        self.timings = {}
+
+        for name in self.preprocessing_types:
+            X_test = load_split(name, "X_test", split_dir)
+            y_test = load_split(name, "y_test", split_dir)
+            ids_file = split_dir / f"{name}_test_ids.npy"
+            row_ids = np.load(ids_file) if ids_file.is_file() else None
+            self.evaluators[name] = Evaluate(X_test, y_test, preprocessing_type=name, config_path=config_path,
+                                             mmap_mode=mmap_mode, row_ids=row_ids)
+
+        settings = next(iter(self.evaluators.values())).settings if self.evaluators else {}
+        self.n_jobs = settings.get("n_jobs")
+
+
+    @instrument()
+    def run(self) -> None:
+        """
+        Scores all pairs in the worker pool and saves the results of every preprocessing type
+        """
+        annotate(rows_in=sum(len(ev.X_test) for ev in self.evaluators.values()))
+        tasks = [(name, model_name) for name, ev in self.evaluators.items() for model_name in ev.models]
+        self.logger.info(f"Evaluating {len(tasks)} models with n_jobs={self.n_jobs}")
+
+        start = time.perf_counter()
+        outputs = merge_outputs(Parallel(n_jobs=self.n_jobs)(
+            delayed(run_stage)(f"score.{name}.{model_name}", score_pair, self.evaluators[name], model_name)
+            for name, model_name in tasks
+        ))
+        self.logger.info(f"Evaluation finished in {time.perf_counter() - start:.2f}s")
+
+        # Assemble results per preprocessing type
+        results = {name: ([], {}, {}) for name in self.evaluators}
+        for name, model_name, row, y_pred, y_score, elapsed in outputs:
+            metrics, y_predictions, y_scores = results[name]
+            metrics.append(row)
+            y_predictions[model_name] = y_pred
+            if y_score is not None:
+                y_scores[model_name] = y_score
+            self.timings[(name, model_name)] = elapsed
+
+        for name, ev in self.evaluators.items():
+            ev.save_results(*results[name])
+            ev.analyze_thresholds(results[name][2])
@@ -0,0 +1,713 @@
+import copy
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, ClassifierMixin, clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.metrics.pairwise import linear_kernel, polynomial_kernel, rbf_kernel, sigmoid_kernel
+from sklearn.model_selection import ParameterGrid, check_cv
+from src.models.inference import distance_weights
+from src.utils.instrumentation import merge_outputs, run_stage
+
+
+def take_rows(data, indices: np.ndarray):
+    """
+    Selects rows by position from a DataFrame, Series or array
+    Parameters:
+        data : pd.DataFrame, pd.Series or np.ndarray
+            Data to select rows from
+        indices : np.ndarray
+            Row positions
+    Returns:
+        Selected rows of the same type as the input
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.iloc[indices]
+    return data[indices]
+
+
+class PrecomputedClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Classifier that returns already computed class probabilities
+    Allows to score predictions derived without a fitted estimator with sklearn scorers
+    (the input of predict and predict_proba is ignored)
+    Attributes:
+        classes : np.ndarray
+            Class labels
+        proba : np.ndarray
+            Class probabilities of the scored samples
+    """
+    def __init__(self, classes: np.ndarray, proba: np.ndarray) -> None:
+        """
+        Initialize the PrecomputedClassifier class
+        Parameters:
+            classes : np.ndarray
+                Class labels
+            proba : np.ndarray
+                Class probabilities of the scored samples, shape (n_samples, n_classes)
+        """
+        self.classes = classes
+        self.proba = proba
+        self.classes_ = classes
+
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Returns the precomputed probabilities
+        """
+        return self.proba
+
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Returns the classes with the highest precomputed probability
+        """
+        return self.classes_[np.argmax(self.proba, axis=1)]
+
+
+class GridEvaluator:
+    """
+    Base class for grid searches that share work between candidates
+    The candidates of the grid are split into groups, each group is evaluated on a fold
+    by a single 'evaluate_group' call, so a subclass can fit once and score several candidates.
+    Without overriding, every candidate is its own group and is fitted from scratch (as in GridSearchCV).
+    The fitted search exposes the same attributes as GridSearchCV.
+    A fit shared by a group is charged to the candidate that made it, the other candidates of the group
+    record a fit time of 0.0 on that fold, so per-candidate 'mean_fit_time' is not the time of one fit.
+    The 'n_fits' column of cv_results_ counts the fits made by every candidate over the folds:
+    the total fit time of the search is sum(mean_fit_time) * n_splits_ and the time of one fit
+    is this total divided by n_fits_
+    Attributes:
+        estimator : object
+            Base estimator (is cloned before fitting)
+        param_grid : dict or list[dict]
+            Grid of parameters in GridSearchCV format
+        cv : int or cross-validation generator
+            Cross-validation strategy
+        scoring : str or callable or None
+            Scoring used to compare candidates
+        n_jobs : int or None
+            Number of jobs running (fold, group) pairs in parallel
+        refit : bool
+            Whether to refit the best candidate on the whole data
+        candidates_ : list[dict]
+            Evaluated candidates
+        cv_results_ : dict
+            Results per candidate in GridSearchCV format, with 'n_fits' (fits made by the candidate over the folds)
+        best_index_ : int
+            Index of the best candidate
+        best_params_ : dict
+            Parameters of the best candidate
+        best_score_ : float
+            Mean CV score of the best candidate
+        best_estimator_ : object
+            Best candidate refitted on the whole data
+        n_splits_ : int
+            Number of CV splits
+        n_fits_ : int
+            Number of estimator fits actually performed during the search (without refit)
+        refit_time_ : float
+            Time of the refit in seconds
+    """
+    def __init__(self,
+                 estimator,
+                 param_grid: dict | list[dict],
+                 cv=5,
+                 scoring=None,
+                 n_jobs: int | None = None,
+                 refit: bool = True) -> None:
+        """
+        Initialize the GridEvaluator class
+        Parameters:
+            estimator : object
+                Base estimator
+            param_grid : dict or list[dict]
+                Grid of parameters in GridSearchCV format
+            cv : int or cross-validation generator, optional
+                Cross-validation strategy (default is 5)
+            scoring : str or callable, optional
+                Scoring used to compare candidates (default is the estimator score)
+            n_jobs : int, optional
+                Number of parallel jobs (default is None)
+            refit : bool, optional
+                Whether to refit the best candidate on the whole data (default is True)
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.refit = refit
+
+
+    def build_candidates(self) -> list[dict]:
+        """
+        Expands the parameter grid into a list of candidates
+        Returns:
+            list[dict]
+                Candidates parameters
+        """
+        return list(ParameterGrid(self.param_grid))
+
+
+    def group_candidates(self, candidates: list[dict]) -> list[list[int]]:
+        """
+        Splits candidates into groups evaluated together
+        Parameters:
+            candidates : list[dict]
+                Candidates parameters
+        Returns:
+            list[list[int]]
+                Groups of candidate indices
+        """
+        return [[i] for i in range(len(candidates))]
+
+
+    def evaluate_group(self, estimator, candidates: list[dict], X_train, y_train, X_test, y_test, scorer) -> list[tuple]:
+        """
+        Fits and scores a group of candidates on one fold
+        Parameters:
+            estimator : object
+                Unfitted clone of the base estimator
+            candidates : list[dict]
+                Candidates of the group
+            X_train, y_train :
+                Training part of the fold
+            X_test, y_test :
+                Validation part of the fold
+            scorer : callable
+                Scorer with signature scorer(estimator, X, y)
+        Returns:
+            list[tuple]
+                (score, fit_time, score_time, n_fits) for every candidate of the group
+        """
+        results = []
+        for params in candidates:
+            model = clone(estimator).set_params(**params)
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            score = scorer(model, X_test, y_test)
+            results.append((score, fit_time, time.perf_counter() - start, 1))
+        return results
+
+
+    def _run_group(self, candidates: list[dict], X, y, train: np.ndarray, test: np.ndarray, scorer) -> list[tuple]:
+        """
+        Splits the data of a fold and evaluates a group of candidates on it
+        """
+        return self.evaluate_group(
+            clone(self.estimator),
+            candidates,
+            take_rows(X, train), take_rows(y, train),
+            take_rows(X, test), take_rows(y, test),
+            scorer
+        )
+
+
+    def fit(self, X, y) -> "GridEvaluator":
+        """
+        Runs the search over all candidates and folds
+        Parameters:
+            X : pd.DataFrame or np.ndarray
+                Training data
+            y : pd.Series or np.ndarray
+                Training labels
+        Returns:
+            GridEvaluator
+                Fitted search
+        """
+        self.candidates_ = self.build_candidates()
+        groups = self.group_candidates(self.candidates_)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+
+        # One job per (fold, group) pair, recorded as a stage of the worker running it
+        jobs = [(fold, group) for fold in range(len(splits)) for group in groups]
+        name = type(self.estimator).__name__
+        outputs = merge_outputs(Parallel(n_jobs=self.n_jobs)(
+            delayed(run_stage)(f"fit.{name}.fold{fold}", self._run_group,
+                               [self.candidates_[i] for i in group], X, y, *splits[fold], scorer)
+            for fold, group in jobs
+        ))
+
+        # Collect results into (candidate, fold) arrays
+        shape = (len(self.candidates_), len(splits))
+        scores, fit_times, score_times = np.empty(shape), np.empty(shape), np.empty(shape)
+        fit_counts = np.zeros(shape, dtype=np.int64)
+        for (fold, group), output in zip(jobs, outputs):
+            for i, (score, fit_time, score_time, n_fits) in zip(group, output):
+                scores[i, fold] = score
+                fit_times[i, fold] = fit_time
+                score_times[i, fold] = score_time
+                fit_counts[i, fold] = n_fits
+
+        self.n_splits_ = len(splits)
+        self.n_fits_ = int(fit_counts.sum())
+        self.cv_results_ = self._format_results(scores, fit_times, score_times, fit_counts)
+        self.best_index_ = int(self.cv_results_["rank_test_score"].argmin())
+        self.best_params_ = self.candidates_[self.best_index_]
+        self.best_score_ = float(self.cv_results_["mean_test_score"][self.best_index_])
+
+        # Refit the best candidate on the whole data
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+            self.refit_time_ = time.perf_counter() - start
+        return self
+
+
+    def _format_results(self, scores: np.ndarray, fit_times: np.ndarray, score_times: np.ndarray,
+                        fit_counts: np.ndarray) -> dict:
+        """
+        Builds the cv_results_ dictionary in GridSearchCV format
+        """
+        results = {"params": self.candidates_}
+        for name in sorted({key for params in self.candidates_ for key in params}):
+            results[f"param_{name}"] = np.ma.MaskedArray(
+                [params.get(name) for params in self.candidates_],
+                mask=[name not in params for params in self.candidates_],
+                dtype=object
+            )
+
+        for fold in range(scores.shape[1]):
+            results[f"split{fold}_test_score"] = scores[:, fold]
+        results["mean_test_score"] = scores.mean(axis=1)
+        results["std_test_score"] = scores.std(axis=1)
+
+        # NaN scores get the worst rank
+        mean = np.nan_to_num(results["mean_test_score"], nan=-np.inf)
+        results["rank_test_score"] = rankdata(-mean, method="min").astype(np.int32)
+
+        results["mean_fit_time"] = fit_times.mean(axis=1)
+        results["std_fit_time"] = fit_times.std(axis=1)
+        results["mean_score_time"] = score_times.mean(axis=1)
+        results["std_score_time"] = score_times.std(axis=1)
+        results["n_fits"] = fit_counts.sum(axis=1)
+        return results
+
+
+class WarmStartSearchCV(GridEvaluator):
+    """
+    Grid search for tree ensembles that evaluates every ensemble size from one fit
+    Candidates that differ only by the size parameter (n_estimators) form a group.
+    For every fold the group is fitted once at the largest size, smaller sizes are scored
+    on a copy of the fitted ensemble truncated to its first estimators
+    (RandomForest, GradientBoosting, AdaBoost).
+    Estimators without 'estimators_' (HistGradientBoosting) are grown with warm_start instead
+    Attributes:
+        path_param : str or None
+            Name of the size parameter (default is 'n_estimators', or 'max_iter' if only it is in the grid)
+    """
+    def __init__(self,
+                 estimator,
+                 param_grid: dict | list[dict],
+                 cv=5,
+                 scoring=None,
+                 n_jobs: int | None = None,
+                 refit: bool = True,
+                 path_param: str | None = None) -> None:
+        """
+        Initialize the WarmStartSearchCV class
+        Parameters:
+            estimator, param_grid, cv, scoring, n_jobs, refit :
+                See GridEvaluator
+            path_param : str, optional
+                Name of the size parameter (default is detected from the grid)
+        """
+        super().__init__(estimator, param_grid, cv, scoring, n_jobs, refit)
+        self.path_param = path_param
+
+
+    def get_path_param(self, candidates: list[dict]) -> str:
+        """
+        Returns the name of the size parameter
+        Parameters:
+            candidates : list[dict]
+                Candidates parameters
+        Returns:
+            str
+                Name of the size parameter
+        """
+        if self.path_param is not None:
+            return self.path_param
+        keys = {key for params in candidates for key in params}
+        return "max_iter" if "max_iter" in keys and "n_estimators" not in keys else "n_estimators"
+
+
+    def group_candidates(self, candidates: list[dict]) -> list[list[int]]:
+        """
+        Groups candidates that differ only by the size parameter
+        """
+        path_param = self.get_path_param(candidates)
+        groups = {}
+        for i, params in enumerate(candidates):
+            key = tuple(sorted((k, repr(v)) for k, v in params.items() if k != path_param))
+            groups.setdefault(key, []).append(i)
+        return list(groups.values())
+
+
+    def evaluate_group(self, estimator, candidates: list[dict], X_train, y_train, X_test, y_test, scorer) -> list[tuple]:
+        """
+        Fits the group once at the largest size and scores all sizes from this fit
+        """
+        path_param = self.get_path_param(candidates)
+        default = estimator.get_params()[path_param]
+        sizes = [params.get(path_param, default) for params in candidates]
+        order = np.argsort(sizes, kind="stable")
+        common = {k: v for k, v in candidates[0].items() if k != path_param}
+        estimator.set_params(**common)
+
+        results = [None] * len(candidates)
+        if not self._has_estimators_list(estimator):
+            if "warm_start" not in estimator.get_params():
+                return super().evaluate_group(estimator, candidates, X_train, y_train, X_test, y_test, scorer)
+
+            # Grow the model with warm_start from the smallest size to the largest one
+            estimator.set_params(warm_start=True)
+            for i in order:
+                estimator.set_params(**{path_param: sizes[i]})
+                start = time.perf_counter()
+                estimator.fit(X_train, y_train)
+                fit_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                score = scorer(estimator, X_test, y_test)
+                results[i] = (score, fit_time, time.perf_counter() - start, 1)
+            return results
+
+        # Single fit at the largest size
+        largest = order[-1]
+        estimator.set_params(**{path_param: sizes[largest]})
+        start = time.perf_counter()
+        estimator.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        for i in order:
+            view = truncate_ensemble(estimator, sizes[i], path_param)
+            start = time.perf_counter()
+            score = scorer(view, X_test, y_test)
+            score_time = time.perf_counter() - start
+            if i == largest:
+                results[i] = (score, fit_time, score_time, 1)
+            else:
+                results[i] = (score, 0.0, score_time, 0)
+        return results
+
+
+    @staticmethod
+    def _has_estimators_list(estimator) -> bool:
+        """
+        Checks whether the fitted estimator keeps its members in 'estimators_'
+        (bagging and boosting ensembles of sklearn.ensemble, except histogram boosting)
+        """
+        return type(estimator).__name__ in ("RandomForestClassifier", "ExtraTreesClassifier",
+                                            "GradientBoostingClassifier", "AdaBoostClassifier")
+
+
+def truncate_ensemble(estimator, n_estimators: int, path_param: str = "n_estimators"):
+    """
+    Returns a shallow copy of a fitted ensemble that uses only its first estimators
+    The copy predicts exactly as the same ensemble fitted with 'n_estimators' members
+    (with a fixed random_state), since every member depends only on the previous ones
+    Parameters:
+        estimator : object
+            Fitted ensemble with 'estimators_' attribute
+        n_estimators : int
+            Number of the first estimators to keep
+        path_param : str, optional
+            Name of the size parameter (default is 'n_estimators')
+    Returns:
+        object
+            Truncated copy of the ensemble
+    """
+    view = copy.copy(estimator)
+    if n_estimators < len(estimator.estimators_):
+        view.estimators_ = estimator.estimators_[:n_estimators]
+        for attr in ("estimator_weights_", "estimator_errors_", "train_score_", "oob_improvement_"):
+            if hasattr(estimator, attr):
+                setattr(view, attr, getattr(estimator, attr)[:n_estimators])
+        if hasattr(estimator, "n_estimators_"):
+            view.n_estimators_ = n_estimators
+    view.set_params(**{path_param: n_estimators})
+    return view
+
+
+class LogisticPathSearchCV(GridEvaluator):
+    """
+    Grid search for LogisticRegression that walks the C grid as a regularization path
+    - Duplicate candidates (the same solver and l1_ratio in several grid dicts) are evaluated once
+    - 'max_iter' is not a grid axis: the largest value of the grid is used as a convergence cap
+    - Candidates that differ only by C form a path, fitted from the strongest regularization
+      to the weakest one with warm_start (coefficients of the previous C are the starting point).
+      liblinear does not support warm_start, its paths are fitted cold
+    """
+    def build_candidates(self) -> list[dict]:
+        """
+        Expands the grid, replaces 'max_iter' by the convergence cap and removes duplicates
+        """
+        defaults = self.estimator.get_params()
+        grid = list(ParameterGrid(self.param_grid))
+        max_iter = max((params.get("max_iter", defaults["max_iter"]) for params in grid), default=defaults["max_iter"])
+
+        candidates = {}
+        for params in grid:
+            params = {**params, "max_iter": max_iter}
+            params.setdefault("solver", defaults["solver"])
+            params.setdefault("l1_ratio", defaults["l1_ratio"])
+            key = tuple(sorted((k, repr(v)) for k, v in params.items()))
+            candidates.setdefault(key, params)
+        return list(candidates.values())
+
+
+    def group_candidates(self, candidates: list[dict]) -> list[list[int]]:
+        """
+        Groups candidates that differ only by C
+        """
+        groups = {}
+        for i, params in enumerate(candidates):
+            key = tuple(sorted((k, repr(v)) for k, v in params.items() if k != "C"))
+            groups.setdefault(key, []).append(i)
+        return list(groups.values())
+
+
+    def evaluate_group(self, estimator, candidates: list[dict], X_train, y_train, X_test, y_test, scorer) -> list[tuple]:
+        """
+        Fits the path of C values with warm starts
+        """
+        default = estimator.get_params()["C"]
+        values = [params.get("C", default) for params in candidates]
+        common = {k: v for k, v in candidates[0].items() if k != "C"}
+        estimator.set_params(warm_start=True, **common)
+
+        results = [None] * len(candidates)
+        for i in np.argsort(values, kind="stable"):
+            estimator.set_params(C=values[i])
+            start = time.perf_counter()
+            estimator.fit(X_train, y_train)
+            fit_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            score = scorer(estimator, X_test, y_test)
+            results[i] = (score, fit_time, time.perf_counter() - start, 1)
+        return results
+
+
+class KNeighborsSearchCV(GridEvaluator):
+    """
+    Grid search for KNeighborsClassifier that queries the neighbors once per group
+    Candidates that differ only by n_neighbors, weights or leaf_size form a group
+    (leaf_size changes only the speed of the index, not the predictions).
+    For every fold the group runs one query with the largest n_neighbors,
+    the probabilities for all smaller n_neighbors and both weighting schemes
+    are cumulative sums over the sorted neighbors of this query
+    """
+    shared_params = ("n_neighbors", "weights", "leaf_size")
+
+    def group_candidates(self, candidates: list[dict]) -> list[list[int]]:
+        """
+        Groups candidates that differ only by n_neighbors, weights or leaf_size
+        """
+        groups = {}
+        for i, params in enumerate(candidates):
+            key = tuple(sorted((k, repr(v)) for k, v in params.items() if k not in self.shared_params))
+            groups.setdefault(key, []).append(i)
+        return list(groups.values())
+
+
+    def evaluate_group(self, estimator, candidates: list[dict], X_train, y_train, X_test, y_test, scorer) -> list[tuple]:
+        """
+        Runs one neighbors query and scores every candidate from it
+        """
+        defaults = estimator.get_params()
+        params = [{**{k: defaults[k] for k in self.shared_params}, **candidate} for candidate in candidates]
+        if any(callable(p["weights"]) for p in params):
+            return super().evaluate_group(estimator, candidates, X_train, y_train, X_test, y_test, scorer)
+
+        common = {k: v for k, v in candidates[0].items() if k not in self.shared_params}
+        k_max = max(p["n_neighbors"] for p in params)
+        estimator.set_params(n_neighbors=k_max, **common)
+
+        # Fit the index and query the largest neighborhood
+        start = time.perf_counter()
+        estimator.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        distances, indices = estimator.kneighbors(X_test, n_neighbors=k_max)
+        labels = np.searchsorted(estimator.classes_, np.asarray(y_train))[indices]
+        votes = np.eye(len(estimator.classes_))[labels]
+        cumulative = {
+            "uniform": np.cumsum(votes, axis=1),
+            "distance": np.cumsum(votes * distance_weights(distances)[:, :, None], axis=1)
+        }
+        query_time = time.perf_counter() - start
+
+        results = []
+        for i, p in enumerate(params):
+            start = time.perf_counter()
+            proba = cumulative[p["weights"]][:, p["n_neighbors"] - 1, :]
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            score = scorer(PrecomputedClassifier(estimator.classes_, proba / normalizer), X_test, y_test)
+            score_time = time.perf_counter() - start
+
+            if i == 0:
+                results.append((score, fit_time, score_time + query_time, 1))
+            else:
+                results.append((score, 0.0, score_time, 0))
+        return results
+
+
+class KernelSearchCV(GridEvaluator):
+    """
+    Grid search for sklearn.svm.SVC that computes the kernel matrix once per group
+    Candidates with the same kernel parameters (kernel, gamma, degree, coef0) form a group.
+    For every fold the train and validation kernel matrices are computed once
+    and all C values are fitted with kernel='precomputed'.
+    Parameters that do not change the kernel are ignored in the grouping
+    (gamma of the linear kernel), identical models of a group are fitted once.
+    If the kernel matrices of a fold do not fit into 'max_kernel_mb',
+    the group is evaluated as in GridSearchCV.
+    The memory cap is per job, with n_jobs > 1 several matrices are held at the same time
+    Attributes:
+        max_kernel_mb : float
+            Memory cap for the kernel matrices of one fold in megabytes
+    """
+    kernel_params = {
+        "linear": (),
+        "rbf": ("gamma",),
+        "poly": ("gamma", "degree", "coef0"),
+        "sigmoid": ("gamma", "coef0")
+    }
+
+    def __init__(self,
+                 estimator,
+                 param_grid: dict | list[dict],
+                 cv=5,
+                 scoring=None,
+                 n_jobs: int | None = None,
+                 refit: bool = True,
+                 max_kernel_mb: float = 1024) -> None:
+        """
+        Initialize the KernelSearchCV class
+        Parameters:
+            estimator, param_grid, cv, scoring, n_jobs, refit :
+                See GridEvaluator
+            max_kernel_mb : float, optional
+                Memory cap for the kernel matrices of one fold in megabytes (default is 1024)
+        """
+        super().__init__(estimator, param_grid, cv, scoring, n_jobs, refit)
+        self.max_kernel_mb = max_kernel_mb
+
+
+    def effective_params(self, params: dict) -> dict:
+        """
+        Returns the candidate parameters that change the model
+        (drops kernel parameters not used by the kernel of the candidate)
+        Parameters:
+            params : dict
+                Candidate parameters
+        Returns:
+            dict
+                Parameters without unused kernel parameters
+        """
+        kernel = params.get("kernel", self.estimator.get_params()["kernel"])
+        unused = {"gamma", "degree", "coef0"} - set(self.kernel_params.get(kernel, ("gamma", "degree", "coef0")))
+        return {k: v for k, v in params.items() if k not in unused}
+
+
+    def group_candidates(self, candidates: list[dict]) -> list[list[int]]:
+        """
+        Groups candidates with the same kernel and the same parameters apart from C
+        """
+        groups = {}
+        for i, params in enumerate(candidates):
+            params = self.effective_params(params)
+            key = tuple(sorted((k, repr(v)) for k, v in params.items() if k != "C"))
+            groups.setdefault(key, []).append(i)
+        return list(groups.values())
+
+
+    def evaluate_group(self, estimator, candidates: list[dict], X_train, y_train, X_test, y_test, scorer) -> list[tuple]:
+        """
+        Computes the kernel matrices once and fits every C value on them
+        """
+        params = {**estimator.get_params(), **self.effective_params(candidates[0])}
+        n_train, n_test = len(X_train), len(X_test)
+        kernel_mb = 8 * n_train * (n_train + n_test) / 2 ** 20
+        if params["kernel"] not in self.kernel_params or kernel_mb > self.max_kernel_mb:
+            return super().evaluate_group(estimator, candidates, X_train, y_train, X_test, y_test, scorer)
+
+        # Kernel matrices of the fold
+        start = time.perf_counter()
+        X_train = np.asarray(X_train, dtype=np.float64)
+        X_test = np.asarray(X_test, dtype=np.float64)
+        K_train = self.kernel(X_train, X_train, params)
+        K_test = self.kernel(X_test, X_train, params)
+        kernel_time = time.perf_counter() - start
+
+        estimator.set_params(kernel="precomputed")
+        fitted = {}
+        results = []
+        for params in candidates:
+            other = {k: v for k, v in self.effective_params(params).items()
+                     if k not in ("kernel", "gamma", "degree", "coef0")}
+            key = tuple(sorted((k, repr(v)) for k, v in other.items()))
+            if key in fitted:
+                results.append((fitted[key], 0.0, 0.0, 0))
+                continue
+
+            model = clone(estimator).set_params(**other)
+            start = time.perf_counter()
+            model.fit(K_train, y_train)
+            fit_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fitted[key] = scorer(model, K_test, y_test)
+            score_time = time.perf_counter() - start
+
+            # Kernel computation is counted in the fit time of the first model
+            results.append((fitted[key], fit_time + kernel_time, score_time, 1))
+            kernel_time = 0.0
+        return results
+
+
+    @staticmethod
+    def kernel(X: np.ndarray, Y: np.ndarray, params: dict) -> np.ndarray:
+        """
+        Computes the kernel matrix as SVC does for the given parameters
+        Parameters:
+            X : np.ndarray
+                Rows of the matrix
+            Y : np.ndarray
+                Columns of the matrix (training data of the fold)
+            params : dict
+                SVC parameters (kernel, gamma, degree, coef0)
+        Returns:
+            np.ndarray
+                Kernel matrix, shape (len(X), len(Y))
+        """
+        kernel = params["kernel"]
+        if kernel == "linear":
+            return linear_kernel(X, Y)
+
+        # Gamma as in SVC, computed on the training data of the fold
+        gamma = params["gamma"]
+        if gamma == "scale":
+            variance = Y.var()
+            gamma = 1.0 / (Y.shape[1] * variance) if variance != 0 else 1.0
+        elif gamma == "auto":
+            gamma = 1.0 / Y.shape[1]
+
+        if kernel == "rbf":
+            return rbf_kernel(X, Y, gamma=gamma)
+        if kernel == "poly":
+            return polynomial_kernel(X, Y, degree=params["degree"], gamma=gamma, coef0=params["coef0"])
+        return sigmoid_kernel(X, Y, gamma=gamma, coef0=params["coef0"])
@@ -0,0 +1,73 @@
+import joblib
+from collections.abc import Mapping
+from pathlib import Path
+from src.utils.logger import get_logger
+
+
+class ModelStore(Mapping):
+    """
+    Dictionary-like access to the trained models of a folder
+    Models are found by their '*.joblib' files and loaded on first access,
+    so only the models actually used are deserialized
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        path : Path
+            Folder with the trained models
+        mmap_mode : str or None
+            Memory-map mode passed to joblib.load ('r', 'r+', 'c' or None).
+            Numpy arrays of uncompressed dumps are memory-mapped instead of read into memory,
+            compressed dumps are always fully loaded
+        paths : dict
+            Paths of the model files by model name
+        loaded : dict
+            Loaded models by model name
+    """
+    def __init__(self, path: Path, mmap_mode: str | None = None) -> None:
+        """
+        Initialize the ModelStore class
+        Parameters:
+            path : Path
+                Folder with the trained models
+            mmap_mode : str, optional
+                Memory-map mode passed to joblib.load (default is None)
+        """
+        self.logger = get_logger()
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.paths = {file.stem: file for file in sorted(path.glob("*.joblib"))}
+        self.loaded = {}
+
+
+    def __getitem__(self, name: str):
+        """
+        Returns the model, loading it on first access
+        Parameters:
+            name : str
+                Name of the model
+        Returns:
+            object
+                Trained model
+        """
+        if name not in self.loaded:
+            self.loaded[name] = joblib.load(self.paths[name], mmap_mode=self.mmap_mode)
+            self.logger.info(f"Loaded {name} model")
+        return self.loaded[name]
+
+
+    def __iter__(self):
+        return iter(self.paths)
+
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+    def release(self, name: str) -> None:
+        """
+        Drops the loaded model from memory (it is loaded again on next access)
+        Parameters:
+            name : str
+                Name of the model
+        """
+        self.loaded.pop(name, None)
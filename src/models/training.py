@@ -1,12 +1,28 @@
 import logging
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
 import pandas as pd
 from src.utils.logger import get_logger
-from sklearn.model_selection import GridSearchCV
 import yaml
 from pathlib import Path
 from src.utils.validator import Validator
 import importlib
 import joblib
+import numpy as np
+import sklearn
+from src.models.export import save_compact
+from src.utils.instrumentation import annotate, instrument, stage
+
+# Histogram-based backends of the models with 'backend: hist' (class and renamed parameters)
+HIST_BACKENDS = {
+    "sklearn.ensemble.GradientBoostingClassifier": {
+        "class": "sklearn.ensemble.HistGradientBoostingClassifier",
+        "rename": {"n_estimators": "max_iter"}
+    }
+}
 
 
 class Models:
@@ -19,6 +35,9 @@ class Models:
     - GradientBoostingClassifier
     - AdaBoostClassifier
     Hyperparameters are tuned using GridSearchCV
+    or the search class set in the 'search' section of the model (see src/models/search.py)
+    Fixed constructor parameters of a model are set in its 'init_params' section,
+    GradientBoosting can be switched to the histogram-based implementation with 'backend: hist'
     Model and GridSearch configuration are defined in 'configs/models.yaml'
     Attributes:
         validator : Validator
@@ -36,21 +55,34 @@ class Models:
         config_path : Path
             Path to the models YAML file (default is 'configs/models.yaml')
         save_path : Path
-            Path to save trained models
+            Path to save trained models ('<models_dir>/<preprocessing_type>')
         models : dict or None
             Dictionary of models module and class
         params: dict or None
             Dictionary of model parameters
+        searches : dict or None
+            Dictionary of search classes and their parameters
         trained_models : dict
             Dictionary of trained models
         results : dict
             Dictionary of results from grid search
+        cv_results : dict
+            Dictionary of cv_results_ tables of the searches
+        resume : bool
+            Whether to skip models whose checkpoint matches the configuration and the data
+        manifest_path : Path
+            Path to the checkpoints manifest ('models/<preprocessing_type>/manifest.json')
+        compress : int
+            joblib compression level of the saved models ('persistence' section of the config).
+            0 keeps dumps uncompressed, so they can be memory-mapped on loading
     """
     def __init__(self,
                  X_train: pd.DataFrame,
                  y_train: pd.Series,
                  preprocessing_type: str,
-                 config_path: Path = Path("configs/models.yaml")) -> None:
+                 config_path: Path = Path("configs/models.yaml"),
+                 resume: bool = True,
+                 models_dir: Path = Path("models")) -> None:
         """
         Initialize the Models class
         Parameters:
@@ -62,6 +94,10 @@ class Models:
                 Type of preprocessing used
             config_path : Path
                 Path to the models YAML file (default is 'configs/models.yaml')
+            resume : bool, optional
+                Whether to skip models with a matching checkpoint (default is True)
+            models_dir : Path, optional
+                Directory to save trained models (default is 'models')
         """
         # Component initialization
         self.validator = Validator()
@@ -74,8 +110,11 @@ class Models:
         self.config_path: Path = config_path.resolve()
         self.models: dict | None = None
         self.params: dict | None = None
+        self.searches: dict | None = None
         self.trained_models: dict | None = None
         self.results: dict | None = None
+        self.cv_results: dict | None = None
+        self.resume: bool = resume
 
         # Validate the configuration path
         self.validator.check_type_path(config_path)
@@ -87,10 +126,12 @@ class Models:
 
         # Calling a method for loading models
         self.load_models()
+        self.compress: int = self.config.get("persistence", {}).get("compress", 0)
 
         # Set path to save trained models
-        self.save_path = Path("models") / self.preprocessing_type
+        self.save_path = models_dir / self.preprocessing_type
         self.save_path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.save_path / "manifest.json"
 
 
     def get_class_from_string(self, class_path: str) -> type:
@@ -111,75 +152,267 @@ class Models:
 
     def load_models(self) -> None:
         """
-        Initializes the 'models' and 'params' dictionaries.
+        Initializes the 'models', 'params' and 'searches' dictionaries.
         Each model class is loaded and an instance is created.
         Parameters for each model are stored separately.
+        Models without 'search' section are tuned with GridSearchCV
         """
         self.models = {}
         self.params = {}
+        self.searches = {}
 
         for name, info in self.config["models"].items():
-            cls = self.get_class_from_string(info["class"])
-            self.models[name] = cls()
-            self.params[name] = info.get("params", {})
+            class_path = info["class"]
+            init_params = info.get("init_params", {})
+            params = info.get("params", {})
+
+            # Replace the model by its histogram-based implementation
+            if info.get("backend", "exact") == "hist":
+                backend = HIST_BACKENDS[class_path]
+                class_path = backend["class"]
+                init_params = {backend["rename"].get(k, k): v for k, v in init_params.items()}
+                params = {backend["rename"].get(k, k): v for k, v in params.items()}
+                if "n_iter_no_change" in init_params:
+                    init_params.setdefault("early_stopping", True)
+
+            cls = self.get_class_from_string(class_path)
+            self.models[name] = cls(**init_params)
+            self.params[name] = params
+
+            search = info.get("search", {})
+            search_cls = self.get_class_from_string(search.get("class", "sklearn.model_selection.GridSearchCV"))
+            self.searches[name] = (search_cls, search.get("params", {}))
+
+
+    def get_n_iter(self, model) -> int | None:
+        """
+        Returns the iteration at which the model stopped training
+        (boosting stages with early stopping, solver iterations of linear models)
+        Parameters:
+            model : object
+                Fitted model
+        Returns:
+            int or None
+                Number of iterations, None if the model is not iterative
+        """
+        for attr in ("n_estimators_", "n_iter_"):
+            if hasattr(model, attr):
+                return int(np.max(getattr(model, attr)))
+        return None
+
+
+    def get_lr_grid(self, base_params: dict) -> list[dict]:
+        """
+        Builds the LogisticRegression grid: one regularization path of the C values per solver
+        (lbfgs, liblinear, saga) and per l1_ratio of saga, with the largest max_iter as the convergence cap
+        Parameters:
+            base_params : dict
+                LR parameters of the configuration (C, max_iter, l1_ratio)
+        Returns:
+            list[dict]
+                Grid in GridSearchCV format, one dict per path
+        """
+        max_iter = max(base_params.get("max_iter", [self.models["LR"].get_params()["max_iter"]]))
+        paths = [{"solver": ["lbfgs"]}, {"solver": ["liblinear"]}, {"solver": ["saga"]}]
+        paths += [{"solver": ["saga"], "l1_ratio": [l1_ratio]} for l1_ratio in base_params.get("l1_ratio", [])]
+        return [{**path, "C": base_params["C"], "max_iter": [max_iter]} for path in paths]
+
+
+    def get_config_hash(self, name: str) -> str:
+        """
+        Computes the hash of the model configuration, the search settings, the search class
+        and the scikit-learn and NumPy versions, so checkpoints are not reused after an upgrade
+        or a change of the search class
+        Parameters:
+            name : str
+                Name of the model
+        Returns:
+            str
+                SHA-256 hex digest
+        """
+        search_cls = self.searches[name][0]
+        config = {
+            "model": self.config["models"][name],
+            "gridsearch": self.config["gridsearch"],
+            "search_class": f"{search_cls.__module__}.{search_cls.__qualname__}",
+            "sklearn": sklearn.__version__,
+            "numpy": np.__version__
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+    def get_data_fingerprint(self) -> str:
+        """
+        Computes the fingerprint of the training data (columns, values and labels)
+        Returns:
+            str
+                SHA-256 hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(list(map(str, self.X_train.columns))).encode())
+        digest.update(pd.util.hash_pandas_object(self.X_train, index=False).values.tobytes())
+        digest.update(pd.util.hash_pandas_object(self.y_train, index=False).values.tobytes())
+        return digest.hexdigest()
 
 
+    def load_manifest(self) -> dict:
+        """
+        Loads the checkpoints manifest
+        Returns:
+            dict
+                Manifest entries by model name (empty if there is no manifest)
+        """
+        if not self.manifest_path.is_file():
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)["models"]
+
+
+    def save_checkpoint(self, name: str, manifest: dict, entry: dict) -> None:
+        """
+        Saves the trained model, its search results and updates the manifest
+        Results and cv_results_ are restored from 'search/<name>.joblib', which keeps their types
+        (a subfolder, so the folder of the models holds only models).
+        The manifest copy of the results and the CSV of cv_results_ are for reading only.
+        The manifest is replaced atomically, so an interrupted run never leaves it broken
+        Parameters:
+            name : str
+                Name of the model
+            manifest : dict
+                Manifest entries by model name (updated in place)
+            entry : dict
+                Manifest entry of the model (config hash, data fingerprint)
+        """
+        model_file = self.save_path / f"{name}.joblib"
+        joblib.dump(self.trained_models[name], model_file, compress=self.compress)
+        self.logger.info(f"Saving model {self.trained_models[name]} at {model_file}")
+
+        search_file = self.save_path / "search" / f"{name}.joblib"
+        search_file.parent.mkdir(exist_ok=True)
+        joblib.dump({"results": self.results[name], "cv_results": self.cv_results[name]}, search_file)
+        cv_results_file = self.save_path / f"{name}_cv_results.csv"
+        pd.DataFrame(self.cv_results[name]).to_csv(cv_results_file, index=False)
+
+        manifest[name] = {
+            **entry,
+            "model_file": model_file.name,
+            "search_file": search_file.relative_to(self.save_path).as_posix(),
+            "cv_results_file": cv_results_file.name,
+            "results": self.results[name],
+            "saved_at": datetime.now().isoformat(timespec="seconds")
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"preprocessing_type": self.preprocessing_type, "models": manifest}, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+
+    def load_checkpoint(self, name: str, manifest: dict, entry: dict) -> bool:
+        """
+        Loads the model from its checkpoint if the checkpoint matches the configuration and the data
+        Parameters:
+            name : str
+                Name of the model
+            manifest : dict
+                Manifest entries by model name
+            entry : dict
+                Current config hash and data fingerprint of the model
+        Returns:
+            bool
+                True if the model was loaded from the checkpoint
+        """
+        saved = manifest.get(name)
+        if saved is None or any(saved.get(key) != value for key, value in entry.items()):
+            return False
+
+        model_file = self.save_path / saved["model_file"]
+        search_file = self.save_path / saved.get("search_file", f"search/{name}.joblib")
+        if not model_file.is_file() or not search_file.is_file():
+            return False
+
+        search = joblib.load(search_file)
+        self.trained_models[name] = joblib.load(model_file)
+        self.results[name] = search["results"]
+        self.cv_results[name] = search["cv_results"]
+        self.logger.info(f"Reusing checkpoint of {name} model saved at {saved.get('saved_at')} ({model_file}): "
+                         f"configuration, search class, library versions and data are unchanged "
+                         f"(set resume=False to retrain)")
+        return True
+
+
+    @instrument()
     def train_models(self) -> None:
         """
-        Trains all models using GridSearchCV.
-        Special handling is applied for LogisticRegression
-        due to constraints with l1_ratio and solver compatibility
+        Trains all models using GridSearchCV or the search class of the model.
+        LogisticRegression is tuned over the regularization paths of get_lr_grid
+        Every model is saved as soon as it is trained (see save_checkpoint),
+        models with a matching checkpoint are loaded instead of training if 'resume' is set
         """
+        annotate(rows_in=len(self.X_train))
         self.trained_models = {}
         self.results = {}
+        self.cv_results = {}
+        manifest = self.load_manifest()
+        data_fingerprint = self.get_data_fingerprint()
 
         for name, model in self.models.items():
+            entry = {"config_hash": self.get_config_hash(name), "data_fingerprint": data_fingerprint}
+            if self.resume and self.load_checkpoint(name, manifest, entry):
+                continue
+
             self.logger.info(f"Training {name} model")
             base_params = self.params[name]
 
-            # Separate processing for Logistic regression
-            if name == "LR":
-                params = [
-                {
-                    "solver": ["lbfgs", "liblinear"],
-                    "C": base_params["C"],
-                    "max_iter": base_params["max_iter"]
-                },
-                {
-                    "solver": ["liblinear", "saga"],
-                    "C": base_params["C"],
-                    "max_iter": base_params["max_iter"]
-                },
-                {
-                    "solver": ["saga"],
-                    "l1_ratio": base_params["l1_ratio"],
-                    "C": base_params["C"],
-                    "max_iter": base_params["max_iter"]
-                }
-            ]
-            else:
-                params = base_params
+            params = self.get_lr_grid(base_params) if name == "LR" else base_params
 
             # Tuning
-            gs = GridSearchCV(
+            search_cls, search_params = self.searches[name]
+            gs = search_cls(
                 estimator=model,
                 param_grid=params,
                 cv=self.config["gridsearch"]["cv"],
                 scoring=self.config["gridsearch"]["scoring"],
-                n_jobs=self.config["gridsearch"]["n_jobs"]
+                n_jobs=self.config["gridsearch"]["n_jobs"],
+                **search_params
             )
-            gs.fit(self.X_train, self.y_train)
+            start = time.perf_counter()
+            with stage(f"search.{self.preprocessing_type}.{name}", rows_in=len(self.X_train)):
+                gs.fit(self.X_train, self.y_train)
+            search_time = time.perf_counter() - start
 
             # Saving parameters and score
             self.trained_models[name] = gs.best_estimator_
+            self.cv_results[name] = gs.cv_results_
             self.results[name] = {
                 "best_params": gs.best_params_,
-                "best_score": gs.best_score_
+                "best_score": float(gs.best_score_),
+                "n_iter": self.get_n_iter(gs.best_estimator_),
+                "n_fits": int(getattr(gs, "n_fits_", len(gs.cv_results_["params"]) * gs.n_splits_)),
+                "search_time": search_time
             }
             self.logger.info(f"{name} best params: {gs.best_params_}, best CV score: {gs.best_score_:.4f}")
+            if self.results[name]["n_iter"] is not None:
+                self.logger.info(f"{name} stopped at iteration {self.results[name]['n_iter']}")
+
+            # Checkpoint
+            self.save_checkpoint(name, manifest, entry)
+
 
-        # Saving models
+    @instrument()
+    def export_models(self) -> None:
+        """
+        Exports trained models to the compact array-based format (see src/models/export.py)
+        Files are saved to 'models/<preprocessing_type>/compact/<name>.npz',
+        models not supported by the format are skipped
+        """
+        export_path = self.save_path / "compact"
         for name, model in self.trained_models.items():
-            file_path = self.save_path / f"{name}.joblib"
-            joblib.dump(model, file_path)
-            self.logger.info(f"Saving model {model} at {file_path}")
+            try:
+                file_path = save_compact(model, export_path / f"{name}.npz")
+            except ValueError as e:
+                self.logger.warning(f"Model {name} is not exported: {e}")
+                continue
+
+            joblib_size = (self.save_path / f"{name}.joblib").stat().st_size
+            self.logger.info(f"Exported {name} model to {file_path} "
+                             f"({file_path.stat().st_size / 1024:.1f} KB, joblib {joblib_size / 1024:.1f} KB)")
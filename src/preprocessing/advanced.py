@@ -3,6 +3,7 @@ import pandas as pd
 from sklearn.preprocessing import RobustScaler
 from  sklearn.impute import KNNImputer
 from sklearn.ensemble import IsolationForest
+from src.utils.instrumentation import instrument
 
 
 class AdvancedPreprocessor(BasePreprocessor):
@@ -13,7 +14,18 @@ class AdvancedPreprocessor(BasePreprocessor):
     - Missing values are imputed using KNNImputer
     - Feature scaling with RobustScaler
     - Filters outliers using IsolationForest
+    Attributes:
+        frequencies : dict
+            Frequencies of the categories by categorical and binary feature
+        imputer : KNNImputer or None
+            Imputer fitted on all features
+        scaler : RobustScaler or None
+            Fitted scaler of numeric features
     """
+    # Steps of run in their order (also timed step by step by src/benchmarks/preprocessing.py)
+    STEPS = ("remove_duplicates", "split_feature_types", "encoding", "remove_missing", "scaling",
+             "remove_outliers", "set_feature_names")
+
     def __init__(self, df: pd.DataFrame, target: str = 'HeartDisease') -> None:
         """
         Initializes StandardPreprocessor
@@ -24,8 +36,12 @@ class AdvancedPreprocessor(BasePreprocessor):
                 Target column name from parent class (default is 'HeartDisease')
         """
         super().__init__(df, target)
+        self.frequencies: dict = {}
+        self.imputer: KNNImputer | None = None
+        self.scaler: RobustScaler | None = None
 
 
+    @instrument()
     def encoding(self) -> None:
         """
         Applies encoded by frequency
@@ -33,9 +49,11 @@ class AdvancedPreprocessor(BasePreprocessor):
         encoding_data = self.categorical_cols + self.binary_cols
         for column in encoding_data:
             freq = self.df[column].value_counts(normalize=True)
+            self.frequencies[column] = freq.to_dict()
             self.df[column] = self.df[column].map(freq)
 
 
+    @instrument()
     def remove_missing(self) -> None:
         """
         Missing values are imputed using KNNImputer
@@ -45,12 +63,14 @@ class AdvancedPreprocessor(BasePreprocessor):
         # Drop missing values in the target column
         self.df = self.df.dropna(subset=[self.target])
 
+        # The imputer is fitted even without missing values, new records may have them
+        features = self.df.drop(columns=[self.target])
+        self.imputer = KNNImputer(n_neighbors=5).fit(features)
+
         # Impute missing values in the DataFrame
         if super().check_missing():
-            features = self.df.drop(columns=[self.target])
-            imputer = KNNImputer(n_neighbors=5)
             features_imputed = pd.DataFrame(
-                imputer.fit_transform(features),
+                self.imputer.transform(features),
                 columns = features.columns,
                 index = features.index
             )
@@ -59,14 +79,16 @@ class AdvancedPreprocessor(BasePreprocessor):
             super().check_missing()
 
 
+    @instrument()
     def scaling(self) -> None:
         """
         Scaling of numerical features with RobustScaler
         """
-        scaler = RobustScaler()
-        self.df[self.numeric_cols] = scaler.fit_transform(self.df[self.numeric_cols])
+        self.scaler = RobustScaler()
+        self.df[self.numeric_cols] = self.scaler.fit_transform(self.df[self.numeric_cols])
 
 
+    @instrument()
     def remove_outliers(self) -> None:
         """
         Filters outliers using IsolationForest
@@ -76,16 +98,34 @@ class AdvancedPreprocessor(BasePreprocessor):
         self.df = self.df[mask == 1].reset_index(drop=True)
 
 
+    def transform(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the fitted advanced preprocessing to new raw records
+        Categories unseen in training are treated as missing and imputed
+        Parameters:
+            records : pd.DataFrame
+                Raw records with the input columns
+        Returns:
+            pd.DataFrame
+                Features in the order of the processed DataFrame
+        """
+        df = self.prepare_records(records)
+        for column, freq in self.frequencies.items():
+            df[column] = df[column].map(freq)
+
+        features = self.imputer.feature_names_in_
+        df = pd.DataFrame(self.imputer.transform(df[features]), columns=features, index=df.index)
+        df[self.numeric_cols] = self.scaler.transform(df[self.numeric_cols])
+        return df[self.feature_names]
+
+
+    @instrument()
     def run(self) -> None:
         """
         Run full advanced preprocessing pipeline
         """
-        self.remove_duplicates()
-        super().split_feature_types()
-        self.encoding()
-        self.remove_missing()
-        self.scaling()
-        self.remove_outliers()
+        for step in self.STEPS:
+            getattr(self, step)()
 
         counts = self.df[self.target].value_counts()
         self.logger.info(f'Target balance after advanced preprocessing:\n{counts}.')
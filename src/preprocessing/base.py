@@ -1,9 +1,12 @@
+import joblib
 import numpy as np
 import pandas as pd
+from pathlib import Path
 from pandas.api.types import is_numeric_dtype
 from logging import Logger
 from src.utils.logger import get_logger
 from src.utils.validator import Validator
+from src.utils.instrumentation import instrument
 
 
 class BasePreprocessor:
@@ -33,7 +36,17 @@ class BasePreprocessor:
             List with categorical feature names
         binary_cols : List or None
             List with binary feature names
+        raw_dtypes : dict
+            Types of the input feature columns (after converting Cholesterol zeros to NaN)
+        feature_names : List or None
+            Output feature names in the order of the processed DataFrame (set by run)
+    Fitted state (encoders, scalers, fill values) is kept by the subclasses, so new raw
+    records can be processed with transform. Pickled preprocessors (see save) don't keep
+    the DataFrame, logger and validator
     """
+    # Steps of run in their order, method names defined by the subclasses
+    STEPS: tuple = ()
+
     def __init__(self, df: pd.DataFrame, target: str = "HeartDisease") -> None:
         """
         Initialize the BasePreprocessor class
@@ -58,14 +71,17 @@ class BasePreprocessor:
         self.numeric_cols: list | None = None
         self.categorical_cols: list | None = None
         self.binary_cols: list | None = None
+        self.feature_names: list | None = None
 
         # Logging
         self.logger.info(f"Base preprocessor initialized, shape: {self.df.shape}, target - {self.target}")
 
         # Calling a method for converts missing values encoded as zeros in the 'Cholesterol' column to NaN
         self.replace_cholesterol_zeros()
+        self.raw_dtypes: dict = self.df.drop(columns=[self.target]).dtypes.to_dict()
 
 
+    @instrument()
     def replace_cholesterol_zeros(self) -> None:
         """
         Converts missing values encoded as zeros in the 'Cholesterol' column to NaN
@@ -76,6 +92,7 @@ class BasePreprocessor:
             self.logger.info(f"Replaced {n_zeros} zeros with NaN in Cholesterol column")
 
 
+    @instrument()
     def split_feature_types(self) -> dict:
         """
         Classifies features by type (numeric, categorical, binary)
@@ -113,6 +130,7 @@ class BasePreprocessor:
         return self.feature_types
 
 
+    @instrument()
     def remove_duplicates(self) -> None:
         """
         Remove complete duplicate rows
@@ -125,4 +143,108 @@ class BasePreprocessor:
         """
         Checks for missing values in the DataFrame
         """
-        return self.validator.check_missing(self.df)
\ No newline at end of file
+        return self.validator.check_missing(self.df)
+
+
+    @instrument()
+    def set_feature_names(self) -> None:
+        """
+        Stores the output feature names of the processed DataFrame
+        """
+        self.feature_names = [col for col in self.df.columns if col != self.target]
+
+
+    def prepare_records(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepares new raw records for transform: selects the input feature columns,
+        restores their training types and converts Cholesterol zeros to NaN
+        Parameters:
+            records : pd.DataFrame
+                Raw records with the input columns (the target column is ignored)
+        Returns:
+            pd.DataFrame
+                Copy of the records with the input feature columns
+        Raises:
+            ValueError: If input feature columns are missing
+        """
+        missing = [col for col in self.raw_dtypes if col not in records.columns]
+        if missing:
+            raise ValueError(f"Records have no columns: {missing}")
+
+        df = records[list(self.raw_dtypes)].copy()
+        if "Cholesterol" in df.columns:
+            df["Cholesterol"] = df["Cholesterol"].replace(0, np.nan)
+        for col, dtype in self.raw_dtypes.items():
+            if df[col].notna().all():
+                df[col] = df[col].astype(dtype)
+            elif is_numeric_dtype(dtype):
+                df[col] = df[col].astype(np.float64)
+        return df
+
+
+    def transform(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the fitted preprocessing to new raw records
+        The base preprocessing only converts Cholesterol zeros to NaN and restores the training types,
+        subclasses add their encoding, scaling and filling of missing values.
+        Rows are never dropped
+        Parameters:
+            records : pd.DataFrame
+                Raw records with the input columns
+        Returns:
+            pd.DataFrame
+                Features in the order of the processed DataFrame
+        """
+        df = self.prepare_records(records)
+        return df[self.feature_names] if self.feature_names is not None else df
+
+
+    def save(self, path: Path) -> Path:
+        """
+        Saves the fitted preprocessor without the processed DataFrame
+        Parameters:
+            path : Path
+                Path of the file to save
+        Returns:
+            Path
+                Path of the saved file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+        self.logger.info(f"{type(self).__name__} saved to {path}")
+        return path
+
+
+    @staticmethod
+    def load(path: Path) -> "BasePreprocessor":
+        """
+        Loads a fitted preprocessor saved with save
+        Parameters:
+            path : Path
+                Path of the saved file
+        Returns:
+            BasePreprocessor
+                Fitted preprocessor
+        """
+        Validator().check_file_exists(path)
+        return joblib.load(path)
+
+
+    def __getstate__(self) -> dict:
+        """
+        Drops the DataFrame, logger and validator from the pickled state
+        """
+        state = self.__dict__.copy()
+        for key in ("df", "logger", "validator"):
+            state.pop(key, None)
+        return state
+
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restores the pickled state with a new logger and validator
+        """
+        self.__dict__.update(state)
+        self.df = None
+        self.logger = get_logger()
+        self.validator = Validator()
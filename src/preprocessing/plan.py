@@ -0,0 +1,257 @@
+import math
+import numpy as np
+from src.preprocessing.base import BasePreprocessor
+
+# Columns where zero means a missing value (see BasePreprocessor.replace_cholesterol_zeros)
+ZERO_MISSING = ("Cholesterol",)
+
+
+class TransformPlan:
+    """
+    Compiled single-record transform of a fitted preprocessor
+    Maps a raw record dict straight to a NumPy feature vector in the order of
+    the processed DataFrame, without pandas:
+    - numeric features: one fused multiply-add 'value * scale + shift' (scaler folded in)
+    - one-hot features: lookup table from a category to its output position
+    - frequency features: lookup table from a category to its frequency
+    Missing values are filled with the fitted fill values, missing values of AdvancedPreprocessor
+    are imputed from the nearest training rows of its KNNImputer with NumPy (nan-euclidean distances,
+    as the imputer does)
+    Attributes:
+        preprocessor : BasePreprocessor
+            Fitted preprocessor
+        feature_names : list
+            Output feature names
+        numeric : list
+            (column, position, fill value) of numeric features (fill value None - KNN imputation)
+        numeric_positions : np.ndarray
+            Output positions of numeric features
+        scale : np.ndarray
+            Scale of numeric features (scaler folded in)
+        shift : np.ndarray
+            Shift of numeric features (scaler folded in)
+        one_hot : list
+            (column, positions of the block, category positions, fill value, strict) of one-hot features
+        frequency : list
+            (column, position, frequencies) of frequency encoded features
+        fit_X, fit_missing, fit_norms : np.ndarray
+            Training rows of the KNN imputer (missing values as zeros), their missing mask
+            and squared norms (AdvancedPreprocessor only)
+        columns : frozenset
+            Raw columns required in a record
+        out : np.ndarray
+            Preallocated output vector reused by transform_one
+    """
+    def __init__(self, preprocessor: BasePreprocessor) -> None:
+        """
+        Compiles the plan of a fitted preprocessor
+        Parameters:
+            preprocessor : BasePreprocessor
+                Fitted SimplePreprocessor, StandardPreprocessor or AdvancedPreprocessor
+        Raises:
+            ValueError: If the preprocessor is not fitted or not supported
+        """
+        if preprocessor.feature_names is None:
+            raise ValueError(f"{type(preprocessor).__name__} is not fitted")
+        self.preprocessor = preprocessor
+        self.feature_names = list(preprocessor.feature_names)
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        self.numeric = []
+        self.one_hot = []
+        self.frequency = []
+
+        kind = type(preprocessor).__name__
+        fill_values = getattr(preprocessor, "fill_values", None) or {}
+        scale, shift = self.fold_scaler(preprocessor)
+        for column in preprocessor.numeric_cols:
+            self.numeric.append((column, position[column], fill_values.get(column)))
+        self.numeric_positions = np.asarray([i for _, i, _ in self.numeric], dtype=np.intp)
+        self.scale = np.asarray([scale[column] for column in preprocessor.numeric_cols])
+        self.shift = np.asarray([shift[column] for column in preprocessor.numeric_cols])
+
+        encoded_cols = preprocessor.categorical_cols + preprocessor.binary_cols
+        if kind == "SimplePreprocessor":
+            for column in encoded_cols:
+                categories = {value: position[f"{column}_{value}"] for value in preprocessor.categories[column]}
+                self.add_one_hot(column, categories, fill_values[column], strict=False)
+        elif kind == "StandardPreprocessor":
+            names = preprocessor.encoder.get_feature_names_out(encoded_cols)
+            offset = 0
+            for column, values in zip(encoded_cols, preprocessor.encoder.categories_):
+                categories = {value: position[names[offset + i]] for i, value in enumerate(values)}
+                self.add_one_hot(column, categories, fill_values[column], strict=True)
+                offset += len(values)
+        elif kind == "AdvancedPreprocessor":
+            if preprocessor.imputer.weights != "uniform":
+                raise ValueError("Only KNNImputer with uniform weights is supported")
+            if list(preprocessor.imputer.feature_names_in_) != self.feature_names:
+                raise ValueError("Imputer features differ from the output features")
+            for column in encoded_cols:
+                self.frequency.append((column, position[column], preprocessor.frequencies[column]))
+
+            # Training rows of the imputer with missing values set to zero, as in nan-euclidean distances
+            self.fit_missing = np.isnan(preprocessor.imputer._fit_X)
+            self.fit_X = np.where(self.fit_missing, 0.0, preprocessor.imputer._fit_X)
+            self.fit_norms = np.einsum("ij,ij->i", self.fit_X, self.fit_X)[None, :]
+        else:
+            raise ValueError(f"{kind} is not supported by the transform plan")
+
+        self.columns = frozenset(column for column, *_ in self.numeric + self.one_hot + self.frequency)
+        self.out = np.zeros(len(self.feature_names))
+
+
+    @staticmethod
+    def fold_scaler(preprocessor: BasePreprocessor) -> tuple[dict, dict]:
+        """
+        Folds the fitted scaler into a scale and a shift of every numeric feature
+        StandardScaler: (x - mean) / scale, RobustScaler: (x - center) / scale, no scaler: x
+        Returns:
+            tuple[dict, dict]
+                Scale and shift by numeric feature
+        """
+        scaler = getattr(preprocessor, "scaler", None)
+        columns = preprocessor.numeric_cols
+        if scaler is None:
+            return dict.fromkeys(columns, 1.0), dict.fromkeys(columns, 0.0)
+
+        center = scaler.mean_ if hasattr(scaler, "mean_") else scaler.center_
+        divisor = scaler.scale_
+        scale = {column: 1.0 / divisor[i] for i, column in enumerate(columns)}
+        shift = {column: -center[i] / divisor[i] for i, column in enumerate(columns)}
+        return scale, shift
+
+
+    def add_one_hot(self, column: str, categories: dict, fill_value, strict: bool) -> None:
+        """
+        Adds a one-hot feature to the plan
+        Parameters:
+            column : str
+                Raw column name
+            categories : dict
+                Output position by category
+            fill_value : object
+                Category used for missing values
+            strict : bool
+                Whether unseen categories raise an error (OneHotEncoder) or give zeros (get_dummies)
+        """
+        block = np.fromiter(categories.values(), dtype=np.intp)
+        self.one_hot.append((column, block, categories, fill_value, strict))
+
+
+    @staticmethod
+    def is_missing(column: str, value) -> bool:
+        """
+        Checks whether a raw value is missing
+        """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return True
+        return column in ZERO_MISSING and value == 0
+
+
+    def transform_one(self, record: dict, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Transforms one raw record
+        Parameters:
+            record : dict
+                Raw record by column name
+            out : np.ndarray, optional
+                Output vector (default is None - the preallocated vector of the plan,
+                overwritten by the next call, copy it to keep the result)
+        Returns:
+            np.ndarray
+                Feature vector in the order of 'feature_names'
+        Raises:
+            ValueError: If the record has no column of the plan
+                        or a category is unseen in training (StandardPreprocessor)
+        """
+        if not self.columns <= record.keys():
+            raise ValueError(f"Records have no columns: {sorted(self.columns - record.keys())}")
+        out = self.out if out is None else out
+        impute = False
+
+        for column, i, fill in self.numeric:
+            value = record[column]
+            if self.is_missing(column, value):
+                if fill is None:
+                    impute = True
+                    value = np.nan
+                else:
+                    value = fill
+            out[i] = value
+
+        for column, block, categories, fill, strict in self.one_hot:
+            value = record[column]
+            if self.is_missing(column, value):
+                value = fill
+            out[block] = 0.0
+            i = categories.get(value)
+            if i is not None:
+                out[i] = 1.0
+            elif strict:
+                raise ValueError(f"Unknown category {value!r} of {column}")
+
+        for column, i, frequencies in self.frequency:
+            value = frequencies.get(record[column])
+            if value is None:
+                value = np.nan
+                impute = True
+            out[i] = value
+
+        if impute:
+            self.impute(out)
+        out[self.numeric_positions] = out[self.numeric_positions] * self.scale + self.shift
+        return out
+
+
+    def impute(self, x: np.ndarray) -> None:
+        """
+        Imputes missing values of an unscaled vector in place as KNNImputer(weights='uniform'):
+        every missing feature is the mean of the nearest training rows having it.
+        Nan-euclidean distances follow the operations of scikit-learn, so tied neighbors are chosen the same way
+        Parameters:
+            x : np.ndarray
+                Vector in the imputer feature order with NaN for missing values
+        """
+        fit_X, fit_missing, fit_norms = self.fit_X, self.fit_missing, self.fit_norms
+        missing = np.isnan(x)
+        x0 = np.where(missing, 0.0, x)[None, :]
+
+        distances = -2 * (x0 @ fit_X.T)
+        distances += np.einsum("ij,ij->i", x0, x0)[:, None]
+        distances += fit_norms
+        np.maximum(distances, 0, out=distances)
+        distances -= (x0 * x0) @ fit_missing.T
+        distances -= missing[None, :].astype(np.float64) @ (fit_X * fit_X).T
+        np.clip(distances, 0, None, out=distances)
+        present_count = (1 - missing[None, :].astype(np.float64)) @ (~fit_missing).T
+        distances[present_count == 0] = np.nan
+        np.maximum(1, present_count, out=present_count)
+        distances = np.sqrt(distances / present_count * len(x))[0]
+
+        n_neighbors = self.preprocessor.imputer.n_neighbors
+        for col in np.flatnonzero(missing):
+            donors = np.flatnonzero(~fit_missing[:, col])
+            donor_distances = distances[donors]
+            if np.isnan(donor_distances).all():
+                x[col] = fit_X[donors, col].mean()
+                continue
+            k = min(n_neighbors, len(donors))
+            nearest = np.argpartition(donor_distances, k - 1)[:k]
+            nearest = nearest[~np.isnan(donor_distances[nearest])]
+            x[col] = fit_X[donors[nearest], col].mean()
+
+
+    def transform_many(self, records: list[dict]) -> np.ndarray:
+        """
+        Transforms raw records into a feature matrix, row by row
+        Parameters:
+            records : list[dict]
+                Raw records by column name
+        Returns:
+            np.ndarray
+                Features, shape (n_records, n_features)
+        """
+        X = np.zeros((len(records), len(self.feature_names)))
+        for row, record in zip(X, records):
+            self.transform_one(record, row)
+        return X
@@ -1,5 +1,6 @@
 from src.preprocessing.base import BasePreprocessor
 import pandas as pd
+from src.utils.instrumentation import instrument
 
 
 class SimplePreprocessor(BasePreprocessor):
@@ -10,7 +11,17 @@ class SimplePreprocessor(BasePreprocessor):
     - Filters outliers using predefined thresholds
     - Does not perform feature scaling
     - Applies one-hot encoding using pandas
+    Attributes:
+        fill_values : dict or None
+            Mean of numeric and mode of other features, fills missing values of new records in transform
+            (the pipeline itself drops rows with missing values)
+        categories : dict
+            Categories of the one-hot encoded features by feature
     """
+    # Steps of run in their order (also timed step by step by src/benchmarks/preprocessing.py)
+    STEPS = ("remove_duplicates", "remove_missing", "remove_outliers", "split_feature_types",
+             "fit_fill_values", "encoding", "set_feature_names")
+
     def __init__(self, df: pd.DataFrame, target: str = 'HeartDisease') -> None:
         """
         Initializes SimplePreprocessor
@@ -21,8 +32,11 @@ class SimplePreprocessor(BasePreprocessor):
                 Target column name from parent class (default is 'HeartDisease')
         """
         super().__init__(df, target)
+        self.fill_values: dict | None = None
+        self.categories: dict = {}
 
 
+    @instrument()
     def remove_missing(self) -> None:
         """
         Removes rows with missing values
@@ -33,6 +47,7 @@ class SimplePreprocessor(BasePreprocessor):
             super().check_missing()
 
 
+    @instrument()
     def remove_outliers(self) -> None:
         """
         Filters outliers using predefined thresholds (see EDA)
@@ -41,6 +56,7 @@ class SimplePreprocessor(BasePreprocessor):
             self.df = self.df.loc[(self.df['RestingBP'] >= 50)].reset_index(drop = True)
 
 
+    @instrument()
     def scaling(self) -> None:
         """
         There is no scaling in a simple pipeline
@@ -48,24 +64,50 @@ class SimplePreprocessor(BasePreprocessor):
         pass
 
 
+    @instrument()
     def encoding(self) -> None:
         """
         Applies one-hot encoding using pandas for categorical and binary features
         """
         columns_to_encode = self.categorical_cols + self.binary_cols
+        self.categories = {column: sorted(self.df[column].dropna().unique()) for column in columns_to_encode}
         self.df = pd.get_dummies(self.df, columns=columns_to_encode)
 
 
+    @instrument()
+    def fit_fill_values(self) -> None:
+        """
+        Stores the mean of numeric features and the mode of categorical and binary features
+        """
+        self.fill_values = {feature: self.df[feature].mean() for feature in self.numeric_cols}
+        for feature in self.categorical_cols + self.binary_cols:
+            self.fill_values[feature] = self.df[feature].mode()[0]
+
+
+    def transform(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the fitted simple preprocessing to new raw records
+        Missing values are filled, categories unseen in training get zeros in all their columns
+        Parameters:
+            records : pd.DataFrame
+                Raw records with the input columns
+        Returns:
+            pd.DataFrame
+                Features in the order of the processed DataFrame
+        """
+        df = self.prepare_records(records).fillna(self.fill_values)
+        df = pd.get_dummies(df, columns=self.categorical_cols + self.binary_cols)
+        return df.reindex(columns=self.feature_names, fill_value=False)
+
+
+    @instrument()
     def run(self) -> None:
         """
         Run full simple preprocessing pipeline
         """
         self.logger.info(f'Running simple preprocessor')
-        self.remove_duplicates()
-        self.remove_missing()
-        self.remove_outliers()
-        super().split_feature_types()
-        self.encoding()
+        for step in self.STEPS:
+            getattr(self, step)()
 
         counts = self.df[self.target].value_counts()
         self.logger.info(f'Target balance after simple preprocessing:\n{counts}.')
\ No newline at end of file
@@ -2,6 +2,7 @@ from src.preprocessing.base import BasePreprocessor
 from sklearn.preprocessing import StandardScaler
 from sklearn.preprocessing import OneHotEncoder
 import pandas as pd
+from src.utils.instrumentation import instrument
 
 
 class StandardPreprocessor(BasePreprocessor):
@@ -12,7 +13,18 @@ class StandardPreprocessor(BasePreprocessor):
     - Filters outliers using percentiles
     - Applies one-hot encoding using Scikit-Learn
     - Feature scaling with StandardScaler
+    Attributes:
+        fill_values : dict or None
+            Mean of numeric and mode of other features used to fill missing values
+        encoder : OneHotEncoder or None
+            Fitted one-hot encoder of categorical and binary features
+        scaler : StandardScaler or None
+            Fitted scaler of numeric features
     """
+    # Steps of run in their order (also timed step by step by src/benchmarks/preprocessing.py)
+    STEPS = ("remove_duplicates", "split_feature_types", "remove_missing", "remove_outliers",
+             "encoding", "scaling", "set_feature_names")
+
     def __init__(self, df: pd.DataFrame, target: str = "HeartDisease") -> None:
         """
         Initializes StandardPreprocessor
@@ -23,8 +35,12 @@ class StandardPreprocessor(BasePreprocessor):
                 Target column name from parent class (default is 'HeartDisease')
         """
         super().__init__(df, target)
+        self.fill_values: dict | None = None
+        self.encoder: OneHotEncoder | None = None
+        self.scaler: StandardScaler | None = None
 
 
+    @instrument()
     def remove_missing(self) -> None:
         """
         Replaces missing values with mean for numeric features
@@ -33,17 +49,20 @@ class StandardPreprocessor(BasePreprocessor):
         if self.df[self.target].isna().sum() > 0:
             self.df = self.df.dropna(subset=[self.target])
 
-        if super().check_missing():
-            for feature in self.numeric_cols:
-                self.df[feature] = self.df[feature].fillna(self.df[feature].mean())
+        # Fill values are kept for new records even if the data has no missing values
+        self.fill_values = {feature: self.df[feature].mean() for feature in self.numeric_cols}
+        features_moda = self.categorical_cols + self.binary_cols
+        for feature in features_moda:
+            self.fill_values[feature] = self.df[feature].mode()[0]
 
-            features_moda = self.categorical_cols + self.binary_cols
-            for feature in features_moda:
-                self.df[feature] = self.df[feature].fillna(self.df[feature].mode()[0])
+        if super().check_missing():
+            for feature in self.numeric_cols + features_moda:
+                self.df[feature] = self.df[feature].fillna(self.fill_values[feature])
 
             super().check_missing()
 
 
+    @instrument()
     def remove_outliers(self) -> None:
         """
         Filters outliers using percentiles
@@ -60,6 +79,7 @@ class StandardPreprocessor(BasePreprocessor):
         self.df = self.df.loc[mask].reset_index(drop=True)
 
 
+    @instrument()
     def encoding(self) -> None:
         """
         Applies one-hot encoding using Scikit-Learn
@@ -67,13 +87,13 @@ class StandardPreprocessor(BasePreprocessor):
         columns_to_encode = self.categorical_cols + self.binary_cols
 
         # Get sparse matrix
-        encoder = OneHotEncoder()
-        encoded_data = encoder.fit_transform(self.df[columns_to_encode])
+        self.encoder = OneHotEncoder()
+        encoded_data = self.encoder.fit_transform(self.df[columns_to_encode])
 
         # Convert to data frame
         encoded_df = pd.DataFrame.sparse.from_spmatrix(
             encoded_data,
-            columns = encoder.get_feature_names_out(columns_to_encode),
+            columns = self.encoder.get_feature_names_out(columns_to_encode),
             index = self.df.index,
         )
 
@@ -81,24 +101,47 @@ class StandardPreprocessor(BasePreprocessor):
         self.df = pd.concat([self.df.drop(columns=columns_to_encode), encoded_df], axis=1)
 
 
+    @instrument()
     def scaling(self) -> None:
         """
         Scaling of numerical features with StandardScaler
         """
-        scaler = StandardScaler()
-        self.df[self.numeric_cols] = scaler.fit_transform(self.df[self.numeric_cols])
+        self.scaler = StandardScaler()
+        self.df[self.numeric_cols] = self.scaler.fit_transform(self.df[self.numeric_cols])
+
+
+    def transform(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the fitted standard preprocessing to new raw records
+        Parameters:
+            records : pd.DataFrame
+                Raw records with the input columns
+        Returns:
+            pd.DataFrame
+                Features in the order of the processed DataFrame
+        Raises:
+            ValueError: If records have categories unseen in training
+        """
+        df = self.prepare_records(records).fillna(self.fill_values)
+        columns_to_encode = self.categorical_cols + self.binary_cols
+
+        encoded_df = pd.DataFrame(
+            self.encoder.transform(df[columns_to_encode]).toarray(),
+            columns = self.encoder.get_feature_names_out(columns_to_encode),
+            index = df.index,
+        )
+        df = pd.concat([df.drop(columns=columns_to_encode), encoded_df], axis=1)
+        df[self.numeric_cols] = self.scaler.transform(df[self.numeric_cols])
+        return df[self.feature_names]
 
 
+    @instrument()
     def run(self) -> None:
         """
         Run full standard preprocessing pipeline
         """
-        self.remove_duplicates()
-        super().split_feature_types()
-        self.remove_missing()
-        self.remove_outliers()
-        self.encoding()
-        self.scaling()
+        for step in self.STEPS:
+            getattr(self, step)()
 
         counts = self.df[self.target].value_counts()
         self.logger.info(f'Target balance after standard preprocessing:\n{counts}')
\ No newline at end of file
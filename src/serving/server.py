@@ -0,0 +1,362 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import joblib
+import pandas as pd
+import yaml
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from src.models.evaluation import Evaluate
+from src.models.inference import CompactModel
+from src.preprocessing.base import BasePreprocessor
+from src.preprocessing.plan import TransformPlan
+from src.utils.logger import get_logger
+from src.utils.validator import Validator
+
+
+class ScoringService:
+    """
+    Scores raw heart-disease records with a fitted preprocessor and a trained model
+    Both are loaded once, on creation
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        preprocessing_type : str
+            Type of preprocessing used ('simple', 'standard', 'advanced')
+        model_name : str
+            Name of the model (e.g. 'LR')
+        engine : str
+            'sklearn' - trained joblib model, 'compact' - NumPy engine of src/models/inference.py
+        preprocessor : BasePreprocessor
+            Fitted preprocessor
+        plan : TransformPlan or None
+            Compiled transform of the preprocessor (None - records are transformed with pandas)
+        model : object
+            Trained model
+    """
+    def __init__(self,
+                 preprocessing_type: str,
+                 model_name: str,
+                 models_dir: Path = Path("models"),
+                 engine: str = "sklearn",
+                 fast_transform: bool = True) -> None:
+        """
+        Initialize the ScoringService class
+        Parameters:
+            preprocessing_type : str
+                Type of preprocessing used
+            model_name : str
+                Name of the model
+            models_dir : Path, optional
+                Directory with the trained models and preprocessors (default is 'models')
+            engine : str, optional
+                'sklearn' or 'compact' (default is 'sklearn')
+            fast_transform : bool, optional
+                Whether to transform records with a compiled TransformPlan (default is True)
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        self.logger = get_logger()
+        self.preprocessing_type = preprocessing_type
+        self.model_name = model_name
+        self.engine = engine
+
+        self.preprocessor = BasePreprocessor.load(models_dir / "preprocessors" / f"{preprocessing_type}.joblib")
+        self.plan = TransformPlan(self.preprocessor) if fast_transform else None
+        if engine == "compact":
+            self.model = CompactModel.from_file(models_dir / preprocessing_type / "compact" / f"{model_name}.npz")
+        elif engine == "sklearn":
+            model_path = models_dir / preprocessing_type / f"{model_name}.joblib"
+            Validator().check_file_exists(model_path)
+            self.model = joblib.load(model_path)
+        else:
+            raise ValueError(f"Unknown engine {engine}, expected 'sklearn' or 'compact'")
+        self.logger.info(f"Scoring service loaded {model_name} ({engine}) for {preprocessing_type} preprocessing")
+
+
+    def score(self, records: list[dict]) -> list[dict]:
+        """
+        Scores a batch of raw records in one pass of the preprocessor and the model
+        Parameters:
+            records : list[dict]
+                Raw records with the input columns
+        Returns:
+            list[dict]
+                Predicted label and score of the class 1 (None if the model has no scores) for every record
+        """
+        if self.plan is None:
+            X = self.preprocessor.transform(pd.DataFrame.from_records(records))
+        else:
+            X = self.plan.transform_many(records)
+            if hasattr(self.model, "feature_names_in_") and self.engine == "sklearn":
+                X = pd.DataFrame(X, columns=self.plan.feature_names)
+        y_pred, y_score = Evaluate.predict_chunk(self.model, X)
+        scores = [None] * len(y_pred) if y_score is None else y_score.tolist()
+        return [{"prediction": label, "score": score} for label, score in zip(y_pred.tolist(), scores)]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into batches scored by one call
+    A worker thread takes the first waiting record, then collects more until the batch
+    has 'max_batch' records or 'max_wait_ms' have passed, and scores them together
+    Attributes:
+        fn : Callable
+            Function scoring a list of records, returns one result per record
+        max_batch : int
+            Maximum number of records in a batch
+        max_wait : float
+            Maximum time in seconds to wait for more records after the first one
+        queue : queue.Queue
+            Waiting records with their futures
+        n_batches : int
+            Number of scored batches
+        n_records : int
+            Number of scored records
+    """
+    def __init__(self, fn, max_batch: int = 64, max_wait_ms: float = 2.0) -> None:
+        """
+        Initialize the MicroBatcher class and start the worker thread
+        Parameters:
+            fn : Callable
+                Function scoring a list of records
+            max_batch : int, optional
+                Maximum number of records in a batch (default is 64)
+            max_wait_ms : float, optional
+                Maximum wait for more records in milliseconds (default is 2.0)
+        """
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.n_batches = 0
+        self.n_records = 0
+        self.worker = threading.Thread(target=self.run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+
+    def submit(self, record: dict) -> Future:
+        """
+        Adds a record to the next batch
+        Parameters:
+            record : dict
+                Raw record
+        Returns:
+            Future
+                Result of the record, set when its batch is scored
+        """
+        future = Future()
+        self.queue.put((record, future))
+        return future
+
+
+    def run(self) -> None:
+        """
+        Collects and scores batches until close is called
+        """
+        stop = False
+        while not stop:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self.score_batch(batch)
+            self.n_batches += 1
+            self.n_records += len(batch)
+
+
+    def score_batch(self, batch: list[tuple[dict, Future]]) -> None:
+        """
+        Scores a batch and sets the futures of its records
+        If the batch fails, records are scored one by one, so an invalid record
+        fails only its own request
+        Parameters:
+            batch : list[tuple[dict, Future]]
+                Records with their futures
+        """
+        try:
+            results = self.fn([record for record, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                for item in batch:
+                    self.score_batch([item])
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+    def close(self) -> None:
+        """
+        Scores the records already submitted and stops the worker thread
+        """
+        self.queue.put(None)
+        self.worker.join()
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the scoring server
+    - GET /health - status and the loaded model
+    - POST /predict - one record (JSON object) or a list of records (JSON array)
+    Records of a request are submitted one by one, so they are batched with other requests
+    """
+    protocol_version = "HTTP/1.1"
+
+
+    def setup(self) -> None:
+        """
+        Disables Nagle's algorithm on TCP connections: headers and body of a response are separate writes,
+        with Nagle the body waits for the delayed ACK of the client (about 40 ms per request)
+        """
+        super().setup()
+        if self.connection.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+
+    def do_GET(self) -> None:
+        """
+        Reports the status of the server
+        """
+        if self.path != "/health":
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        service = self.server.service
+        self.send_json(200, {"status": "ok", "preprocessing_type": service.preprocessing_type,
+                             "model": service.model_name, "engine": service.engine})
+
+
+    def do_POST(self) -> None:
+        """
+        Scores the records of the request
+        """
+        if self.path != "/predict":
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            records = body if isinstance(body, list) else [body]
+            if not all(isinstance(record, dict) for record in records):
+                raise ValueError("Records must be JSON objects")
+            futures = [self.server.batcher.submit(record) for record in records]
+            results = [future.result(timeout=self.server.timeout_s) for future in futures]
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.server.logger.error(f"Scoring failed: {e}")
+            self.send_json(500, {"error": str(e)})
+            return
+        self.send_json(200, results if isinstance(body, list) else results[0])
+
+
+    def send_json(self, status: int, payload) -> None:
+        """
+        Sends a JSON response
+        """
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def log_message(self, format: str, *args) -> None:
+        """
+        Logs requests at debug level (works for Unix socket clients without an address)
+        """
+        self.server.logger.debug(f"{self.client_address} {format % args}")
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    """
+    Scoring server over TCP
+    """
+    daemon_threads = True
+
+
+class UnixScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Scoring server over a Unix socket (no network access needed)
+    """
+    daemon_threads = True
+
+
+def create_server(config: dict, models_dir: Path = Path("models")):
+    """
+    Creates the scoring server from the serving config
+    Parameters:
+        config : dict
+            Serving configuration (see configs/serving.yaml)
+        models_dir : Path, optional
+            Directory with the trained models and preprocessors (default is 'models')
+    Returns:
+        ScoringHTTPServer or UnixScoringServer
+            Server ready to serve_forever, the batcher and the service are its attributes
+    """
+    service = ScoringService(config["preprocessing_type"], config["model"], models_dir,
+                             engine=config.get("engine", "sklearn"),
+                             fast_transform=config.get("fast_transform", True))
+    batching = config.get("batching", {})
+    batcher = MicroBatcher(service.score, batching.get("max_batch", 64), batching.get("max_wait_ms", 2.0))
+
+    if config.get("unix_socket"):
+        socket_path = Path(config["unix_socket"])
+        if socket_path.exists():
+            os.unlink(socket_path)
+        server = UnixScoringServer(str(socket_path), ScoringHandler)
+    else:
+        server = ScoringHTTPServer((config.get("host", "127.0.0.1"), config.get("port", 8000)), ScoringHandler)
+
+    server.service = service
+    server.batcher = batcher
+    server.logger = get_logger()
+    server.timeout_s = config.get("timeout_s", 10)
+    return server
+
+
+def main() -> None:
+    """
+    Runs the scoring server: python -m src.serving.server --config configs/serving.yaml
+    """
+    parser = argparse.ArgumentParser(description="Local scoring server of heart disease models")
+    parser.add_argument("--config", type=Path, default=Path("configs/serving.yaml"), help="Path to the serving YAML file")
+    args = parser.parse_args()
+
+    Validator().check_file_exists(args.config)
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    server = create_server(config)
+    server.logger.info(f"Scoring server listening on {server.server_address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from src.utils.logger import get_logger
+from src.utils.memory import current_rss
+
+
+def count_rows(obj) -> int | None:
+    """
+    Returns the number of rows of a DataFrame, Series or array (None for other objects)
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) and obj.ndim:
+        return len(obj)
+    return None
+
+
+class Recorder:
+    """
+    Records timing and memory of the pipeline stages of one process
+    A stage records wall and CPU time (process time, all threads), the RSS on entry and its peak
+    and row counts. Stages can be nested, a stage knows its parent and depth.
+    The peak RSS is read on entry and exit of every stage and, while a run is started,
+    sampled by one background thread for all open stages, so the cost of a stage is a few
+    microseconds and one /proc read per sampling interval.
+    Stages of joblib workers are recorded by running the task with run_stage and merged into
+    the recorder of the main process with merge_outputs. perf_counter is a monotonic clock shared
+    by the processes of a machine, so worker stages keep their place on the timeline of the run.
+    The run can be exported as a Chrome trace (see trace).
+    Stages are recorded only while a run is started and inside run_stage tasks (see capture),
+    so long-lived processes calling instrumented code without a run (e.g. the scoring server) keep no records
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        enabled : bool
+            Whether stages are recorded
+        interval : float
+            Sampling interval of the RSS in seconds
+        records : list[dict]
+            Records of the finished stages in the order they finished
+        origin : float
+            perf_counter value of the start of the run, start times of stages are relative to it
+        started_at : datetime
+            Start of the run
+        samples : deque
+            (seconds since the start of the run, RSS in bytes) sampled while the run is started,
+            the last 100000 samples are kept
+        running : bool
+            Whether a run is started
+    """
+    def __init__(self, enabled: bool = True, interval: float = 0.01) -> None:
+        """
+        Initialize the Recorder class
+        Parameters:
+            enabled : bool, optional
+                Whether stages are recorded (default is True)
+            interval : float, optional
+                Sampling interval of the RSS in seconds (default is 0.01)
+        """
+        self.logger = get_logger()
+        self.enabled = enabled
+        self.interval = interval
+        self.records = []
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now()
+        self.samples = deque(maxlen=100_000)
+        self.running = False
+        self._open = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+
+    def start_run(self) -> None:
+        """
+        Clears the records and starts the RSS sampler
+        """
+        self.stop_run()
+        with self._lock:
+            self.records = []
+        self.samples.clear()
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self.sample, name="instrumentation", daemon=True)
+        self._sampler.start()
+        self.running = True
+
+
+    def stop_run(self) -> None:
+        """
+        Stops recording and the RSS sampler, the records are kept until the next run
+        """
+        self.running = False
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+
+    def sample(self) -> None:
+        """
+        Updates the peak RSS of the open stages until the run is stopped
+        """
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            self.samples.append((time.perf_counter() - self.origin, rss))
+            with self._lock:
+                for record in self._open:
+                    record["peak_rss"] = max(record["peak_rss"], rss)
+
+
+    def is_recording(self) -> bool:
+        """
+        Checks whether stages of the current thread are recorded (a run is started or the thread captures)
+        """
+        return self.enabled and (self.running or getattr(self._local, "capture", 0) > 0)
+
+
+    @contextmanager
+    def capture(self):
+        """
+        Records stages of the current thread even without a run (used by run_stage in worker processes)
+        """
+        self._local.capture = getattr(self._local, "capture", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.capture -= 1
+
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None):
+        """
+        Records a block of code
+        Parameters:
+            name : str
+                Name of the stage
+            rows_in : int, optional
+                Number of input rows (default is None)
+        Yields:
+            dict or None
+                Record of the stage, 'rows_out' can be set inside the block (None if not recording)
+        """
+        if not self.is_recording():
+            yield None
+            return
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        rss = current_rss()
+        record = {
+            "name": name,
+            "parent": stack[-1]["name"] if stack else None,
+            "depth": len(stack),
+            "pid": os.getpid(),
+            "thread": threading.get_native_id(),
+            "rows_in": rows_in,
+            "rows_out": None,
+            "rss_start": rss,
+            "peak_rss": rss,
+            "error": None
+        }
+        stack.append(record)
+        with self._lock:
+            self._open.append(record)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            rss = current_rss()
+            stack.pop()
+            record.update({
+                "start_s": start - self.origin,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "rss_start_mb": record.pop("rss_start") / 2 ** 20,
+                "peak_rss_mb": max(record.pop("peak_rss"), rss) / 2 ** 20
+            })
+            record["rss_increase_mb"] = max(record["peak_rss_mb"] - record["rss_start_mb"], 0.0)
+            with self._lock:
+                self._open.remove(record)
+                self.records.append(record)
+
+
+    def annotate(self, **fields) -> None:
+        """
+        Sets fields (e.g. rows_in, rows_out) of the innermost open stage of the thread, if any
+        """
+        stack = getattr(self._local, "stack", None)
+        if self.is_recording() and stack:
+            stack[-1].update(fields)
+
+
+    def add_records(self, records: list[dict], origin: float) -> None:
+        """
+        Adds records of another recorder (e.g. of a worker process) to the run, if a run is started
+        Top-level records become children of the innermost open stage of the thread
+        Parameters:
+            records : list[dict]
+                Records of the other recorder
+            origin : float
+                perf_counter value of the start of the other recorder
+        """
+        if not (self.enabled and self.running):
+            return
+        stack = getattr(self._local, "stack", None) or []
+        for record in records:
+            record["start_s"] += origin - self.origin
+            if record["parent"] is None and stack:
+                record["parent"] = stack[-1]["name"]
+                record["depth"] += len(stack)
+        with self._lock:
+            self.records.extend(records)
+
+
+    def take_records(self, thread: int, since: float) -> list[dict]:
+        """
+        Removes and returns the records of a thread of this process that started at or after a time
+        Parameters:
+            thread : int
+                Native id of the thread
+            since : float
+                Start of the first record to take (seconds since the start of the run)
+        Returns:
+            list[dict]
+                Taken records in the order they finished
+        """
+        pid = os.getpid()
+        with self._lock:
+            taken, kept = [], []
+            for record in self.records:
+                mine = record["pid"] == pid and record["thread"] == thread and record["start_s"] >= since
+                (taken if mine else kept).append(record)
+            self.records = kept
+        return taken
+
+
+    def report(self) -> dict:
+        """
+        Returns the run report: metadata and the records of the stages in the order they started
+        """
+        wall = time.perf_counter() - self.origin
+        return {
+            "metadata": {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "wall_s": wall,
+                "pid": os.getpid(),
+                "peak_rss_mb": max((record["peak_rss_mb"] for record in self.records), default=0.0)
+            },
+            "stages": sorted(self.records, key=lambda record: record["start_s"])
+        }
+
+
+    def trace(self) -> dict:
+        """
+        Returns the run in the Chrome trace event format (chrome://tracing, ui.perfetto.dev)
+        Every stage is a complete event on its process and thread, nested by time,
+        the sampled RSS is a counter of the main process
+        Returns:
+            dict
+                Trace with 'traceEvents'
+        """
+        main_pid = os.getpid()
+        events = []
+        for pid in sorted({record["pid"] for record in self.records} | {main_pid}):
+            name = "pipeline" if pid == main_pid else f"worker {pid}"
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+            events.append({"name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0,
+                           "args": {"sort_index": 0 if pid == main_pid else pid}})
+
+        for record in sorted(self.records, key=lambda record: (record["start_s"], -record["wall_s"])):
+            args = {key: record[key] for key in ["rows_in", "rows_out", "cpu_s", "peak_rss_mb", "rss_increase_mb",
+                                                 "error"] if record.get(key) is not None}
+            events.append({
+                "name": record["name"],
+                "cat": record["name"].split(".")[0],
+                "ph": "X",
+                "ts": record["start_s"] * 1e6,
+                "dur": record["wall_s"] * 1e6,
+                "pid": record["pid"],
+                "tid": record["thread"],
+                "args": args
+            })
+
+        for seconds, rss in self.samples:
+            events.append({"name": "RSS", "ph": "C", "ts": seconds * 1e6, "pid": main_pid, "tid": 0,
+                           "args": {"MB": rss / 2 ** 20}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"started_at": self.started_at.isoformat(timespec="seconds")}}
+
+
+    def save_trace(self, path: Path = Path("results/trace.json")) -> Path:
+        """
+        Saves the run as a Chrome trace JSON (see trace)
+        Parameters:
+            path : Path, optional
+                Path of the trace (default is 'results/trace.json')
+        Returns:
+            Path
+                Path of the saved trace
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f, default=str)
+        self.logger.info(f"Trace of {len(self.records)} stages saved to '{path}'")
+        return path
+
+
+    def save(self, path: Path = Path("results/run_report.json")) -> Path:
+        """
+        Saves the run report as JSON
+        Parameters:
+            path : Path, optional
+                Path of the report (default is 'results/run_report.json')
+        Returns:
+            Path
+                Path of the saved report
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        self.logger.info(f"Run report with {len(self.records)} stages saved to '{path}'")
+        return path
+
+
+# Recorder of the process, used by 'stage' and 'instrument'
+RECORDER = Recorder()
+
+
+def stage(name: str, rows_in: int | None = None):
+    """
+    Records a block of code with the recorder of the process (see Recorder.stage)
+    """
+    return RECORDER.stage(name, rows_in)
+
+
+def annotate(**fields) -> None:
+    """
+    Sets fields of the innermost open stage with the recorder of the process (see Recorder.annotate)
+    """
+    RECORDER.annotate(**fields)
+
+
+def instrument(name: str | None = None):
+    """
+    Decorator recording every call of a function or method with the recorder of the process
+    Rows are counted from 'self.df' of methods (before and after the call) or else
+    from the first DataFrame or array argument and from the result
+    Parameters:
+        name : str, optional
+            Name of the stage (default is None - qualified name of the function)
+    Returns:
+        Callable
+            Decorator
+    """
+    def decorator(fn):
+        stage_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not RECORDER.is_recording():
+                return fn(*args, **kwargs)
+            owner = args[0] if args and hasattr(args[0], "df") else None
+            if owner is not None:
+                rows_in = count_rows(owner.df)
+            else:
+                rows_in = next((n for n in map(count_rows, [*args, *kwargs.values()]) if n is not None), None)
+
+            with RECORDER.stage(stage_name, rows_in) as record:
+                result = fn(*args, **kwargs)
+                rows_out = count_rows(owner.df) if owner is not None else count_rows(result)
+                if rows_out is not None and record is not None:
+                    record["rows_out"] = rows_out
+            return result
+        return wrapper
+    return decorator
+
+
+def run_stage(name: str, fn, *args, **kwargs) -> tuple:
+    """
+    Runs a function as a stage, meant as a joblib task (delayed(run_stage)(name, fn, ...))
+    The task is recorded even without a run (worker processes never start one), its records are
+    taken out of the recorder of the process running it and returned, so the caller can add them
+    to its run with merge_outputs
+    Parameters:
+        name : str
+            Name of the stage
+        fn : Callable
+            Function of the task
+    Returns:
+        tuple
+            Result of the function, records of the task and the origin of the recorder
+    """
+    with RECORDER.capture(), RECORDER.stage(name) as record:
+        result = fn(*args, **kwargs)
+    records = [] if record is None else RECORDER.take_records(threading.get_native_id(), record["start_s"])
+    return result, records, RECORDER.origin
+
+
+def merge_outputs(outputs: list[tuple]) -> list:
+    """
+    Adds the records of run_stage tasks to the recorder of the process
+    Parameters:
+        outputs : list[tuple]
+            Outputs of run_stage
+    Returns:
+        list
+            Results of the tasks
+    """
+    results = []
+    for result, records, origin in outputs:
+        RECORDER.add_records(records, origin)
+        results.append(result)
+    return results
@@ -0,0 +1,83 @@
+import os
+import resource
+import sys
+import threading
+from pathlib import Path
+
+# Resident set size of the process (second field of /proc/self/statm, in pages), Linux only
+STATM = Path("/proc/self/statm")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Returns the current resident set size of the process
+    Falls back to the peak RSS of the process (getrusage) where /proc is not available
+    Returns:
+        int
+            Resident set size in bytes
+    """
+    try:
+        with open(STATM, "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakMemory:
+    """
+    Context manager measuring the peak resident set size of a code block
+    A daemon thread samples the RSS every 'interval' seconds while the block runs,
+    the RSS is also read on entry and exit, so short blocks have at least two samples
+    Attributes:
+        interval : float
+            Sampling interval in seconds
+        start : int
+            RSS on entry in bytes
+        peak : int
+            Highest sampled RSS in bytes
+    """
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Initialize the PeakMemory class
+        Parameters:
+            interval : float, optional
+                Sampling interval in seconds (default is 0.005)
+        """
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def __enter__(self) -> "PeakMemory":
+        self.start = self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.sample, name="peak-memory", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+    def sample(self) -> None:
+        """
+        Samples the RSS until the block exits
+        """
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+    @property
+    def increase(self) -> int:
+        """
+        Returns the peak RSS above the RSS on entry in bytes
+        """
+        return max(self.peak - self.start, 0)
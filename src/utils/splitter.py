@@ -1,13 +1,18 @@
+import numpy as np
 import pandas as pd
 from src.utils.validator import Validator
 from pathlib import Path
 from src.utils.logger import get_logger
+from src.utils.instrumentation import annotate, instrument
 from sklearn.model_selection import train_test_split
 
 
-def splitter(file_path: Path, name: str, target: str = "HeartDisease") -> None:
+@instrument()
+def splitter(file_path: Path, name: str, target: str = "HeartDisease", save_npy: bool = True) -> None:
     """
     Splits data into training and test sets and saves the splits
+    Splits are saved as CSV and, optionally, as .npy files that can be memory-mapped
+    (features as float64, labels with their own dtype)
     Parameters:
         file_path : Path
             Path to the preprocessed data file
@@ -15,6 +20,8 @@ def splitter(file_path: Path, name: str, target: str = "HeartDisease") -> None:
             Name of the data file
         target : str, optional
             Name of the target variable (default is "HeartDisease")
+        save_npy : bool, optional
+            Whether to save .npy copies of the splits (default is True)
     """
     # Component initialization
     logger = get_logger()
@@ -34,6 +41,7 @@ def splitter(file_path: Path, name: str, target: str = "HeartDisease") -> None:
     X = df.drop(columns=[target])
     y = df[target]
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
+    annotate(rows_in=len(df), rows_out=len(X_train) + len(X_test))
     logger.info(f"\ntrain: {X_train.shape},"
                 f"\ntest: {X_test.shape},"
                 f"\ntrain_target: {y_train.shape},"
@@ -46,16 +54,33 @@ def splitter(file_path: Path, name: str, target: str = "HeartDisease") -> None:
     X_test.to_csv(save_dir / f"{name}_X_test.csv", index=False)
     y_train.to_csv(save_dir / f"{name}_y_train.csv", index=False)
     y_test.to_csv(save_dir / f"{name}_y_test.csv", index=False)
+    if save_npy:
+        np.save(save_dir / f"{name}_X_train.npy", X_train.to_numpy(dtype=np.float64))
+        np.save(save_dir / f"{name}_X_test.npy", X_test.to_numpy(dtype=np.float64))
+        np.save(save_dir / f"{name}_y_train.npy", y_train.to_numpy())
+        np.save(save_dir / f"{name}_y_test.npy", y_test.to_numpy())
+        np.save(save_dir / f"{name}_test_ids.npy", X_test.index.to_numpy())
 
     logger.info(f"Split for {name} pipeline is done. File saved to: {save_dir}\n")
 
 
-
-
-
-
-
-
-
-
-
+def load_split(name: str, part: str, split_dir: Path = Path("data/splits"), mmap_mode: str | None = "r") -> np.ndarray:
+    """
+    Loads a split saved as .npy, memory-mapped by default
+    Parameters:
+        name : str
+            Name of the data file (preprocessing type)
+        part : str
+            Part of the split: 'X_train', 'X_test', 'y_train', 'y_test'
+            or 'test_ids' (row indices of the test split in the processed data)
+        split_dir : Path, optional
+            Directory with the splits (default is 'data/splits')
+        mmap_mode : str, optional
+            Memory-map mode passed to np.load (default is 'r', None loads into memory)
+    Returns:
+        np.ndarray
+            Split data
+    """
+    path = split_dir / f"{name}_{part}.npy"
+    Validator().check_file_exists(path)
+    return np.load(path, mmap_mode=mmap_mode)
@@ -0,0 +1,361 @@
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scipy.special import ndtr, ndtri
+from src.loader import DataLoader
+from src.utils.logger import get_logger
+from src.utils.validator import Validator
+
+
+class SyntheticGenerator:
+    """
+    Generates synthetic datasets with the schema of the raw heart-disease data
+    Fitted per class of the target:
+    - marginals: empirical quantiles of numeric columns (interpolated), probabilities of categorical columns
+    - dependence: Gaussian copula, correlation of the normal scores of all columns
+    - missing values and cholesterol zeros: rates of the raw data
+    Numeric columns with at most two values (e.g. FastingBS) are categorical.
+    Datasets are written to CSV in chunks, every chunk has its own random stream,
+    so the output of a seed does not depend on the memory available
+    Attributes:
+        logger : Logger
+            Logger instance for logging messages and saving logs
+        df : pd.DataFrame
+            Raw data the generator is fitted on
+        target : str
+            Name of the target variable
+        zero_column : str
+            Column where zero means a missing value (Cholesterol)
+        cholesterol_zero_rate : float or None
+            Rate of zeros in the zero column (None - rate of the raw data per class)
+        duplicate_rate : float
+            Rate of rows replaced with copies of other rows of the chunk
+        outlier_rate : float
+            Rate of rows with one numeric value moved far outside its interquartile range
+        seed : int
+            Seed of the random streams
+        columns : list
+            Raw columns in their order
+        dtypes : dict
+            Raw dtypes by column
+        numeric_cols : list
+            Numeric columns
+        categorical_cols : list
+            Categorical columns (with the target excluded)
+        decimals : dict
+            Decimals of the raw values by numeric column
+        bounds : dict
+            (first quartile, third quartile, minimum) by numeric column, used for outliers
+        classes : np.ndarray
+            Values of the target
+        class_probs : np.ndarray
+            Probabilities of the classes
+        target_missing : float
+            Rate of missing target values
+        models : dict
+            Fitted marginals, missing rates and copula factor by class
+    """
+    def __init__(self,
+                 df: pd.DataFrame,
+                 target: str = "HeartDisease",
+                 cholesterol_zero_rate: float | None = None,
+                 duplicate_rate: float = 0.0,
+                 outlier_rate: float = 0.0,
+                 seed: int = 0) -> None:
+        """
+        Initialize the SyntheticGenerator class
+        Parameters:
+            df : pd.DataFrame
+                Raw data
+            target : str, optional
+                Name of the target variable (default is "HeartDisease")
+            cholesterol_zero_rate : float, optional
+                Rate of cholesterol zeros (default is None - as in the raw data)
+            duplicate_rate : float, optional
+                Rate of duplicated rows (default is 0.0)
+            outlier_rate : float, optional
+                Rate of rows with an outlier (default is 0.0)
+            seed : int, optional
+                Seed of the random streams (default is 0)
+        Raises:
+            ValueError: If a rate is not in [0, 1]
+        """
+        self.logger = get_logger()
+        validator = Validator()
+        validator.check_df_type(df)
+        validator.check_target(target, df)
+        for name, rate in {"cholesterol_zero_rate": cholesterol_zero_rate, "duplicate_rate": duplicate_rate,
+                           "outlier_rate": outlier_rate}.items():
+            if rate is not None and not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be in [0, 1], got {rate}")
+
+        self.df = df
+        self.target = target
+        self.zero_column = "Cholesterol"
+        self.cholesterol_zero_rate = cholesterol_zero_rate
+        self.duplicate_rate = duplicate_rate
+        self.outlier_rate = outlier_rate
+        self.seed = seed
+        self.columns = list(df.columns)
+        self.dtypes = df.dtypes.to_dict()
+        self.numeric_cols = []
+        self.categorical_cols = []
+        self.decimals = {}
+        self.bounds = {}
+        self.models = {}
+
+
+    def fit(self) -> "SyntheticGenerator":
+        """
+        Fits the marginals and the copula of every class
+        Returns:
+            SyntheticGenerator
+                Fitted generator
+        """
+        features = [column for column in self.columns if column != self.target]
+        for column in features:
+            values = self.df[column].dropna()
+            if pd.api.types.is_numeric_dtype(values) and values.nunique() > 2:
+                self.numeric_cols.append(column)
+                self.decimals[column] = self.count_decimals(values.to_numpy(dtype=np.float64))
+                q1, q3 = np.percentile(values, [25, 75])
+                self.bounds[column] = (q1, q3, values.min())
+            else:
+                self.categorical_cols.append(column)
+
+        y = self.df[self.target]
+        self.target_missing = y.isna().mean()
+        self.classes, counts = np.unique(y.dropna(), return_counts=True)
+        self.class_probs = counts / counts.sum()
+
+        # Jitter of the categorical normal scores
+        rng = np.random.default_rng(self.seed)
+        for value in self.classes:
+            self.models[value] = self.fit_class(self.df[y == value], rng)
+        self.logger.info(f"Synthetic generator fitted on {len(self.df)} rows, classes: {self.classes.tolist()}")
+        return self
+
+
+    @staticmethod
+    def count_decimals(values: np.ndarray, max_decimals: int = 3) -> int:
+        """
+        Returns the smallest number of decimals representing all values
+        """
+        for decimals in range(max_decimals + 1):
+            if np.allclose(values, np.round(values, decimals)):
+                return decimals
+        return max_decimals
+
+
+    def fit_class(self, df: pd.DataFrame, rng: np.random.Generator) -> dict:
+        """
+        Fits the marginals, missing rates and the Gaussian copula of one class
+        Parameters:
+            df : pd.DataFrame
+                Rows of the class
+            rng : np.random.Generator
+                Random generator of the categorical jitter
+        Returns:
+            dict
+                Model of the class
+        """
+        model = {"quantiles": {}, "categories": {}, "missing": {}}
+        scores = np.zeros((len(df), len(self.numeric_cols) + len(self.categorical_cols)))
+
+        for j, column in enumerate(self.numeric_cols):
+            values = df[column].to_numpy(dtype=np.float64)
+            model["missing"][column] = np.isnan(values).mean()
+            observed = ~np.isnan(values)
+            if column == self.zero_column:
+                model["zero_rate"] = (values[observed] == 0).mean()
+                observed &= values != 0
+            # Normal scores of the ranks, unobserved values stay at zero
+            ranks = pd.Series(values[observed]).rank().to_numpy()
+            scores[observed, j] = ndtri(ranks / (observed.sum() + 1))
+            model["quantiles"][column] = np.sort(values[observed])
+
+        for j, column in enumerate(self.categorical_cols, start=len(self.numeric_cols)):
+            values = df[column]
+            model["missing"][column] = values.isna().mean()
+            probs = values.value_counts(normalize=True).sort_index()
+            cumulative = np.concatenate([[0.0], np.cumsum(probs.to_numpy())])
+            cumulative[-1] = 1.0
+            model["categories"][column] = (probs.index.to_numpy(), cumulative)
+            # Uniform position inside the interval of the category
+            codes = probs.index.get_indexer(values)
+            observed = codes >= 0
+            low, high = cumulative[codes[observed]], cumulative[codes[observed] + 1]
+            scores[observed, j] = ndtri(np.clip(low + rng.random(observed.sum()) * (high - low), 1e-12, 1 - 1e-12))
+
+        # Correlation of the normal scores, repaired to be positive definite
+        correlation = np.corrcoef(scores, rowvar=False) if len(df) > 1 else np.eye(scores.shape[1])
+        correlation = np.nan_to_num(correlation)
+        np.fill_diagonal(correlation, 1.0)
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        correlation = (eigenvectors * np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+        d = np.sqrt(np.diag(correlation))
+        model["factor"] = np.linalg.cholesky(correlation / np.outer(d, d))
+        return model
+
+
+    def sample_class(self, value: float, n: int, rng: np.random.Generator) -> dict:
+        """
+        Samples rows of one class
+        Parameters:
+            value : float
+                Value of the class
+            n : int
+                Number of rows
+            rng : np.random.Generator
+                Random generator
+        Returns:
+            dict
+                Arrays by column
+        """
+        model = self.models[value]
+        uniforms = ndtr(rng.standard_normal((n, model["factor"].shape[0])) @ model["factor"].T)
+        data = {}
+
+        for j, column in enumerate(self.numeric_cols):
+            quantiles = model["quantiles"][column]
+            positions = (np.arange(len(quantiles)) + 0.5) / len(quantiles)
+            values = np.round(np.interp(uniforms[:, j], positions, quantiles), self.decimals[column])
+            if column == self.zero_column:
+                zero_rate = model["zero_rate"] if self.cholesterol_zero_rate is None else self.cholesterol_zero_rate
+                values[rng.random(n) < zero_rate] = 0.0
+            values[rng.random(n) < model["missing"][column]] = np.nan
+            data[column] = values
+
+        for j, column in enumerate(self.categorical_cols, start=len(self.numeric_cols)):
+            categories, cumulative = model["categories"][column]
+            codes = np.clip(np.searchsorted(cumulative, uniforms[:, j], side="right") - 1, 0, len(categories) - 1)
+            values = categories[codes]
+            missing = rng.random(n) < model["missing"][column]
+            if missing.any():
+                values = values.astype(object if values.dtype.kind == "O" else np.float64)
+                values[missing] = np.nan
+            data[column] = values
+
+        data[self.target] = np.full(n, value, dtype=np.float64)
+        return data
+
+
+    def add_outliers(self, data: dict, n: int, rng: np.random.Generator) -> None:
+        """
+        Moves one numeric value of randomly chosen rows 1.5 to 4 interquartile ranges outside the quartiles
+        Lower outliers are not negative for columns without negative raw values
+        """
+        rows = np.flatnonzero(rng.random(n) < self.outlier_rate)
+        columns = rng.integers(len(self.numeric_cols), size=len(rows))
+        upper = rng.random(len(rows)) < 0.5
+        distance = rng.uniform(1.5, 4.0, size=len(rows))
+        for j, column in enumerate(self.numeric_cols):
+            q1, q3, minimum = self.bounds[column]
+            selected = columns == j
+            iqr = max(q3 - q1, 1.0)
+            values = np.where(upper[selected], q3 + distance[selected] * iqr, q1 - distance[selected] * iqr)
+            if minimum >= 0:
+                values = np.maximum(values, 0.0)
+            data[column][rows[selected]] = np.round(values, self.decimals[column])
+
+
+    def add_duplicates(self, data: dict, n: int, rng: np.random.Generator) -> None:
+        """
+        Replaces randomly chosen rows with copies of other rows
+        """
+        duplicated = rng.random(n) < self.duplicate_rate
+        originals = np.flatnonzero(~duplicated)
+        if not duplicated.any() or not len(originals):
+            return
+        sources = rng.choice(originals, size=duplicated.sum())
+        for values in data.values():
+            values[duplicated] = values[sources]
+
+
+    def sample(self, n: int, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Samples a synthetic dataset
+        Parameters:
+            n : int
+                Number of rows
+            rng : np.random.Generator
+                Random generator
+        Returns:
+            pd.DataFrame
+                Rows with the columns and dtypes of the raw data (integer columns become
+                float if they have missing values)
+        """
+        if not self.models:
+            raise ValueError("SyntheticGenerator is not fitted")
+        counts = rng.multinomial(n, self.class_probs)
+        parts = [self.sample_class(value, count, rng) for value, count in zip(self.classes, counts)]
+        order = rng.permutation(n)
+        data = {column: np.concatenate([part[column] for part in parts])[order] for column in self.columns}
+
+        data[self.target][rng.random(n) < self.target_missing] = np.nan
+        if self.outlier_rate:
+            self.add_outliers(data, n, rng)
+        if self.duplicate_rate:
+            self.add_duplicates(data, n, rng)
+
+        df = pd.DataFrame(data, columns=self.columns)
+        for column, dtype in self.dtypes.items():
+            if pd.api.types.is_integer_dtype(dtype) and df[column].notna().all():
+                df[column] = df[column].astype(dtype)
+        return df
+
+
+    def generate(self, n_rows: int, path: Path, chunk_size: int = 100_000) -> Path:
+        """
+        Generates a synthetic dataset and writes it to a CSV file chunk by chunk
+        Parameters:
+            n_rows : int
+                Number of rows
+            path : Path
+                Path of the CSV file
+            chunk_size : int, optional
+                Rows per chunk (default is 100000)
+        Returns:
+            Path
+                Path of the written file
+        """
+        if not self.models:
+            self.fit()
+        n_chunks = -(-n_rows // chunk_size)
+        streams = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        for i, stream in enumerate(streams):
+            n = min(chunk_size, n_rows - i * chunk_size)
+            df = self.sample(n, np.random.default_rng(stream))
+            df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            self.logger.debug(f"Synthetic chunk {i + 1}/{n_chunks} written ({n} rows)")
+        self.logger.info(f"Synthetic dataset of {n_rows} rows saved to '{path}'")
+        return path
+
+
+def main() -> None:
+    """
+    Generates a synthetic dataset:
+    python -m src.utils.synthetic --rows 1000000 --output data/synthetic/heart-1m.csv
+    """
+    parser = argparse.ArgumentParser(description="Synthetic heart disease data generator")
+    parser.add_argument("--rows", type=int, required=True, help="Number of rows to generate")
+    parser.add_argument("--output", type=Path, required=True, help="Path of the output CSV file")
+    parser.add_argument("--input", type=Path, default=Path("data/raw/heart-diseases.csv"), help="Path of the raw CSV file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per written chunk")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--cholesterol-zeros", type=float, default=None, help="Rate of cholesterol zeros (default as raw data)")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="Rate of duplicated rows")
+    parser.add_argument("--outliers", type=float, default=0.0, help="Rate of rows with an outlier")
+    args = parser.parse_args()
+
+    df = DataLoader(args.input).load()
+    generator = SyntheticGenerator(df, cholesterol_zero_rate=args.cholesterol_zeros, duplicate_rate=args.duplicates,
+                                   outlier_rate=args.outliers, seed=args.seed)
+    generator.fit().generate(args.rows, args.output, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
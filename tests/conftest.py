@@ -1,6 +1,7 @@
 import pytest
 import pandas as pd
 from src.loader import DataLoader
+from src.preprocessing.simple import SimplePreprocessor
 
 
 @pytest.fixture
@@ -59,4 +60,16 @@ def expected_types():
         'binary': ['Sex', 'FastingBS', 'ExerciseAngina'],
         'numeric': ['Age', 'RestingBP', 'Cholesterol', 'MaxHR', 'Oldpeak'],
         'categorical': ['ChestPainType', 'RestingECG', 'ST_Slope']}
-    return expected_types
\ No newline at end of file
+    return expected_types
+
+@pytest.fixture
+def train_data(real_data) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Create features and labels for model tests
+    Real data after the simple preprocessing pipeline
+    """
+    sp = SimplePreprocessor(real_data, "HeartDisease")
+    sp.run()
+    X = sp.df.drop(columns=["HeartDisease"]).astype(float)
+    y = sp.df["HeartDisease"]
+    return X, y
@@ -0,0 +1,36 @@
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from src.benchmarks.latency import LatencyBenchmark
+from src.models.export import save_compact
+
+
+def test_latency_benchmark(train_data, tmp_path) -> None:
+    """
+    Check that every model and engine is benchmarked with ordered percentiles and positive throughput
+    Parameters:
+        train_data : tuple
+            Training features and target provided by a fixture
+    """
+    X, y = train_data
+    models_dir = tmp_path / "models"
+    (models_dir / "test").mkdir(parents=True)
+    models = {"LR": LogisticRegression(max_iter=5000), "RF": RandomForestClassifier(n_estimators=10, random_state=0)}
+    for name, model in models.items():
+        model.fit(X, y)
+        joblib.dump(model, models_dir / "test" / f"{name}.joblib")
+    save_compact(models["LR"], models_dir / "test" / "compact" / "LR.npz")
+
+    save_path = tmp_path / "results"
+    save_path.mkdir()
+    pd.DataFrame({"model": ["LR", "RF"], "f2": [0.8, 0.9]}).to_csv(save_path / "test_metrics.csv", index=False)
+
+    benchmark = LatencyBenchmark(X, "test", models_dir, save_path, n_single=20, batch_sizes=[1, 64], min_time=0.01)
+    df = benchmark.run()
+
+    assert list(zip(df["model"], df["engine"])) == [("LR", "sklearn"), ("LR", "compact"), ("RF", "sklearn")]
+    assert (df["p50_ms"] <= df["p95_ms"]).all() and (df["p95_ms"] <= df["p99_ms"]).all()
+    assert (df[["rows_per_s_1", "rows_per_s_64", "load_ms", "artifact_kb"]] > 0).all().all()
+    assert df["f2"].tolist() == [0.8, 0.8, 0.9]
+    assert (save_path / "test_latency.csv").is_file()
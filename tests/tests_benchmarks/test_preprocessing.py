@@ -0,0 +1,60 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.benchmarks.preprocessing import PIPELINES, PreprocessingBenchmark, fit_complexity
+from src.utils.synthetic import SyntheticGenerator
+
+
+@pytest.mark.parametrize("name", list(PIPELINES))
+def test_steps_replay_run(real_data, name) -> None:
+    """
+    Check that the benchmarked STEPS replay the run method of every pipeline
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+        name : str
+            Name of the pipeline
+    """
+    preprocessor_class = PIPELINES[name]
+    expected = preprocessor_class(real_data)
+    expected.run()
+    preprocessor = preprocessor_class(real_data)
+    for step in preprocessor_class.STEPS:
+        getattr(preprocessor, step)()
+
+    assert preprocessor.feature_names == expected.feature_names
+    pd.testing.assert_frame_equal(preprocessor.df, expected.df)
+
+
+def test_fit_complexity() -> None:
+    """
+    Check that the log-log fit recovers the exponent of a power law
+    """
+    rows = [1_000, 10_000, 100_000]
+    fit = fit_complexity(rows, [2e-6 * n ** 2 for n in rows])
+    assert fit["exponent"] == pytest.approx(2.0)
+    assert fit["coefficient"] == pytest.approx(2e-6)
+    assert fit["r2"] == pytest.approx(1.0)
+    assert fit_complexity([1_000], [0.1]) is None
+
+
+def test_benchmark_report(real_data, tmp_path) -> None:
+    """
+    Check that the JSON report has every pipeline, size and step
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    generator = SyntheticGenerator(real_data).fit()
+    report = PreprocessingBenchmark(generator, [300, 600], save_path=tmp_path).run()
+
+    saved = json.loads(next(tmp_path.glob("preprocessing_*.json")).read_text())
+    assert saved["metadata"]["sizes"] == [300, 600]
+    results = pd.DataFrame(saved["results"])
+    for name, preprocessor_class in PIPELINES.items():
+        assert set(results.loc[results["pipeline"] == name, "step"]) == {"run", *preprocessor_class.STEPS}
+    assert len(results) == 2 * sum(len(cls.STEPS) + 1 for cls in PIPELINES.values())
+    assert (results["peak_rss_mb"] > 0).all() and (results["seconds"] > 0).all()
+    assert {(fit["pipeline"], fit["step"]) for fit in report["complexity"]} >= {(name, "run") for name in PIPELINES}
+    assert np.all(np.diff([fit["exponent"] for fit in report["complexity"]]) <= 0)
@@ -0,0 +1,77 @@
+import json
+import pytest
+import yaml
+from src.benchmarks.regression import NO_BASELINE, PASSED, REGRESSED, RegressionGate, main
+
+
+@pytest.fixture
+def gate_config(tmp_path):
+    """
+    Write a small gate configuration with the baseline in a temporary folder
+    """
+    config = {
+        "profile": {
+            "sizes": [300],
+            "pipelines": ["simple", "standard"],
+            "seed": 0,
+            "repeats": 1,
+            "test_size": 0.3,
+            "gridsearch": {"cv": 3, "scoring": "accuracy", "n_jobs": 1},
+            "models": {"KNN": {"class": "sklearn.neighbors.KNeighborsClassifier", "params": {"n_neighbors": [3, 5]}}}
+        },
+        "tolerances": {"time_ratio": 1.5, "time_slack_s": 0.05, "memory_ratio": 1.25, "memory_slack_mb": 32},
+        "baseline": str(tmp_path / "baseline.json")
+    }
+    path = tmp_path / "regression.yaml"
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    return path
+
+
+def test_compare(gate_config) -> None:
+    """
+    Check the status of regressed, passing, new and missing stages
+    Parameters:
+        gate_config : Path
+            Gate configuration provided by a fixture
+    """
+    gate = RegressionGate(gate_config)
+    baseline = {"a": {"wall_s": 1.0, "rss_increase_mb": 10.0}, "b": {"wall_s": 1.0, "rss_increase_mb": 10.0},
+                "d": {"wall_s": 1.0, "rss_increase_mb": 10.0}}
+    measurements = {"a": {"wall_s": 1.6, "rss_increase_mb": 40.0}, "c": {"wall_s": 0.1, "rss_increase_mb": 10.0},
+                    "d": {"wall_s": 1.0, "rss_increase_mb": 60.0}}
+    status = {(row["stage"], row["metric"]): row["status"] for row in gate.compare(measurements, baseline)}
+
+    assert status[("a", "wall_s")] == "regressed"
+    assert status[("a", "rss_increase_mb")] == "ok"
+    # 50 MB more memory in the stage regresses whatever earlier stages hold
+    assert status[("d", "rss_increase_mb")] == "regressed"
+    assert status[("b", "wall_s")] == "missing"
+    assert status[("c", "wall_s")] == "new"
+
+
+def test_gate_exit_codes(gate_config, tmp_path) -> None:
+    """
+    Check the exit codes without a baseline, after updating it and against a faster baseline
+    Parameters:
+        gate_config : Path
+            Gate configuration provided by a fixture
+    """
+    assert main(["--config", str(gate_config)]) == NO_BASELINE
+    assert main(["--config", str(gate_config), "--update-baseline"]) == PASSED
+
+    baseline_path = tmp_path / "baseline.json"
+    baseline = json.loads(baseline_path.read_text())
+    assert set(baseline["stages"]) == {f"profile.{name}.300.{phase}" for name in ["simple", "standard"]
+                                       for phase in ["preprocessing", "training", "evaluation"]}
+    assert main(["--config", str(gate_config), "--output", str(tmp_path / "comparison.json")]) == PASSED
+
+    # Baseline of a much faster machine
+    for stage in baseline["stages"].values():
+        stage["wall_s"] /= 1000
+    baseline_path.write_text(json.dumps(baseline))
+    config = yaml.safe_load(gate_config.read_text())
+    config["tolerances"]["time_slack_s"] = 0.0
+    gate_config.write_text(yaml.safe_dump(config))
+    assert main(["--config", str(gate_config), "--output", str(tmp_path / "comparison.json")]) == REGRESSED
+    comparison = json.loads((tmp_path / "comparison.json").read_text())
+    assert not comparison["passed"]
@@ -0,0 +1,37 @@
+import json
+import joblib
+from sklearn.linear_model import LogisticRegression
+from src.benchmarks.serving import ServingBenchmark
+from src.preprocessing.standard import StandardPreprocessor
+
+
+def test_serving_benchmark(real_data, tmp_path) -> None:
+    """
+    Check that every request of every client is timed and the p99 is compared with the target
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    df = real_data.dropna(subset=["HeartDisease"])
+    sp = StandardPreprocessor(df)
+    sp.run()
+    model = LogisticRegression(max_iter=5000).fit(sp.df.drop(columns=["HeartDisease"]).astype(float),
+                                                  sp.df["HeartDisease"])
+    models_dir = tmp_path / "models"
+    sp.save(models_dir / "preprocessors" / "standard.joblib")
+    (models_dir / "standard").mkdir(parents=True)
+    joblib.dump(model, models_dir / "standard" / "LR.joblib")
+
+    records = json.loads(df.drop(columns=["HeartDisease"]).head(20).to_json(orient="records"))
+    config = {"preprocessing_type": "standard", "model": "LR", "batching": {"max_batch": 8, "max_wait_ms": 1}}
+    benchmark = ServingBenchmark(config, records, models_dir, n_clients=4, n_requests=25, p99_target_ms=10.0,
+                                 save_path=tmp_path / "out")
+    results = benchmark.run()["results"]
+
+    assert results["requests"] == 4 * 25 and results["errors"] == 0
+    assert 0 < results["p50_ms"] <= results["p95_ms"] <= results["p99_ms"] <= results["max_ms"]
+    assert results["requests_per_s"] > 0 and results["mean_batch_size"] >= 1
+    assert results["p99_within_target"] == (results["p99_ms"] <= 10.0)
+    assert next((tmp_path / "out").glob("serving_*.json")).is_file()
@@ -0,0 +1,88 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from pathlib import Path
+from sklearn.datasets import make_classification
+from sklearn.neighbors import KNeighborsClassifier
+from src.benchmarks.training import TrainingBenchmark, effective_cores, pooled_time
+from src.models.search import KNeighborsSearchCV
+from src.utils.synthetic import SyntheticGenerator
+
+
+def test_pooled_time() -> None:
+    """
+    Check that pooled per-candidate times equal the mean and std over all fits
+    """
+    times = np.random.default_rng(0).random((4, 5))
+    cv_results = {"mean_fit_time": times.mean(axis=1), "std_fit_time": times.std(axis=1),
+                  **{f"split{fold}_test_score": np.zeros(4) for fold in range(5)}}
+    assert pooled_time(cv_results, "fit") == pytest.approx((times.mean(), times.std()))
+
+
+def test_pooled_time_shared_fits() -> None:
+    """
+    Check that candidates scored from a shared fit (0.0 fit time) are not counted as fits
+    """
+    X, y = make_classification(n_samples=300, n_features=6, random_state=0)
+    search = KNeighborsSearchCV(KNeighborsClassifier(), {"n_neighbors": [3, 5, 7], "p": [1, 2]}, cv=3).fit(X, y)
+    cv_results = search.cv_results_
+    fitted = cv_results["n_fits"] > 0
+    assert search.n_fits_ == 2 * 3 and not fitted.all()
+
+    # Fit times of the real fits, recovered from the candidates that made them
+    total = cv_results["mean_fit_time"].sum() * search.n_splits_
+    mean, std = pooled_time(cv_results, "fit")
+    assert mean == pytest.approx(total / search.n_fits_)
+    expected = np.sqrt((cv_results["std_fit_time"][fitted] ** 2 + cv_results["mean_fit_time"][fitted] ** 2).mean()
+                       - cv_results["mean_fit_time"][fitted].mean() ** 2)
+    assert std == pytest.approx(expected)
+    assert mean > cv_results["mean_fit_time"].mean()
+
+
+def test_effective_cores() -> None:
+    """
+    Check the number of workers of n_jobs settings
+    """
+    assert effective_cores(None) == 1
+    assert effective_cores(2) == 2
+    assert effective_cores(-1) >= 1
+    assert effective_cores(-1) - effective_cores(-2) in (0, 1)
+
+
+def test_training_benchmark(real_data, tmp_path, monkeypatch) -> None:
+    """
+    Check the measurements and the scaling of every model, size and n_jobs setting
+    Models are saved to a temporary folder, not to the working directory
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    monkeypatch.chdir(tmp_path)
+    config_path = tmp_path / "models.yaml"
+    config = {
+        "models": {
+            "KNN": {"class": "sklearn.neighbors.KNeighborsClassifier", "params": {"n_neighbors": [3, 5]}},
+            "Ada": {"class": "sklearn.ensemble.AdaBoostClassifier", "params": {"n_estimators": [5]}}
+        },
+        "gridsearch": {"cv": 3, "scoring": "accuracy", "n_jobs": 1}
+    }
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    generator = SyntheticGenerator(real_data).fit()
+    benchmark = TrainingBenchmark(generator, [300, 600], [2, 1], config_path=config_path, save_path=tmp_path / "out")
+    report = benchmark.run()
+
+    df = pd.DataFrame(json.loads(next((tmp_path / "out").glob("training_*.json")).read_text())["results"])
+    assert len(df) == len(report["results"]) == 2 * 2 * 2
+    assert df.loc[df["model"] == "KNN", "n_fits"].eq(6).all()
+    assert df.loc[df["model"] == "Ada", "n_candidates"].eq(1).all()
+    assert (df[["search_time", "fit_time_mean", "score_time_mean", "peak_rss_mb"]] > 0).all().all()
+    assert df.loc[df["n_jobs"] == 1, "speedup"].eq(1.0).all()
+    assert np.allclose(df["efficiency"], df["speedup"] / df["cores"])
+    assert next((tmp_path / "out").glob("training_*_scaling.csv")).is_file()
+    assert not Path("models").exists()
+
+    with pytest.raises(ValueError):
+        TrainingBenchmark(generator, config_path=config_path, model_names=["SVM"])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from src.models.artifacts import ColumnReader, load_columns, save_columns
+
+
+def test_column_reader(tmp_path) -> None:
+    """
+    Check that columns are memory-mapped one at a time and equal the saved arrays
+    Parameters:
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    rng = np.random.default_rng(0)
+    columns = {"LR": rng.random(1000), "RF": rng.integers(0, 2, 1000), "SVM": rng.random(1000).astype(np.float32)}
+    row_ids = np.arange(1000) * 3
+    path = save_columns(tmp_path / "scores.npz", columns, row_ids)
+
+    reader = ColumnReader(path)
+    assert list(reader) == ["LR", "RF", "SVM"]
+    assert reader.loaded == {}
+
+    rf = reader["RF"]
+    assert isinstance(rf, np.memmap)
+    assert np.array_equal(rf, columns["RF"])
+    assert list(reader.loaded) == ["RF"]
+    assert np.array_equal(reader.row_ids, row_ids)
+    for name, values in columns.items():
+        assert np.array_equal(reader[name], values)
+
+    # Eager reading gives the same arrays
+    loaded = load_columns(path)
+    assert np.array_equal(loaded["row_ids"], row_ids)
+    assert np.array_equal(ColumnReader(path, mmap_mode=None)["LR"], loaded["LR"])
+
+
+def test_save_columns_errors(tmp_path) -> None:
+    """
+    Check that reserved names and columns of another length are rejected
+    Parameters:
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    with pytest.raises(ValueError):
+        save_columns(tmp_path / "a.npz", {"row_ids": np.zeros(3)}, np.arange(3))
+    with pytest.raises(ValueError):
+        save_columns(tmp_path / "a.npz", {"LR": np.zeros(2)}, np.arange(3))
+
+    # Row IDs are not a column of the reader
+    save_columns(tmp_path / "a.npz", {"LR": np.zeros(3)}, np.arange(3))
+    with pytest.raises(KeyError):
+        ColumnReader(tmp_path / "a.npz")["row_ids"]
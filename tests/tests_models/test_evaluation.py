@@ -0,0 +1,131 @@
+import pytest
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+from src.models.artifacts import ColumnReader
+from src.models.evaluation import Evaluate
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "configs" / "metrics.yaml"
+
+
+class InvertedModel(LogisticRegression):
+    """
+    Model whose predict disagrees with its scores
+    """
+    def predict(self, X):
+        return 1 - super().predict(X)
+
+
+@pytest.fixture
+def trained_models(train_data, tmp_path, monkeypatch) -> dict:
+    """
+    Create trained models saved to 'models/test' in a temporary working directory
+    """
+    monkeypatch.chdir(tmp_path)
+    X, y = train_data
+    models = {
+        "LR": LogisticRegression(max_iter=5000).fit(X, y),
+        "SVM": SVC().fit(X, y),
+        "RF": RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    }
+    save_path = Path("models") / "test"
+    save_path.mkdir(parents=True)
+    for name, model in models.items():
+        joblib.dump(model, save_path / f"{name}.joblib")
+    return models
+
+
+def test_evaluate(train_data, trained_models) -> None:
+    """
+    Check that predictions from one inference pass match predict and results are saved
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        trained_models : dict
+            Trained models provided by a fixture
+    """
+    X, y = train_data
+    ev = Evaluate(X, y, preprocessing_type="test", config_path=CONFIG_PATH)
+    ev.evaluate()
+
+    predictions = ColumnReader(Path("results") / "test_predictions.npz")
+    assert np.array_equal(predictions.row_ids, X.index)
+    for name, model in trained_models.items():
+        assert np.array_equal(predictions[name], model.predict(X))
+    assert (Path("results") / "test_metrics.csv").is_file()
+
+    # F2 optimal thresholds of the scored models
+    best = pd.read_csv(Path("results") / "test_best_thresholds.csv")
+    assert sorted(best["model"]) == sorted(trained_models)
+    assert (best["f2"] >= pd.read_csv(Path("results") / "test_metrics.csv")["f2"] - 1e-12).all()
+
+
+def test_predict_scores_mismatch(train_data, trained_models) -> None:
+    """
+    Check that predict is used when predictions derived from scores differ
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        trained_models : dict
+            Trained models provided by a fixture
+    """
+    X, y = train_data
+    model = InvertedModel(max_iter=5000).fit(X, y)
+    ev = Evaluate(X, y, preprocessing_type="test", config_path=CONFIG_PATH)
+    y_pred, y_score = ev.predict_scores("Inverted", model, X)
+
+    assert np.array_equal(y_pred, model.predict(X))
+    assert np.allclose(y_score, model.predict_proba(X)[:, 1])
+
+
+def test_predict_scores_batches(train_data, trained_models, tmp_path) -> None:
+    """
+    Check that chunked inference over a memory-mapped array gives the same results
+    as the whole DataFrame at once
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        trained_models : dict
+            Trained models provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    np.save(tmp_path / "X.npy", X.to_numpy(dtype=np.float64))
+    X_mmap = np.load(tmp_path / "X.npy", mmap_mode="r")
+
+    ev = Evaluate(X, y, preprocessing_type="test", config_path=CONFIG_PATH)
+    for name, model in trained_models.items():
+        ev.settings["batch_size"] = None
+        y_pred, y_score = ev.predict_scores(name, model, X)
+        ev.settings["batch_size"] = 64
+        y_pred_batch, y_score_batch = ev.predict_scores(name, model, X_mmap)
+
+        assert np.array_equal(y_pred, y_pred_batch)
+        assert np.allclose(y_score, y_score_batch)
+
+
+def test_bootstrap_intervals(train_data, trained_models) -> None:
+    """
+    Check that bootstrap intervals are added next to every metric and contain the point estimates
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        trained_models : dict
+            Trained models provided by a fixture
+    """
+    X, y = train_data
+    ev = Evaluate(X, y, preprocessing_type="test", config_path=CONFIG_PATH)
+    ev.settings["bootstrap"] = {"n_resamples": 200, "confidence": 0.9, "seed": 0}
+    row, _, _ = ev.score_model("RF", trained_models["RF"])
+
+    assert list(row)[:4] == ["model", "accuracy", "accuracy_ci_low", "accuracy_ci_high"]
+    for metric_name in ev.metrics:
+        assert row[f"{metric_name}_ci_low"] <= row[metric_name] <= row[f"{metric_name}_ci_high"]
+
+    # The same seed gives the same intervals
+    assert ev.score_model("RF", trained_models["RF"])[0] == row
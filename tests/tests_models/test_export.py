@@ -0,0 +1,74 @@
+import pytest
+import json
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeRegressor
+from src.models.export import FORMAT_VERSION, floor_float32, save_compact, load_compact
+
+
+def test_floor_float32() -> None:
+    """
+    Check that rounded thresholds split float32 values as float64 thresholds do
+    """
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=1000).astype(np.float32)
+    # Midpoints between neighbouring float32 values are not representable in float32
+    thresholds = (x.astype(np.float64) + np.nextafter(x, np.float32(np.inf)).astype(np.float64)) / 2
+    rounded = floor_float32(thresholds)
+
+    assert rounded.dtype == np.float32
+    for values in [x, np.nextafter(x, np.float32(np.inf))]:
+        assert np.array_equal(values <= thresholds, values <= rounded)
+
+
+def test_save_load_compact(train_data, tmp_path) -> None:
+    """
+    Check that the tree ensemble is saved in the compact format and loaded back
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    model = RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y)
+    path = save_compact(model, tmp_path / "compact" / "RF.npz")
+    meta, arrays = load_compact(path)
+
+    assert meta["format_version"] == FORMAT_VERSION
+    assert meta["kind"] == "tree_ensemble" and meta["model_class"] == "RandomForestClassifier"
+    assert meta["feature_names"] == list(X.columns)
+    assert arrays["threshold"].dtype == np.float32
+    assert len(arrays["roots"]) == 50
+    assert len(arrays["feature"]) == sum(tree.tree_.node_count for tree in model.estimators_)
+
+    joblib.dump(model, tmp_path / "RF.joblib")
+    assert path.stat().st_size < (tmp_path / "RF.joblib").stat().st_size
+
+
+def test_load_compact_version(tmp_path) -> None:
+    """
+    Check that files of another format version are rejected
+    Parameters:
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    path = tmp_path / "model.npz"
+    np.savez(path, meta=np.array(json.dumps({"format_version": FORMAT_VERSION + 1})))
+    with pytest.raises(ValueError):
+        load_compact(path)
+
+
+def test_export_unsupported(train_data, tmp_path) -> None:
+    """
+    Check that unsupported models raise ValueError
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    with pytest.raises(ValueError):
+        save_compact(DecisionTreeRegressor().fit(X, y), tmp_path / "tree.npz")
@@ -0,0 +1,102 @@
+import pytest
+import subprocess
+import sys
+import numpy as np
+from pathlib import Path
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from src.models.export import save_compact
+from src.models.inference import CompactModel
+
+
+def compare(model, X, tmp_path) -> CompactModel:
+    """
+    Checks that the compact model gives the same outputs as the original one
+    Parameters:
+        model : object
+            Fitted scikit-learn model
+        X : pd.DataFrame or np.ndarray
+            Input data
+        tmp_path : Path
+            Temporary folder
+    Returns:
+        CompactModel
+            Loaded compact model
+    """
+    compact = CompactModel.from_file(save_compact(model, tmp_path / "model.npz"))
+    assert np.array_equal(compact.predict(X), model.predict(X))
+    for method in ["predict_proba", "decision_function"]:
+        assert hasattr(compact, method) == hasattr(model, method)
+        if hasattr(model, method):
+            assert np.allclose(getattr(compact, method)(X), getattr(model, method)(X), atol=1e-6)
+    return compact
+
+
+@pytest.mark.parametrize("model", [
+    LogisticRegression(max_iter=5000),
+    RandomForestClassifier(n_estimators=30, random_state=0),
+    RandomForestClassifier(n_estimators=30, max_depth=3, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, random_state=0),
+    AdaBoostClassifier(n_estimators=30, random_state=0)
+])
+def test_compact_model_real_data(train_data, tmp_path, model) -> None:
+    """
+    Check linear models and tree ensembles on the real data
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+        model : object
+            Model to check
+    """
+    X, y = train_data
+    compare(model.fit(X, y), X, tmp_path)
+
+
+@pytest.mark.parametrize("model", [
+    SVC(kernel="linear"),
+    SVC(kernel="rbf", gamma="scale"),
+    SVC(kernel="poly", degree=2, gamma="auto"),
+    KNeighborsClassifier(n_neighbors=5, p=1),
+    KNeighborsClassifier(n_neighbors=7, p=2, weights="distance")
+])
+def test_compact_model_continuous(tmp_path, model) -> None:
+    """
+    Check SVC and KNN on continuous data (no ties between neighbors distances)
+    Parameters:
+        tmp_path : Path
+            Temporary folder provided by pytest
+        model : object
+            Model to check
+    """
+    X, y = make_classification(n_samples=400, n_features=8, random_state=0)
+    compare(model.fit(X[:300], y[:300]), X[300:], tmp_path)
+
+
+def test_predict_one(train_data, tmp_path) -> None:
+    """
+    Check that a single record gives the same label and score as the batch
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    compact = compare(GradientBoostingClassifier(n_estimators=10).fit(X, y), X, tmp_path)
+    label, score = compact.predict_one(X.iloc[0].to_dict())
+
+    assert label == compact.predict(X.iloc[:1])[0]
+    assert np.isclose(score, compact.predict_proba(X.iloc[:1])[0, 1])
+
+
+def test_no_sklearn_import() -> None:
+    """
+    Check that the inference engine does not import scikit-learn
+    """
+    code = "import sys; import src.models.inference; assert 'sklearn' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[2])
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, fbeta_score, precision_score, recall_score, roc_auc_score
+from src.models.metrics import (bootstrap_weights, confusion_counts, get_count_metric, roc_auc_from_weights,
+                                threshold_curve)
+
+
+@pytest.mark.parametrize("y_pred_kind", ["random", "all_negative"])
+def test_count_metrics_match_sklearn(y_pred_kind) -> None:
+    """
+    Check that metrics derived from the confusion counts match scikit-learn
+    (including zero division when nothing is predicted positive)
+    Parameters:
+        y_pred_kind : str
+            Kind of predictions
+    """
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500)
+    y_pred = rng.integers(0, 2, 500) if y_pred_kind == "random" else np.zeros(500, dtype=int)
+    counts = confusion_counts(y_true, y_pred)
+
+    cases = [
+        ("sklearn.metrics.accuracy_score", {}, accuracy_score),
+        ("sklearn.metrics.precision_score", {"average": "binary", "zero_division": 0}, precision_score),
+        ("sklearn.metrics.recall_score", {"average": "binary"}, recall_score),
+        ("sklearn.metrics.fbeta_score", {"beta": 2, "average": "binary", "zero_division": 0}, fbeta_score)
+    ]
+    for class_path, params, sklearn_fn in cases:
+        counts_fn = get_count_metric(class_path, params)
+        assert counts_fn(counts) == pytest.approx(sklearn_fn(y_true, y_pred, **params))
+
+
+def test_confusion_counts_weights() -> None:
+    """
+    Check that counts for a matrix of weights equal counts of the resampled rows
+    """
+    rng = np.random.default_rng(1)
+    y_true, y_pred = rng.integers(0, 2, 100), rng.integers(0, 2, 100)
+    indices = rng.integers(0, 100, (5, 100))
+    weights = np.stack([np.bincount(row, minlength=100) for row in indices])
+
+    counts = confusion_counts(y_true, y_pred, weights)
+    for i, row in enumerate(indices):
+        assert np.array_equal(counts[i], confusion_counts(y_true[row], y_pred[row]))
+
+
+def test_get_count_metric_fallback() -> None:
+    """
+    Check that metrics without a count-based equivalent are left to their own functions
+    """
+    assert get_count_metric("sklearn.metrics.roc_auc_score", {}) is None
+    assert get_count_metric("sklearn.metrics.precision_score", {"average": "macro"}) is None
+    assert get_count_metric("sklearn.metrics.recall_score", {"pos_label": 0}) is None
+
+
+def test_roc_auc_from_weights() -> None:
+    """
+    Check the rank-based ROC-AUC with ties and weights against scikit-learn
+    """
+    rng = np.random.default_rng(2)
+    y_true = rng.integers(0, 2, 300)
+    y_score = np.round(rng.random(300), 1)
+    weights = rng.integers(0, 3, (4, 300)).astype(float)
+
+    assert roc_auc_from_weights(y_true, y_score) == pytest.approx(roc_auc_score(y_true, y_score))
+    auc = roc_auc_from_weights(y_true, y_score, weights)
+    for i, row in enumerate(weights):
+        assert auc[i] == pytest.approx(roc_auc_score(y_true, y_score, sample_weight=row))
+
+
+def test_bootstrap_weights() -> None:
+    """
+    Check that every resample draws exactly n samples
+    """
+    weights = bootstrap_weights(50, 10, np.random.default_rng(0))
+    assert weights.shape == (10, 50)
+    assert np.all(weights.sum(axis=1) == 50)
+
+
+def test_threshold_curve() -> None:
+    """
+    Check the metrics of the threshold sweep against scikit-learn at every threshold
+    """
+    rng = np.random.default_rng(3)
+    y_true = rng.integers(0, 2, 200)
+    y_score = np.round(rng.random(200), 1)
+    curve = threshold_curve(y_true, y_score, beta=2)
+
+    assert curve["threshold"][0] == np.inf and curve["tp"][0] == 0
+    assert len(curve["threshold"]) == len(np.unique(y_score)) + 1
+    for i, threshold in enumerate(curve["threshold"][1:], start=1):
+        y_pred = (y_score >= threshold).astype(int)
+        assert curve["fbeta"][i] == pytest.approx(fbeta_score(y_true, y_pred, beta=2))
+        assert curve["precision"][i] == pytest.approx(precision_score(y_true, y_pred))
+        assert curve["recall"][i] == pytest.approx(recall_score(y_true, y_pred))
+        assert curve["accuracy"][i] == pytest.approx(accuracy_score(y_true, y_pred))
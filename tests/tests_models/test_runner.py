@@ -0,0 +1,57 @@
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.models.artifacts import load_columns
+from src.models.evaluation import Evaluate
+from src.models.runner import EvaluationRunner
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "configs" / "metrics.yaml"
+
+
+def test_runner_matches_evaluate(train_data, tmp_path, monkeypatch) -> None:
+    """
+    Check that the parallel runner saves the same results as sequential Evaluate for every type
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+        monkeypatch : MonkeyPatch
+            Pytest fixture to change the working directory
+    """
+    monkeypatch.chdir(tmp_path)
+    X, y = train_data
+    split_dir = Path("data/splits")
+    split_dir.mkdir(parents=True)
+
+    types = ["first", "second"]
+    for i, name in enumerate(types):
+        np.save(split_dir / f"{name}_X_test.npy", X.to_numpy(dtype=np.float64))
+        np.save(split_dir / f"{name}_y_test.npy", y.to_numpy())
+        save_path = Path("models") / name
+        save_path.mkdir(parents=True)
+        joblib.dump(LogisticRegression(max_iter=5000, C=0.1 + i).fit(X, y), save_path / "LR.joblib")
+        joblib.dump(KNeighborsClassifier().fit(X, y), save_path / "KNN.joblib")
+        joblib.dump(DecisionTreeClassifier(max_depth=3 + i).fit(X, y), save_path / "Tree.joblib")
+
+    runner = EvaluationRunner(types, split_dir, config_path=CONFIG_PATH)
+    runner.n_jobs = 2
+    runner.run()
+    assert len(runner.timings) == 6
+
+    for name in types:
+        parallel = pd.read_csv(Path("results") / f"{name}_metrics.csv")
+        parallel_scores = load_columns(Path("results") / f"{name}_scores.npz")
+
+        ev = Evaluate(X, y, preprocessing_type=name, config_path=CONFIG_PATH)
+        ev.evaluate()
+        sequential = pd.read_csv(Path("results") / f"{name}_metrics.csv")
+        sequential_scores = load_columns(Path("results") / f"{name}_scores.npz")
+
+        pd.testing.assert_frame_equal(parallel, sequential)
+        for model_name, score in sequential_scores.items():
+            assert np.allclose(parallel_scores[model_name], score)
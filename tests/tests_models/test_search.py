@@ -0,0 +1,142 @@
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from sklearn.model_selection import GridSearchCV
+from src.models.search import GridEvaluator, WarmStartSearchCV, LogisticPathSearchCV, KNeighborsSearchCV, KernelSearchCV, \
+    truncate_ensemble
+
+
+@pytest.mark.parametrize("cls", [RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier])
+def test_truncate_ensemble(train_data, cls) -> None:
+    """
+    Check that a truncated ensemble predicts as the ensemble fitted with fewer estimators
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        cls : type
+            Ensemble class
+    """
+    X, y = train_data
+    large = cls(n_estimators=20, random_state=0).fit(X, y)
+    small = cls(n_estimators=10, random_state=0).fit(X, y)
+    view = truncate_ensemble(large, 10)
+
+    assert np.allclose(view.predict_proba(X), small.predict_proba(X))
+    assert len(large.estimators_) == 20
+
+
+def test_grid_evaluator_matches_grid_search(train_data) -> None:
+    """
+    Check that the base evaluator gives the same scores as GridSearchCV
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+    """
+    X, y = train_data
+    grid = {"n_estimators": [5, 10], "max_depth": [2, 4]}
+    model = RandomForestClassifier(random_state=0)
+    gs = GridSearchCV(model, grid, cv=3, scoring="accuracy").fit(X, y)
+    ge = GridEvaluator(model, grid, cv=3, scoring="accuracy").fit(X, y)
+
+    assert np.allclose(gs.cv_results_["mean_test_score"], ge.cv_results_["mean_test_score"])
+    assert gs.best_params_ == ge.best_params_
+    assert ge.n_fits_ == 4 * 3
+
+
+@pytest.mark.parametrize("cls", [RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier])
+def test_warm_start_search(train_data, cls) -> None:
+    """
+    Check that the warm start search gives the same scores as GridSearchCV with fewer fits
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        cls : type
+            Ensemble class
+    """
+    X, y = train_data
+    grid = {"n_estimators": [5, 10, 20], "learning_rate": [0.1, 1.0]} if cls is not RandomForestClassifier \
+        else {"n_estimators": [5, 10, 20], "max_depth": [2, None]}
+    model = cls(random_state=0)
+    gs = GridSearchCV(model, grid, cv=3, scoring="accuracy").fit(X, y)
+    ws = WarmStartSearchCV(model, grid, cv=3, scoring="accuracy").fit(X, y)
+
+    assert np.allclose(gs.cv_results_["mean_test_score"], ws.cv_results_["mean_test_score"])
+    assert gs.best_params_ == ws.best_params_
+    assert ws.n_fits_ == 2 * 3 == ws.cv_results_["n_fits"].sum()
+    # Only the largest ensemble of a group is fitted, smaller sizes record no fit
+    fitted = ws.cv_results_["n_fits"] > 0
+    assert np.array_equal(ws.cv_results_["param_n_estimators"][fitted].astype(int), [20, 20])
+    assert (ws.cv_results_["mean_fit_time"][~fitted] == 0).all()
+    assert ws.best_estimator_.n_estimators == ws.best_params_["n_estimators"]
+
+
+def test_logistic_path_search(train_data) -> None:
+    """
+    Check that the path search removes duplicates, collapses max_iter
+    and scores candidates as cold fits do
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+    """
+    X, y = train_data
+    X = (X - X.mean()) / X.std()
+    grid = [
+        {"solver": ["lbfgs", "liblinear"], "C": [0.01, 0.1, 1], "max_iter": [500, 1000]},
+        {"solver": ["liblinear", "saga"], "C": [0.01, 0.1, 1], "max_iter": [500, 1000]},
+        {"solver": ["saga"], "l1_ratio": [0.5], "C": [0.01, 0.1, 1], "max_iter": [500, 1000]},
+    ]
+    model = LogisticRegression()
+    ps = LogisticPathSearchCV(model, grid, cv=3, scoring="accuracy").fit(X, y)
+
+    # 4 paths (lbfgs, liblinear, saga, saga + l1_ratio) of 3 C values
+    assert len(ps.candidates_) == 12
+    assert all(params["max_iter"] == 1000 for params in ps.candidates_)
+    assert ps.n_fits_ == 12 * 3
+
+    cold = GridSearchCV(model, [{k: [v] for k, v in params.items()} for params in ps.candidates_],
+                        cv=3, scoring="accuracy").fit(X, y)
+    assert np.allclose(cold.cv_results_["mean_test_score"], ps.cv_results_["mean_test_score"], atol=0.01)
+
+
+def test_kneighbors_search() -> None:
+    """
+    Check that the neighbors search gives the same scores as GridSearchCV with one query per group
+    """
+    X, y = make_classification(n_samples=300, n_features=6, random_state=0)
+    grid = {"n_neighbors": [3, 5, 7], "leaf_size": [10, 30], "weights": ["uniform", "distance"], "p": [1, 2]}
+    model = KNeighborsClassifier()
+    for scoring in ["accuracy", "roc_auc"]:
+        gs = GridSearchCV(model, grid, cv=3, scoring=scoring).fit(X, y)
+        ks = KNeighborsSearchCV(model, grid, cv=3, scoring=scoring).fit(X, y)
+
+        assert np.allclose(gs.cv_results_["mean_test_score"], ks.cv_results_["mean_test_score"])
+        assert gs.best_params_ == ks.best_params_
+        assert ks.n_fits_ == 2 * 3 == ks.cv_results_["n_fits"].sum()
+        assert set(ks.cv_results_["n_fits"]) == {0, 3}
+
+
+@pytest.mark.parametrize("max_kernel_mb", [1024, 0])
+def test_kernel_search(train_data, max_kernel_mb) -> None:
+    """
+    Check that the kernel search gives the same scores as GridSearchCV
+    with precomputed kernels and without them (memory cap exceeded)
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        max_kernel_mb : float
+            Memory cap for the kernel matrices
+    """
+    X, y = train_data
+    X = (X - X.mean()) / X.std()
+    grid = {"C": [0.1, 1, 10], "kernel": ["linear", "rbf"], "gamma": ["scale", "auto"]}
+    model = SVC()
+    gs = GridSearchCV(model, grid, cv=3, scoring="accuracy").fit(X, y)
+    ks = KernelSearchCV(model, grid, cv=3, scoring="accuracy", max_kernel_mb=max_kernel_mb).fit(X, y)
+
+    assert np.allclose(gs.cv_results_["mean_test_score"], ks.cv_results_["mean_test_score"], atol=0.005)
+    # Linear models do not depend on gamma and are fitted once
+    assert ks.n_fits_ == (9 * 3 if max_kernel_mb else 12 * 3) == ks.cv_results_["n_fits"].sum()
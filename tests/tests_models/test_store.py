@@ -0,0 +1,47 @@
+import joblib
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+from src.models.store import ModelStore
+
+
+def test_model_store_lazy(train_data, tmp_path) -> None:
+    """
+    Check that models are found without loading and loaded on first access
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    joblib.dump(KNeighborsClassifier().fit(X, y), tmp_path / "KNN.joblib")
+    joblib.dump(KNeighborsClassifier(n_neighbors=3).fit(X, y), tmp_path / "KNN3.joblib", compress=3)
+
+    store = ModelStore(tmp_path)
+    assert sorted(store) == ["KNN", "KNN3"]
+    assert len(store) == 2 and not store.loaded
+
+    model = store["KNN3"]
+    assert list(store.loaded) == ["KNN3"]
+    assert store["KNN3"] is model
+
+    store.release("KNN3")
+    assert not store.loaded
+
+
+def test_model_store_mmap(train_data, tmp_path) -> None:
+    """
+    Check that arrays of uncompressed models are memory-mapped
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    X, y = train_data
+    model = KNeighborsClassifier().fit(X.to_numpy(), y)
+    joblib.dump(model, tmp_path / "KNN.joblib")
+
+    store = ModelStore(tmp_path, mmap_mode="r")
+    assert isinstance(store["KNN"]._fit_X, np.memmap)
+    assert np.array_equal(store["KNN"].predict(X.to_numpy()), model.predict(X.to_numpy()))
@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+import yaml
+from pathlib import Path
+from src.models.training import Models
+
+
+@pytest.fixture
+def models_config(tmp_path, monkeypatch):
+    """
+    Create a function writing a reduced models configuration
+    The working directory is changed to a temporary folder for saving models
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def write(models: dict) -> Path:
+        path = tmp_path / "models.yaml"
+        config = {"models": models, "gridsearch": {"cv": 3, "scoring": "accuracy", "n_jobs": 1}}
+        path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        return path
+    return write
+
+
+@pytest.mark.parametrize("backend, class_name", [("exact", "GradientBoostingClassifier"),
+                                                 ("hist", "HistGradientBoostingClassifier")])
+def test_gb_backend_early_stopping(train_data, models_config, backend, class_name) -> None:
+    """
+    Check that GradientBoosting supports both backends with early stopping
+    and reports the stopping iteration
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        models_config : callable
+            Configuration writer provided by a fixture
+        backend : str
+            Backend of the model
+        class_name : str
+            Expected class of the model
+    """
+    X, y = train_data
+    path = models_config({
+        "GB": {
+            "class": "sklearn.ensemble.GradientBoostingClassifier",
+            "backend": backend,
+            "search": {"class": "src.models.search.WarmStartSearchCV"},
+            "init_params": {"validation_fraction": 0.2, "n_iter_no_change": 3, "random_state": 0},
+            "params": {"n_estimators": [100, 500], "learning_rate": [0.5]}
+        }
+    })
+    models = Models(X, y, preprocessing_type="test", config_path=path)
+    models.train_models()
+
+    model = models.trained_models["GB"]
+    assert type(model).__name__ == class_name
+    assert models.results["GB"]["n_iter"] < 500
+    assert (Path("models") / "test" / "GB.joblib").is_file()
+
+
+def test_checkpoint_resume(train_data, models_config) -> None:
+    """
+    Check that trained models are checkpointed and skipped on restart
+    while the configuration and the data are unchanged
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        models_config : callable
+            Configuration writer provided by a fixture
+    """
+    X, y = train_data
+    knn = {"class": "sklearn.neighbors.KNeighborsClassifier", "params": {"n_neighbors": [3, 5]}}
+    ada = {"class": "sklearn.ensemble.AdaBoostClassifier", "params": {"n_estimators": [5]}}
+    path = models_config({"KNN": knn, "Ada": ada})
+    first = Models(X, y, preprocessing_type="test", config_path=path)
+    first.train_models()
+
+    save_path = Path("models") / "test"
+    assert (save_path / "manifest.json").is_file()
+    assert (save_path / "KNN_cv_results.csv").is_file()
+    mtimes = {name: (save_path / f"{name}.joblib").stat().st_mtime_ns for name in ["KNN", "Ada"]}
+
+    # Changed configuration of one model and the same data
+    ada["params"]["n_estimators"] = [10]
+    path = models_config({"KNN": knn, "Ada": ada})
+    second = Models(X, y, preprocessing_type="test", config_path=path)
+    second.train_models()
+
+    assert (save_path / "KNN.joblib").stat().st_mtime_ns == mtimes["KNN"]
+    assert (save_path / "Ada.joblib").stat().st_mtime_ns != mtimes["Ada"]
+    assert second.results["KNN"] == first.results["KNN"]
+    assert second.results["Ada"]["best_params"] == {"n_estimators": 10}
+
+    # Changed data
+    third = Models(X.iloc[:-10], y.iloc[:-10], preprocessing_type="test", config_path=path)
+    third.train_models()
+    assert (save_path / "KNN.joblib").stat().st_mtime_ns != mtimes["KNN"]
+
+
+def test_checkpoint_resume_matches_fresh_run(train_data, models_config) -> None:
+    """
+    Check that results and cv_results_ restored from a checkpoint equal those of a fresh run
+    (None and float parameters keep their types)
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        models_config : callable
+            Configuration writer provided by a fixture
+    """
+    X, y = train_data
+    path = models_config({
+        "RF": {"class": "sklearn.ensemble.RandomForestClassifier",
+               "params": {"n_estimators": [5], "max_depth": [None, 3], "max_features": [0.5, "sqrt"],
+                          "random_state": [0]}}
+    })
+    fresh = Models(X, y, preprocessing_type="test", config_path=path)
+    fresh.train_models()
+    resumed = Models(X, y, preprocessing_type="test", config_path=path)
+    resumed.train_models()
+
+    assert (Path("models") / "test" / "search" / "RF.joblib").is_file()
+    assert [path.name for path in (Path("models") / "test").glob("*.joblib")] == ["RF.joblib"]
+    assert resumed.results["RF"] == fresh.results["RF"]
+    assert resumed.cv_results["RF"]["params"] == fresh.cv_results["RF"]["params"]
+    assert set(resumed.cv_results["RF"]) == set(fresh.cv_results["RF"])
+    for key, value in fresh.cv_results["RF"].items():
+        if key != "params":
+            assert np.array_equal(resumed.cv_results["RF"][key], value)
+    assert resumed.trained_models["RF"].get_params() == fresh.trained_models["RF"].get_params()
+
+
+def test_lr_grid(train_data, models_config) -> None:
+    """
+    Check that the LR grid has one path per solver and l1_ratio with max_iter as a single cap
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        models_config : callable
+            Configuration writer provided by a fixture
+    """
+    X, y = train_data
+    path = models_config({"LR": {"class": "sklearn.linear_model.LogisticRegression",
+                                 "search": {"class": "src.models.search.LogisticPathSearchCV"},
+                                 "params": {"C": [0.1, 1], "max_iter": [500, 2000], "l1_ratio": [0.2, 0.8]}}})
+    models = Models(X, y, preprocessing_type="test", config_path=path)
+    grid = models.get_lr_grid(models.params["LR"])
+
+    paths = [(params["solver"], params.get("l1_ratio")) for params in grid]
+    assert paths == [(["lbfgs"], None), (["liblinear"], None), (["saga"], None), (["saga"], [0.2]), (["saga"], [0.8])]
+    assert all(params["C"] == [0.1, 1] and params["max_iter"] == [2000] for params in grid)
+
+
+def test_config_hash_environment(train_data, models_config, monkeypatch) -> None:
+    """
+    Check that checkpoints are not reused after a library upgrade or with another search class
+    Parameters:
+        train_data : tuple
+            Features and labels provided by a fixture
+        models_config : callable
+            Configuration writer provided by a fixture
+    """
+    X, y = train_data
+    knn = {"class": "sklearn.neighbors.KNeighborsClassifier", "params": {"n_neighbors": [3, 5]}}
+    models = Models(X, y, preprocessing_type="test", config_path=models_config({"KNN": knn}))
+    config_hash = models.get_config_hash("KNN")
+
+    path = models_config({"KNN": {**knn, "search": {"class": "src.models.search.KNeighborsSearchCV"}}})
+    searched = Models(X, y, preprocessing_type="test", config_path=path)
+    searched.config["models"]["KNN"] = knn
+    assert searched.get_config_hash("KNN") != config_hash
+
+    monkeypatch.setattr("src.models.training.sklearn.__version__", "0.0.1")
+    assert models.get_config_hash("KNN") != config_hash
@@ -1,5 +1,9 @@
 import pytest
+import numpy as np
 from src.preprocessing.base import BasePreprocessor
+from src.preprocessing.simple import SimplePreprocessor
+from src.preprocessing.standard import StandardPreprocessor
+from src.preprocessing.advanced import AdvancedPreprocessor
 import pandas as pd
 
 
@@ -150,4 +154,54 @@ def test_check_missing_real_data(real_data: pd.DataFrame) -> None:
     """
     df = real_data.copy()
     bp = BasePreprocessor(df, target='HeartDisease')
-    assert bp.check_missing()
\ No newline at end of file
+    assert bp.check_missing()
+
+@pytest.mark.parametrize("preprocessor_class", [SimplePreprocessor, StandardPreprocessor, AdvancedPreprocessor])
+def test_transform_matches_run(real_data, preprocessor_class, monkeypatch, tmp_path) -> None:
+    """
+    Check that the saved fitted preprocessor transforms raw records as the pipeline processed them
+    Rows are kept by the pipeline (no missing values, duplicates or outliers filtering)
+    Parameters:
+        real_data : pd.DataFrame
+            Real data provided by a fixture
+        preprocessor_class : type
+            Preprocessor class
+        monkeypatch : MonkeyPatch
+            Pytest fixture to disable outliers filtering
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    df = real_data.dropna().drop_duplicates()
+    df = df[(df["Cholesterol"] != 0) & (df["RestingBP"] >= 50)].reset_index(drop=True)
+    monkeypatch.setattr(preprocessor_class, "remove_outliers", lambda self: None)
+    processor = preprocessor_class(df)
+    processor.run()
+
+    loaded = BasePreprocessor.load(processor.save(tmp_path / "preprocessor.joblib"))
+    assert loaded.df is None
+
+    transformed = loaded.transform(df.drop(columns=["HeartDisease"]))
+    expected = processor.df.drop(columns=["HeartDisease"])
+    assert list(transformed.columns) == list(expected.columns)
+    assert np.allclose(transformed.astype(float), expected.astype(float))
+
+
+def test_base_transform(real_data: pd.DataFrame) -> None:
+    """
+    Checks that the base transform converts Cholesterol zeros to NaN, restores the training types
+    and keeps the order of the processed features
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    df = real_data.dropna().reset_index(drop=True)
+    bp = BasePreprocessor(df, target='HeartDisease')
+    bp.remove_duplicates()
+    bp.set_feature_names()
+
+    records = df.drop(columns=['HeartDisease']).iloc[:, ::-1]
+    transformed = bp.transform(records)
+    expected = bp.df.drop(columns=['HeartDisease'])
+    assert list(transformed.columns) == list(expected.columns)
+    assert transformed["Cholesterol"].isna().sum() == (df["Cholesterol"] == 0).sum()
+    assert (transformed.dtypes == expected.dtypes).all()
@@ -0,0 +1,50 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.preprocessing.simple import SimplePreprocessor
+from src.preprocessing.standard import StandardPreprocessor
+from src.preprocessing.advanced import AdvancedPreprocessor
+from src.preprocessing.plan import TransformPlan
+
+
+@pytest.fixture
+def records(real_data) -> list[dict]:
+    """
+    Create raw records of the real data as received from JSON, with missing values and an unseen category
+    """
+    df = real_data.dropna(subset=["HeartDisease"]).drop(columns=["HeartDisease"])
+    records = json.loads(df.to_json(orient="records"))
+    records.append(dict(records[0], Cholesterol=None, RestingBP=None))
+    records.append(dict(records[1], ChestPainType="XYZ"))
+    return records
+
+
+@pytest.mark.parametrize("preprocessor_class", [SimplePreprocessor, StandardPreprocessor, AdvancedPreprocessor])
+def test_plan_matches_transform(real_data, records, preprocessor_class) -> None:
+    """
+    Check that the compiled plan gives the same features as the pandas transform
+    Parameters:
+        real_data : pd.DataFrame
+            Real data provided by a fixture
+        records : list[dict]
+            Raw records provided by a fixture
+        preprocessor_class : type
+            Preprocessor class
+    """
+    processor = preprocessor_class(real_data.dropna(subset=["HeartDisease"]))
+    processor.run()
+    plan = TransformPlan(processor)
+
+    # OneHotEncoder rejects unseen categories
+    if preprocessor_class is StandardPreprocessor:
+        with pytest.raises(ValueError):
+            plan.transform_one(records.pop())
+
+    expected = processor.transform(pd.DataFrame(records)).to_numpy(dtype=np.float64)
+    assert np.allclose(plan.transform_many(records), expected)
+
+    # Single records reuse the preallocated vector
+    out = plan.transform_one(records[0])
+    assert out is plan.out
+    assert np.allclose(out, expected[0])
@@ -0,0 +1,151 @@
+import http.client
+import json
+import socket
+import threading
+import joblib
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.linear_model import LogisticRegression
+from src.preprocessing.standard import StandardPreprocessor
+from src.serving.server import MicroBatcher, create_server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a Unix socket
+    """
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.fixture
+def artifacts(real_data, tmp_path) -> tuple:
+    """
+    Create a fitted preprocessor and a trained model saved to a temporary models directory
+    """
+    df = real_data.dropna(subset=["HeartDisease"])
+    sp = StandardPreprocessor(df)
+    sp.run()
+    X = sp.df.drop(columns=["HeartDisease"]).astype(float)
+    model = LogisticRegression(max_iter=5000).fit(X, sp.df["HeartDisease"])
+
+    models_dir = tmp_path / "models"
+    sp.save(models_dir / "preprocessors" / "standard.joblib")
+    (models_dir / "standard").mkdir(parents=True)
+    joblib.dump(model, models_dir / "standard" / "LR.joblib")
+
+    records = json.loads(df.drop(columns=["HeartDisease"]).head(20).to_json(orient="records"))
+    expected = model.predict_proba(sp.transform(df.head(20)))[:, 1]
+    return models_dir, records, expected
+
+
+def serve(server) -> threading.Thread:
+    """
+    Runs the server in a background thread
+    """
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def post(connection, records) -> tuple[int, object]:
+    """
+    Sends records to /predict and returns the status and the decoded response
+    """
+    connection.request("POST", "/predict", body=json.dumps(records), headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_http_server(artifacts) -> None:
+    """
+    Check that concurrent requests over HTTP are scored as the model scores preprocessed records
+    Parameters:
+        artifacts : tuple
+            Models directory, raw records and expected scores provided by a fixture
+    """
+    models_dir, records, expected = artifacts
+    config = {"preprocessing_type": "standard", "model": "LR", "port": 0,
+              "batching": {"max_batch": 8, "max_wait_ms": 5}}
+    server = create_server(config, models_dir)
+    serve(server)
+    host, port = server.server_address
+    try:
+        def score(record):
+            connection = http.client.HTTPConnection(host, port)
+            status, result = post(connection, record)
+            connection.close()
+            assert status == 200
+            return result["score"]
+
+        with ThreadPoolExecutor(8) as pool:
+            scores = list(pool.map(score, records))
+        assert np.allclose(scores, expected)
+        assert server.batcher.n_batches < len(records)
+
+        # A list of records in one request, health and invalid records
+        connection = http.client.HTTPConnection(host, port)
+        status, results = post(connection, records)
+        assert status == 200 and np.allclose([r["score"] for r in results], expected)
+
+        connection.request("GET", "/health")
+        assert json.loads(connection.getresponse().read())["model"] == "LR"
+
+        status, result = post(connection, {"Age": 50})
+        assert status == 400 and "columns" in result["error"]
+        for body in ([1, 2], "x", [records[0], None]):
+            status, result = post(connection, body)
+            assert status == 400 and "JSON objects" in result["error"]
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.close()
+
+
+def test_unix_socket_server(artifacts, tmp_path) -> None:
+    """
+    Check that the server scores records over a Unix socket
+    Parameters:
+        artifacts : tuple
+            Models directory, raw records and expected scores provided by a fixture
+        tmp_path : Path
+            Temporary folder provided by pytest
+    """
+    models_dir, records, expected = artifacts
+    socket_path = str(tmp_path / "scoring.sock")
+    server = create_server({"preprocessing_type": "standard", "model": "LR", "unix_socket": socket_path}, models_dir)
+    serve(server)
+    try:
+        connection = UnixHTTPConnection(socket_path)
+        status, result = post(connection, records[0])
+        connection.close()
+        assert status == 200
+        assert result["score"] == pytest.approx(expected[0])
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.close()
+
+
+def test_micro_batcher_isolates_errors() -> None:
+    """
+    Check that records are batched and an invalid record fails only its own future
+    """
+    def fn(records):
+        if any(record < 0 for record in records):
+            raise ValueError("negative record")
+        return [record * 2 for record in records]
+
+    batcher = MicroBatcher(fn, max_batch=16, max_wait_ms=50)
+    futures = [batcher.submit(record) for record in [1, 2, -1, 3]]
+    assert [futures[i].result(timeout=5) for i in (0, 1, 3)] == [2, 4, 6]
+    with pytest.raises(ValueError):
+        futures[2].result(timeout=5)
+    batcher.close()
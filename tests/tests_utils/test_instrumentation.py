@@ -0,0 +1,155 @@
+import json
+import os
+import time
+import numpy as np
+import pytest
+from joblib import Parallel, delayed
+from src.preprocessing.simple import SimplePreprocessor
+from src.utils.instrumentation import RECORDER, Recorder, instrument, merge_outputs, run_stage, stage
+
+
+def test_nested_stages(tmp_path) -> None:
+    """
+    Check parents, depth, memory, errors and the saved report of nested stages
+    """
+    recorder = Recorder(interval=0.001)
+    recorder.start_run()
+    with recorder.stage("outer", rows_in=10) as outer:
+        with recorder.stage("inner"):
+            data = np.ones(32 * 2 ** 20 // 8)
+        del data
+        outer["rows_out"] = 5
+    with pytest.raises(KeyError):
+        with recorder.stage("failing"):
+            raise KeyError("x")
+    recorder.stop_run()
+
+    stages = {record["name"]: record for record in recorder.report()["stages"]}
+    assert stages["inner"]["parent"] == "outer" and stages["inner"]["depth"] == 1
+    assert stages["outer"]["parent"] is None and (stages["outer"]["rows_in"], stages["outer"]["rows_out"]) == (10, 5)
+    assert stages["outer"]["wall_s"] >= stages["inner"]["wall_s"] > 0
+    assert stages["inner"]["rss_increase_mb"] >= 16
+    assert stages["failing"]["error"] == "KeyError"
+
+    report = json.loads(recorder.save(tmp_path / "report.json").read_text())
+    assert [stage["name"] for stage in report["stages"]] == ["outer", "inner", "failing"]
+
+
+def test_disabled_recorder() -> None:
+    """
+    Check that a disabled recorder records nothing
+    """
+    recorder = Recorder(enabled=False)
+    with recorder.stage("skipped") as record:
+        pass
+    assert record is None and recorder.records == []
+
+
+def test_instrumented_preprocessor(real_data) -> None:
+    """
+    Check that preprocessing steps are recorded inside the run with their row counts
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    RECORDER.start_run()
+    sp = SimplePreprocessor(real_data)
+    sp.run()
+    RECORDER.stop_run()
+
+    stages = {record["name"]: record for record in RECORDER.report()["stages"]}
+    assert stages["SimplePreprocessor.run"]["rows_in"] == len(real_data)
+    assert stages["SimplePreprocessor.run"]["rows_out"] == len(sp.df)
+    missing = stages["SimplePreprocessor.remove_missing"]
+    assert missing["parent"] == "SimplePreprocessor.run"
+    assert missing["rows_out"] < missing["rows_in"]
+
+
+def test_instrument_function() -> None:
+    """
+    Check that functions are recorded with rows of the first array argument and of the result
+    """
+    @instrument("head")
+    def head(values: np.ndarray, n: int) -> np.ndarray:
+        return values[:n]
+
+    RECORDER.start_run()
+    head(np.zeros(10), 3)
+    RECORDER.stop_run()
+    record = RECORDER.records[-1]
+    assert (record["name"], record["rows_in"], record["rows_out"]) == ("head", 10, 3)
+
+
+def test_worker_stages_in_trace(tmp_path) -> None:
+    """
+    Check that stages of joblib workers are merged into the run and exported as a Chrome trace
+    """
+    RECORDER.start_run()
+    with stage("parallel"):
+        results = merge_outputs(Parallel(n_jobs=2)(
+            delayed(run_stage)(f"task{i}", time.sleep, 0.05) for i in range(4)
+        ))
+    RECORDER.stop_run()
+
+    assert results == [None] * 4
+    stages = {record["name"]: record for record in RECORDER.records}
+    parallel = stages["parallel"]
+    for i in range(4):
+        task = stages[f"task{i}"]
+        assert task["parent"] == "parallel"
+        assert parallel["start_s"] <= task["start_s"]
+        assert task["start_s"] + task["wall_s"] <= parallel["start_s"] + parallel["wall_s"] + 1e-3
+    assert any(stages[f"task{i}"]["pid"] != os.getpid() for i in range(4))
+
+    trace = json.loads(RECORDER.save_trace(tmp_path / "trace.json").read_text())
+    events = trace["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert {event["name"] for event in spans} == {"parallel", "task0", "task1", "task2", "task3"}
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in spans)
+    names = {event["pid"]: event["args"]["name"] for event in events if event["name"] == "process_name"}
+    assert names[os.getpid()] == "pipeline"
+    assert set(names) == {event["pid"] for event in spans}
+
+
+def test_no_records_outside_run(real_data) -> None:
+    """
+    Check that instrumented code called without a run (e.g. by the scoring server) keeps no records
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    RECORDER.start_run()
+    RECORDER.stop_run()
+    n_records = len(RECORDER.records)
+    SimplePreprocessor(real_data).run()
+    results = merge_outputs([run_stage("task", sum, [1, 2])])
+    with stage("outside") as record:
+        pass
+
+    assert results == [3] and record is None
+    assert len(RECORDER.records) == n_records
+
+
+def test_concurrent_stages_with_threads() -> None:
+    """
+    Check that no record is lost when run_stage tasks of the threading backend
+    take their records while other threads finish stages
+    """
+    def busy(name: str) -> None:
+        for i in range(200):
+            with stage(f"{name}.{i}"):
+                pass
+
+    RECORDER.start_run()
+    with stage("parallel"):
+        results = merge_outputs(Parallel(n_jobs=4, backend="threading")(
+            delayed(run_stage)(f"task{i}", busy, f"task{i}") for i in range(8)
+        ))
+    RECORDER.stop_run()
+
+    names = [record["name"] for record in RECORDER.records]
+    assert results == [None] * 8
+    assert len(names) == len(set(names)) == 1 + 8 * (1 + 200)
+    stages = {record["name"]: record for record in RECORDER.records}
+    assert all(stages[f"task{i}"]["parent"] == "parallel" for i in range(8))
+    assert all(stages[f"task{i}.0"]["parent"] == f"task{i}" for i in range(8))
@@ -0,0 +1,14 @@
+import numpy as np
+from src.utils.memory import PeakMemory, current_rss
+
+
+def test_peak_memory() -> None:
+    """
+    Check that an allocation inside the block is seen in the peak RSS
+    """
+    assert current_rss() > 0
+    with PeakMemory(interval=0.001) as memory:
+        data = np.ones(64 * 2 ** 20 // 8)
+    del data
+    assert memory.peak >= memory.start
+    assert memory.increase >= 32 * 2 ** 20
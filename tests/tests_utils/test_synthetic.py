@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.preprocessing.simple import SimplePreprocessor
+from src.utils.synthetic import SyntheticGenerator
+
+
+def test_sample_matches_schema(real_data) -> None:
+    """
+    Check that synthetic rows have the columns, dtypes, categories and class balance of the raw data
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    generator = SyntheticGenerator(real_data, seed=0).fit()
+    df = generator.sample(20000, np.random.default_rng(0))
+
+    assert len(df) == 20000
+    assert df.dtypes.equals(real_data.dtypes)
+    for column in ["Sex", "ChestPainType", "RestingECG", "ExerciseAngina", "ST_Slope"]:
+        assert set(df[column]) <= set(real_data[column])
+    assert df["HeartDisease"].mean() == pytest.approx(real_data["HeartDisease"].mean(), abs=0.02)
+    assert (df["Cholesterol"] == 0).mean() == pytest.approx((real_data["Cholesterol"] == 0).mean(), abs=0.02)
+    assert df["Age"].between(real_data["Age"].min(), real_data["Age"].max()).all()
+
+    # Class-conditional structure is kept
+    raw = real_data.groupby("HeartDisease")["ST_Slope"].value_counts(normalize=True)
+    synthetic = df.groupby("HeartDisease")["ST_Slope"].value_counts(normalize=True)
+    assert np.allclose(synthetic[raw.index], raw, atol=0.03)
+
+
+def test_controls(real_data) -> None:
+    """
+    Check the rates of cholesterol zeros, duplicates and outliers
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    generator = SyntheticGenerator(real_data, cholesterol_zero_rate=0.5, duplicate_rate=0.1, outlier_rate=0.05).fit()
+    df = generator.sample(20000, np.random.default_rng(0))
+
+    assert (df["Cholesterol"] == 0).mean() == pytest.approx(0.5, abs=0.03)
+    assert df.duplicated().mean() == pytest.approx(0.1, abs=0.02)
+    assert (df["RestingBP"] > real_data["RestingBP"].max()).any()
+
+    with pytest.raises(ValueError):
+        SyntheticGenerator(real_data, duplicate_rate=1.5)
+
+
+def test_generate_chunks(real_data, tmp_path) -> None:
+    """
+    Check that chunked output has all rows, does not depend on the process state and runs through a pipeline
+    Parameters:
+        real_data : pd.DataFrame
+            Raw data provided by a fixture
+    """
+    path = SyntheticGenerator(real_data, seed=3).generate(2500, tmp_path / "synthetic.csv", chunk_size=1000)
+    again = SyntheticGenerator(real_data, seed=3).generate(2500, tmp_path / "again.csv", chunk_size=1000)
+
+    df = pd.read_csv(path)
+    assert len(df) == 2500
+    assert list(df.columns) == list(real_data.columns)
+    pd.testing.assert_frame_equal(df, pd.read_csv(again))
+
+    sp = SimplePreprocessor(df)
+    sp.run()
+    assert not sp.df.isna().any().any()